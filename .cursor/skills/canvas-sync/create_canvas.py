@@ -7,53 +7,15 @@ Usage:
     python create_canvas.py "proj-my-project" "projects/my-project/TODO.md" --title "Task List"
 """
 
-import os
 import sys
 import argparse
 from pathlib import Path
-from slack_sdk import WebClient
-from slack_sdk.errors import SlackApiError
 
-
-def get_token():
-    """Load Slack bot token from environment or .api_keys.txt"""
-    token = os.environ.get('SLACK_BOT_TOKEN')
-    if not token:
-        keys_file = Path(__file__).parent.parent.parent / '.api_keys.txt'
-        if keys_file.exists():
-            for line in keys_file.read_text().splitlines():
-                if line.startswith('SLACK_BOT_TOKEN='):
-                    token = line.split('=', 1)[1].strip()
-                    break
-    return token
-
-
-def find_channel_id(client, channel_name):
-    """Find channel ID from channel name."""
-    channel_name = channel_name.lstrip('#')
-    
-    try:
-        cursor = None
-        while True:
-            result = client.conversations_list(
-                types="public_channel,private_channel",
-                limit=200,
-                cursor=cursor
-            )
-            
-            for channel in result["channels"]:
-                if channel["name"] == channel_name:
-                    return channel["id"]
-            
-            cursor = result.get("response_metadata", {}).get("next_cursor")
-            if not cursor:
-                break
-                
-    except SlackApiError as e:
-        print(f"Error listing channels: {e.response['error']}")
-        return None
-    
-    return None
+# Channel cache and client setup are shared with the slack-posting skill
+sys.path.insert(0, str(Path(__file__).parent.parent / 'slack-posting'))
+import channel_cache
+import slack_client
+import slack_timings
 
 
 def create_canvas_as_tab(token, channel, markdown_content, title=None):
@@ -68,22 +30,26 @@ def create_canvas_as_tab(token, channel, markdown_content, title=None):
     Returns:
         Canvas ID if successful, None otherwise
     """
-    client = WebClient(token=token)
+    client = slack_client.get_client(token)
     channel_name = channel.lstrip('#')
     
     # Get channel ID if needed
     if not channel.startswith('C') or not channel[1:].isalnum():
-        channel_id = find_channel_id(client, channel_name)
+        channel_id = channel_cache.find_channel_id(client, channel_name)
         if not channel_id:
             print(f"Error: Channel '{channel_name}' not found")
             return None
+        lookup_name = channel_name
     else:
         channel_id = channel
+        lookup_name = None
     
     try:
         # Create canvas as channel tab
-        result = client.conversations_canvases_create(
-            channel_id=channel_id,
+        result = channel_cache.call_with_channel(
+            client, channel_id, client.conversations_canvases_create,
+            channel_name=lookup_name,
+            channel_arg='channel_id',
             document_content={
                 'type': 'markdown',
                 'markdown': markdown_content
@@ -101,7 +67,7 @@ def create_canvas_as_tab(token, channel, markdown_content, title=None):
             print(f"Error: No canvas_id in response")
             return None
             
-    except SlackApiError as e:
+    except slack_client.SlackApiError as e:
         error = e.response.get('error', 'unknown_error')
         if error == 'not_in_channel':
             print(f"Error: Bot is not a member of #{channel_name}. Please add the bot to the channel first.")
@@ -123,10 +89,12 @@ def main():
     parser.add_argument('channel', help='Channel name (e.g., #proj-agent-infra or proj-agent-infra) or channel ID')
     parser.add_argument('markdown_file', help='Path to markdown file to upload')
     parser.add_argument('--title', '-t', help='Optional title for the canvas')
+    slack_timings.add_argument(parser)
     
     args = parser.parse_args()
+    slack_timings.configure(args)
     
-    token = get_token()
+    token = slack_client.get_token()
     if not token:
         print("Error: SLACK_BOT_TOKEN not found")
         print("Set SLACK_BOT_TOKEN environment variable or add to .cursor/.api_keys.txt")
@@ -144,7 +112,8 @@ def main():
         sys.exit(1)
     
     try:
-        content = markdown_path.read_text()
+        with slack_timings.timed('phase', 'read_local'):
+            content = markdown_path.read_text()
         print(f"✓ Loaded markdown file ({len(content)} chars)")
     except Exception as e:
         print(f"Error reading file: {e}")
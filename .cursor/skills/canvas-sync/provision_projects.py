@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Provision a Slack channel, purpose and canvas tab for every project in projects/.
+
+Scans projects/*/ (README.md for the channel purpose, TODO.md for the canvas),
+plans what is missing, and runs the steps concurrently under Slack's
+rate-limit tiers. Each completed step is journalled to
+.cursor/.provision_state.json, so a re-run after a partial failure skips
+finished steps instead of guessing what exists. Canvas IDs are written to the
+sync registry (projects.json next to sync_canvas.py), which sync_canvas.py
+loads on top of its built-in PROJECTS.
+
+Per project:
+    channel   create proj-<name> (or adopt the existing one and join it)
+    purpose   set from README.md (re-set only when the text changes)
+    canvas    create a channel canvas tab from TODO.md
+    register  record canvas_id/local_path/channel in the sync registry
+
+Usage:
+    python provision_projects.py --dry-run
+    python provision_projects.py
+    python provision_projects.py --projects "collab-*" --workers 2
+    python provision_projects.py --status
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+from pathlib import Path
+from fnmatch import fnmatch
+from concurrent.futures import ThreadPoolExecutor
+
+# Channel cache, client setup and rate limiting are shared with the slack-posting skill
+sys.path.insert(0, str(Path(__file__).parent.parent / 'slack-posting'))
+import channel_cache
+import slack_client
+from post_message import RateLimiter
+
+WORKSPACE_ROOT = Path(__file__).parent.parent.parent.parent
+PROJECTS_DIR = WORKSPACE_ROOT / 'projects'
+REGISTRY_PATH = Path(os.environ.get('CANVAS_SYNC_REGISTRY', Path(__file__).parent / 'projects.json'))
+STATE_PATH = Path(os.environ.get(
+    'PROVISION_STATE', Path(__file__).parent.parent.parent / '.provision_state.json'
+))
+CHANNEL_PREFIX = 'proj-'
+DEFAULT_WORKERS = 4
+STEPS = ('channel', 'purpose', 'canvas', 'register')
+
+PLACEHOLDER_RE = re.compile(r'^([*_]).*\1$', re.S)  # Whole paragraph in italics = template instructions
+
+
+def write_json(path, data):
+    """Write JSON atomically (tmp file + rename)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + f'.{os.getpid()}.tmp')
+    tmp_path.write_text(json.dumps(data, indent=2, sort_keys=True) + '\n')
+    os.replace(tmp_path, path)
+
+
+class Journal:
+    """Per-project provisioning state, saved after every completed step."""
+
+    def __init__(self, path=STATE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            data = {}
+        self.projects = data.get('projects', {}) if isinstance(data, dict) else {}
+
+    def get(self, name):
+        with self.lock:
+            return dict(self.projects.get(name, {}))
+
+    def update(self, name, **fields):
+        with self.lock:
+            entry = self.projects.setdefault(name, {})
+            entry.update(fields, updated_at=time.strftime('%Y-%m-%dT%H:%M:%S%z'))
+            write_json(self.path, {'projects': self.projects})
+
+
+def channel_name(project):
+    """Slack channel for a project directory (lowercase, no spaces, max 80 chars)."""
+    clean = re.sub(r'[^a-z0-9-]+', '-', project.lower()).strip('-')
+    return (CHANNEL_PREFIX + clean)[:80]
+
+
+def readme_purpose(text, fallback):
+    """One-line channel purpose from a README.
+
+    Uses the first real paragraph of the Overview section (or of the file),
+    skipping headings and italic template instructions.
+    """
+    overview = re.search(r'^##\s+Overview\s*$(.*?)(?=^#|\Z)', text, re.M | re.S)
+    for block in re.split(r'\n\s*\n', overview.group(1) if overview else text):
+        block = block.strip()
+        if not block or block.startswith(('#', '|', '-', '* ', '>', '```')) or PLACEHOLDER_RE.match(block):
+            continue
+        return ' '.join(block.split())[:250]
+    return fallback
+
+
+def scan_projects(patterns=None, projects_dir=PROJECTS_DIR):
+    """Projects under projects/ with a README.md or TODO.md, optionally filtered by glob."""
+    wanted = [p.strip() for p in patterns.split(',') if p.strip()] if patterns else None
+    projects = []
+    for directory in sorted(projects_dir.iterdir() if projects_dir.is_dir() else []):
+        readme, todo = directory / 'README.md', directory / 'TODO.md'
+        if not directory.is_dir() or directory.name.startswith('.') or not (readme.exists() or todo.exists()):
+            continue
+        if wanted and not any(fnmatch(directory.name, p) for p in wanted):
+            continue
+        title = directory.name
+        purpose = f"Project: {title}"
+        if readme.exists():
+            text = readme.read_text()
+            heading = re.search(r'^#\s+(?:Project:\s*)?(.+)$', text, re.M)
+            title = heading.group(1).strip() if heading else title
+            purpose = readme_purpose(text, f"Project: {title}")
+        projects.append({
+            'name': directory.name,
+            'channel': channel_name(directory.name),
+            'purpose': purpose,
+            'local_path': todo.relative_to(WORKSPACE_ROOT).as_posix() if todo.exists() else None,
+        })
+    return projects
+
+
+def purpose_hash(purpose):
+    return hashlib.sha256(purpose.encode()).hexdigest()[:16]
+
+
+def load_registry(path=REGISTRY_PATH):
+    try:
+        data = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def registry_entry(project, state):
+    return {'canvas_id': state['canvas_id'], 'local_path': project['local_path'], 'channel': project['channel']}
+
+
+def pending_steps(project, state, registry):
+    """Steps still needed for a project, given its journal entry."""
+    steps = []
+    if not state.get('channel_id'):
+        steps.append('channel')
+    if state.get('purpose_hash') != purpose_hash(project['purpose']):
+        steps.append('purpose')
+    if project['local_path']:
+        if not state.get('canvas_id'):
+            steps.append('canvas')
+        if not state.get('canvas_id') or registry.get(project['name']) != registry_entry(project, state):
+            steps.append('register')
+    return steps
+
+
+def ensure_channel(client, limiter, project):
+    """Channel ID for the project's channel, creating it if needed. Returns (id, created)."""
+    name = project['channel']
+    channel_id = channel_cache.cached_channel_id(client, name)
+    if not channel_id:
+        limiter.acquire('conversations_create')
+        try:
+            result = client.conversations_create(name=name)
+            channel_id = result['channel']['id']
+            channel_cache.remember_channel(client, name, channel_id)
+            return channel_id, True
+        except slack_client.SlackApiError as e:
+            if e.response.get('error') != 'name_taken':
+                raise
+        limiter.acquire('conversations_list')
+        channel_id = channel_cache.find_channel_id(client, name, refresh=True)
+        if not channel_id:
+            raise RuntimeError(f"#{name} exists but is not visible to the bot (private?)")
+
+    # Existing channel: join so purpose/canvas calls don't fail with not_in_channel
+    limiter.acquire('conversations_join')
+    try:
+        client.conversations_join(channel=channel_id)
+    except slack_client.SlackApiError as e:
+        if e.response.get('error') not in ('method_not_supported_for_channel_type', 'already_in_channel'):
+            raise
+    return channel_id, False
+
+
+def create_canvas(client, limiter, project, channel_id):
+    """Create the channel canvas tab from TODO.md, adopting one that already exists."""
+    content = (WORKSPACE_ROOT / project['local_path']).read_text()
+    limiter.acquire('conversations_canvases_create')
+    try:
+        result = channel_cache.call_with_channel(
+            client, channel_id, client.conversations_canvases_create,
+            channel_name=project['channel'], channel_arg='channel_id',
+            document_content={'type': 'markdown', 'markdown': content}
+        )
+        return result['canvas_id']
+    except slack_client.SlackApiError as e:
+        if e.response.get('error') != 'channel_canvas_already_exists':
+            raise
+    limiter.acquire('conversations_info')
+    info = client.conversations_info(channel=channel_id)
+    canvas_id = info['channel'].get('properties', {}).get('canvas', {}).get('file_id')
+    if not canvas_id:
+        raise RuntimeError('channel already has a canvas but its ID is not readable')
+    return canvas_id
+
+
+def provision_project(project, client, limiter, journal):
+    """Run the missing channel/purpose/canvas steps for one project. Never raises."""
+    name = project['name']
+    done = []
+    state = journal.get(name)
+    try:
+        channel_id = state.get('channel_id')
+        if not channel_id:
+            channel_id, created = ensure_channel(client, limiter, project)
+            journal.update(name, channel=project['channel'], channel_id=channel_id, channel_created=created)
+            done.append('channel')
+
+        if state.get('purpose_hash') != purpose_hash(project['purpose']):
+            limiter.acquire('conversations_setPurpose')
+            channel_cache.call_with_channel(client, channel_id, client.conversations_setPurpose,
+                                            channel_name=project['channel'], purpose=project['purpose'][:250])
+            journal.update(name, purpose_hash=purpose_hash(project['purpose']))
+            done.append('purpose')
+
+        if project['local_path'] and not state.get('canvas_id'):
+            journal.update(name, canvas_id=create_canvas(client, limiter, project, channel_id))
+            done.append('canvas')
+
+        journal.update(name, error=None)
+        return {'name': name, 'done': done, 'error': None}
+    except (slack_client.SlackApiError, OSError, RuntimeError, KeyError) as e:
+        error = e.response.get('error', str(e)) if isinstance(e, slack_client.SlackApiError) else str(e)
+        journal.update(name, error=error)
+        return {'name': name, 'done': done, 'error': error}
+
+
+def update_registry(projects, journal, path=REGISTRY_PATH):
+    """Write canvas IDs for provisioned projects into the sync registry. Returns names changed."""
+    registry = load_registry(path)
+    changed = []
+    for project in projects:
+        state = journal.get(project['name'])
+        if not state.get('canvas_id') or not project['local_path']:
+            continue
+        entry = registry_entry(project, state)
+        if registry.get(project['name']) != entry:
+            registry[project['name']] = entry
+            changed.append(project['name'])
+    if changed:
+        write_json(path, registry)
+    for name in changed:
+        journal.update(name, registered=True)
+    return changed
+
+
+def print_plan(projects, journal, registry):
+    print(f"{'project':<24} {'channel':<28} pending steps")
+    for project in projects:
+        steps = pending_steps(project, journal.get(project['name']), registry)
+        print(f"{project['name']:<24} #{project['channel']:<27} {', '.join(steps) or '✓ up to date'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Provision Slack channels and canvas tabs for projects/*',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--projects', metavar='PATTERNS', help='Comma-separated project names or globs (default: all)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Projects provisioned concurrently (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--dry-run', '-n', action='store_true', help='Show the plan without calling Slack')
+    parser.add_argument('--status', action='store_true', help='Show journalled state per project')
+
+    args = parser.parse_args()
+
+    projects = scan_projects(args.projects)
+    if not projects:
+        print(f"No projects found in {PROJECTS_DIR}" + (f" matching '{args.projects}'" if args.projects else ''))
+        sys.exit(1)
+
+    journal = Journal()
+    registry = load_registry()
+
+    if args.status:
+        for project in projects:
+            state = journal.get(project['name'])
+            print(f"{project['name']}: channel={state.get('channel_id', '-')} canvas={state.get('canvas_id', '-')} "
+                  f"registered={'yes' if project['name'] in registry else 'no'}"
+                  + (f" error={state['error']}" if state.get('error') else ''))
+        sys.exit(0)
+
+    print_plan(projects, journal, registry)
+    todo = [p for p in projects if pending_steps(p, journal.get(p['name']), registry)]
+    if args.dry_run or not todo:
+        sys.exit(0)
+
+    token = slack_client.get_token()
+    if not token:
+        print("Error: SLACK_BOT_TOKEN not found")
+        print("Set SLACK_BOT_TOKEN environment variable or add to .cursor/.api_keys.txt")
+        sys.exit(1)
+
+    client = slack_client.get_client(token)
+    limiter = RateLimiter()
+
+    # One directory fetch up front, so workers resolve names from the cache
+    if any(not journal.get(p['name']).get('channel_id') for p in todo):
+        limiter.acquire('conversations_list')
+        channel_cache.refresh_directory(client)
+
+    print(f"\nProvisioning {len(todo)} projects ({args.workers} workers)...")
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        results = list(pool.map(lambda p: provision_project(p, client, limiter, journal), todo))
+
+    registered = set(update_registry(projects, journal))
+
+    failed = 0
+    for result in results:
+        done = result['done'] + (['register'] if result['name'] in registered else [])
+        if result['error']:
+            failed += 1
+            print(f"✗ {result['name']}: {result['error']} (done: {', '.join(done) or 'nothing'})")
+        else:
+            print(f"✓ {result['name']}: {', '.join(done) or 'nothing to do'}")
+    if registered:
+        print(f"\n✓ Registered {len(registered)} canvases in {REGISTRY_PATH}")
+    if failed:
+        print(f"\n{failed} projects incomplete - re-run to retry the remaining steps")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
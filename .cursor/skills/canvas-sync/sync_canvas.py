@@ -5,23 +5,42 @@ Canvas Sync Tool - Bidirectional sync between markdown files and Slack canvases.
 Usage:
     python sync_canvas.py --project my-project --action check
     python sync_canvas.py --project my-project --action push
+    python sync_canvas.py --project my-project --action push --push-mode sections
     python sync_canvas.py --project my-project --action pull
+    python sync_canvas.py --project my-project --action check --parser bs4
+    python sync_canvas.py --all --action check
+    python sync_canvas.py --projects "proj-*,other" --action push --force
+    python sync_canvas.py --watch [--push-mode sections] [--force]
+    python sync_canvas.py --check-parsers saved_canvas.html
 """
 
 import os
+import re
 import sys
+import json
+import time
+import codecs
+import hashlib
 import argparse
-import requests
 from pathlib import Path
-from difflib import unified_diff
-from slack_sdk import WebClient
-from slack_sdk.errors import SlackApiError
+from fnmatch import fnmatch
+from functools import lru_cache
+from difflib import SequenceMatcher, unified_diff
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+
+# Token and client setup are shared with the slack-posting skill. slack_sdk,
+# requests and bs4 are imported on first use so --help, --check-parsers and
+# local-only paths start fast.
+sys.path.insert(0, str(Path(__file__).parent.parent / 'slack-posting'))
+import slack_client
+import slack_timings
 
 try:
-    from bs4 import BeautifulSoup
+    from inotify_simple import INotify, flags as inotify_flags
+    WATCH_FLAGS = inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO | inotify_flags.CREATE
 except ImportError:
-    print("Missing beautifulsoup4. Install with: pip install beautifulsoup4")
-    sys.exit(1)
+    INotify = None  # --watch falls back to polling file mtimes
 
 # Project registry - add your projects here
 PROJECTS = {
@@ -33,61 +52,264 @@ PROJECTS = {
     # Add more projects as needed
 }
 
-def get_token():
-    """Load Slack bot token from environment or .api_keys.txt"""
-    token = os.environ.get('SLACK_BOT_TOKEN')
-    if not token:
-        keys_file = Path(__file__).parent.parent.parent / '.api_keys.txt'
-        if keys_file.exists():
-            for line in keys_file.read_text().splitlines():
-                if line.startswith('SLACK_BOT_TOKEN='):
-                    token = line.split('=', 1)[1].strip()
-                    break
-    return token
-
-def read_canvas(client, canvas_id, token):
-    """Read canvas content and convert HTML to markdown-ish text."""
-    info = client.files_info(file=canvas_id)
-    url = info['file']['url_private']
-    headers = {'Authorization': f'Bearer {token}'}
-    response = requests.get(url, headers=headers)
-    
-    soup = BeautifulSoup(response.text, 'html.parser')
+# Projects written by provision_projects.py; entries override PROJECTS above
+REGISTRY_PATH = Path(os.environ.get('CANVAS_SYNC_REGISTRY', Path(__file__).parent / 'projects.json'))
+
+def load_registry(path=REGISTRY_PATH):
+    """Provisioned projects from the registry file ({} if missing or unreadable)."""
+    try:
+        data = json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        return {}
+    return {name: entry for name, entry in data.items()
+            if isinstance(entry, dict) and entry.get('canvas_id') and entry.get('local_path')}
+
+PROJECTS.update(load_registry())
+
+@lru_cache(maxsize=None)
+def load_beautifulsoup():
+    """BeautifulSoup class, or None if bs4 is not installed (only needed for --parser bs4 / fallback)."""
+    try:
+        from bs4 import BeautifulSoup
+    except ImportError:
+        return None
+    return BeautifulSoup
+
+# Elements read_canvas() turns into markdown lines
+CANVAS_TAGS = ('h1', 'h2', 'h3', 'li', 'p', 'hr')
+# Elements that never have an end tag
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link',
+             'meta', 'param', 'source', 'track', 'wbr'}
+# Elements whose text is not part of get_text()
+SKIP_TEXT_TAGS = {'script', 'style', 'template'}
+# Elements where BeautifulSoup keeps whitespace-only strings as-is
+PRESERVE_WHITESPACE_TAGS = {'pre', 'textarea'}
+ASCII_SPACES = ' \n\t\x0c\r'
+CHUNK_SIZE = 64 * 1024
+WORKSPACE_ROOT = Path(__file__).parent.parent.parent.parent
+# Section push (--push-mode sections): above these, replace the whole canvas
+MAX_SECTION_EDITS = 20
+MAX_SECTION_EDIT_RATIO = 0.5
+HEADING_RE = re.compile(r'^#{1,6}\s+')
+CHECKBOX_RE = re.compile(r'^[-*]\s+\[[ xX]\]\s*')
+BULLET_RE = re.compile(r'^(?:[-*+]|\d+[.)])\s+')
+# Per-project record of the last sync (canvas metadata, content hashes, local mtime)
+MANIFEST_DIR = Path(__file__).parent.parent.parent / '.canvas_sync'
+DEFAULT_WORKERS = 8  # Concurrent projects for --all / --projects
+# --watch timing (seconds)
+WATCH_DEBOUNCE = 3  # Quiet period after the last local save before pushing
+WATCH_POLL_MIN = 10  # Canvas metadata poll interval right after activity
+WATCH_POLL_MAX = 300  # ...backing off to this when idle
+WATCH_STAT_INTERVAL = 1  # mtime check interval without inotify
+
+
+def element_lines(name, text, classes, seen_headers):
+    """Markdown lines for one canvas element (shared by both converters)."""
+    if name == 'hr':
+        return ['---']
+    if name.startswith('h'):
+        text = text.strip()
+        if text in seen_headers:  # Skip duplicate headers
+            return []
+        seen_headers.add(text)
+        return ['', '#' * int(name[1]) + ' ' + text, '']
+    if name == 'li':
+        checkbox = '[x]' if 'checked' in classes else '[ ]'
+        return [f'- {checkbox} {text.strip()}']
+    text = text.strip()
+    return [text] if text else []
+
+
+class CanvasMarkdownParser(HTMLParser):
+    """Incremental canvas HTML → markdown converter.
+
+    Produces the same output as the BeautifulSoup walk in html_to_markdown()
+    (document order, nested elements emitted after their parent, duplicate
+    headers dropped) without building a tree, so HTML can be fed in chunks.
+    Text is buffered until the next tag, comment or declaration, like
+    BeautifulSoup's strings, so whitespace-only runs collapse the same way.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack = []  # open elements: (name, entry or None)
+        self.entries = []  # [name, classes, text parts] in start-tag order
+        self.open_entries = []  # entries still collecting text
+        self.skip_depth = 0
+        self.preserve_depth = 0
+        self.pending = []  # text since the last tag/comment/declaration
+
+    def flush_text(self):
+        """End the current string, as BeautifulSoup.endData() does."""
+        if not self.pending:
+            return
+        text = ''.join(self.pending)
+        self.pending = []
+        if not self.preserve_depth and not text.strip(ASCII_SPACES):
+            text = '\n' if '\n' in text else ' '
+        if self.skip_depth:
+            return
+        for entry in self.open_entries:
+            entry[2].append(text)
+
+    def handle_starttag(self, tag, attrs):
+        self.flush_text()
+        if tag in VOID_TAGS:
+            if tag == 'hr':
+                self.entries.append(['hr', [], []])
+            return
+        entry = None
+        if tag in CANVAS_TAGS:
+            classes = (dict(attrs).get('class') or '').split()
+            entry = [tag, classes, []]
+            self.entries.append(entry)
+            self.open_entries.append(entry)
+        if tag in SKIP_TEXT_TAGS:
+            self.skip_depth += 1
+        if tag in PRESERVE_WHITESPACE_TAGS:
+            self.preserve_depth += 1
+        self.stack.append((tag, entry))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        # Like BeautifulSoup, close everything up to the matching open tag
+        # and ignore end tags that were never opened
+        self.flush_text()
+        if not any(name == tag for name, _ in self.stack):
+            return
+        while self.stack:
+            name, entry = self.stack.pop()
+            if entry is not None:
+                self.open_entries.remove(entry)
+            if name in SKIP_TEXT_TAGS:
+                self.skip_depth -= 1
+            if name in PRESERVE_WHITESPACE_TAGS:
+                self.preserve_depth -= 1
+            if name == tag:
+                break
+
+    def handle_data(self, data):
+        self.pending.append(data)
+
+    def handle_comment(self, data):
+        # Comments, doctypes and processing instructions end the current
+        # string but are not part of get_text()
+        self.flush_text()
+
+    handle_decl = handle_pi = handle_comment
+
+    def unknown_decl(self, data):
+        # <![CDATA[...]]> reaches here; BeautifulSoup keeps it as a separate
+        # CData string that get_text() includes, verbatim (no entity decoding)
+        self.flush_text()
+        if data.startswith('CDATA['):
+            self.pending.append(data[len('CDATA['):])
+            self.flush_text()
+
+    def markdown(self):
+        self.flush_text()
+        lines = []
+        seen_headers = set()
+        for name, classes, parts in self.entries:
+            lines.extend(element_lines(name, ''.join(parts), classes, seen_headers))
+        return '\n'.join(lines).strip()
+
+
+def stream_to_markdown(chunks, encoding='utf-8'):
+    """Convert an iterable of HTML byte (or str) chunks to markdown."""
+    parser = CanvasMarkdownParser()
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    for chunk in chunks:
+        if isinstance(chunk, bytes):
+            chunk = decoder.decode(chunk)
+        if chunk:
+            parser.feed(chunk)
+    parser.feed(decoder.decode(b'', final=True))
+    parser.close()
+    return parser.markdown()
+
+
+def html_to_markdown(html):
+    """Convert canvas HTML to markdown with BeautifulSoup (fallback path)."""
+    BeautifulSoup = load_beautifulsoup()
+    if BeautifulSoup is None:
+        raise ImportError("Missing beautifulsoup4. Install with: pip install beautifulsoup4")
+    soup = BeautifulSoup(html, 'html.parser')
     
     lines = []
     seen_headers = set()  # Dedupe duplicate headers
     
-    for elem in soup.find_all(['h1', 'h2', 'h3', 'li', 'p', 'hr']):
-        if elem.name == 'hr':
-            lines.append('---')
-        elif elem.name.startswith('h'):
-            text = elem.get_text().strip()
-            if text not in seen_headers:  # Skip duplicate headers
-                seen_headers.add(text)
-                level = int(elem.name[1])
-                lines.append('')
-                lines.append('#' * level + ' ' + text)
-                lines.append('')
-        elif elem.name == 'li':
-            classes = elem.get('class', [])
-            checked = 'checked' in classes
-            checkbox = '[x]' if checked else '[ ]'
-            text = elem.get_text().strip()
-            lines.append(f'- {checkbox} {text}')
-        elif elem.name == 'p':
-            text = elem.get_text().strip()
-            if text:
-                lines.append(text)
+    for elem in soup.find_all(list(CANVAS_TAGS)):
+        lines.extend(element_lines(elem.name, elem.get_text(), elem.get('class', []), seen_headers))
     
     return '\n'.join(lines).strip()
 
+
+def read_canvas(client, canvas_id, token, parser='stream', session=None, file_info=None):
+    """Read canvas content and convert HTML to markdown-ish text.
+
+    The default 'stream' parser converts the download chunk by chunk; 'bs4'
+    loads the whole body into BeautifulSoup. A streaming failure falls back
+    to BeautifulSoup when it is installed. Pass a requests.Session to reuse
+    keep-alive connections across canvases. `file_info` skips the
+    files_info call when the caller already has the file object.
+    """
+    http = session
+    if http is None:
+        import requests as http
+    if file_info is None:
+        file_info = client.files_info(file=canvas_id)['file']
+    url = file_info['url_private']
+    headers = {'Authorization': f'Bearer {token}'}
+    
+    if parser == 'stream':
+        started = time.perf_counter()
+        with http.get(url, headers=headers, stream=True) as response:
+            try:
+                with slack_timings.streamed('url_private', response.iter_content(chunk_size=CHUNK_SIZE),
+                                            started, status=response.status_code) as chunks:
+                    return stream_to_markdown(chunks, response.encoding or 'utf-8')
+            except (AssertionError, ValueError, LookupError) as e:
+                if load_beautifulsoup() is None:
+                    raise
+                print(f"  Warning: streaming parse failed ({e}), retrying with BeautifulSoup")
+    
+    with slack_timings.timed('http', 'url_private') as timing:
+        response = http.get(url, headers=headers)
+        timing.update(status=response.status_code, bytes=len(response.content))
+    with slack_timings.timed('phase', 'parse'):
+        return html_to_markdown(response.text)
+
+
+def check_parsers(html_path):
+    """Compare the streaming and BeautifulSoup converters on a saved canvas HTML file."""
+    html = Path(html_path).read_bytes()
+    streamed = stream_to_markdown(html[i:i + 4096] for i in range(0, len(html), 4096))
+    reference = html_to_markdown(html.decode('utf-8', errors='replace'))
+    if streamed == reference:
+        print(f"✓ Converters agree ({len(reference.splitlines())} lines)")
+        return True
+    print("✗ Converters differ:")
+    print('\n'.join(unified_diff(reference.splitlines(), streamed.splitlines(),
+                                  fromfile='bs4', tofile='stream', lineterm='')))
+    return False
+
 def read_local(path):
     """Read local TODO.md file."""
-    workspace_root = Path(__file__).parent.parent.parent.parent
-    full_path = workspace_root / path
+    full_path = WORKSPACE_ROOT / path
     if not full_path.exists():
         raise FileNotFoundError(f"Local file not found: {full_path}")
-    return full_path.read_text().strip()
+    with slack_timings.timed('phase', 'read_local'):
+        return full_path.read_text().strip()
+
+def write_local(path, content):
+    """Overwrite local TODO.md file."""
+    with slack_timings.timed('phase', 'write_local'):
+        (WORKSPACE_ROOT / path).write_text(content)
 
 def push_to_canvas(client, canvas_id, markdown_content):
     """Push markdown content to canvas."""
@@ -102,6 +324,270 @@ def push_to_canvas(client, canvas_id, markdown_content):
         }]
     )
 
+def split_sections(markdown):
+    """Split markdown into [(heading line or None, [body lines])] by headings.
+
+    Blank lines are dropped: they don't become canvas sections.
+    """
+    sections = [(None, [])]
+    for line in markdown.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if HEADING_RE.match(line):
+            sections.append((line, []))
+        else:
+            sections[-1][1].append(line)
+    if sections[0] == (None, []):
+        sections.pop(0)
+    return sections
+
+def section_lookup_text(line):
+    """Plain text used to find a markdown line's canvas section."""
+    for pattern in (HEADING_RE, CHECKBOX_RE, BULLET_RE):
+        match = pattern.match(line)
+        if match:
+            return line[match.end():].strip()
+    return line
+
+def lookup_section_id(client, canvas_id, line):
+    """Canvas section ID for a markdown line, or None if missing or ambiguous."""
+    text = section_lookup_text(line)
+    if not text:
+        return None
+    criteria = {'contains_text': text}
+    if HEADING_RE.match(line):
+        criteria['section_types'] = ['any_header']
+    result = client.canvases_sections_lookup(canvas_id=canvas_id, criteria=criteria)
+    sections = result.get('sections', [])
+    return sections[0]['id'] if len(sections) == 1 else None
+
+def markdown_change(operation, markdown=None, anchor=None):
+    """One canvases.edit change; `anchor` is the line whose section it targets."""
+    change = {'operation': operation}
+    if markdown is not None:
+        change['document_content'] = {'type': 'markdown', 'markdown': markdown}
+    return change, anchor
+
+def plan_line_edits(old_lines, new_lines, anchor):
+    """Line-level edits turning old_lines into new_lines.
+
+    `anchor` is the line just before old_lines on the canvas (the section
+    heading), or None at the start of the document.
+    """
+    edits = []
+    matcher = SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            continue
+        if tag == 'replace' and i2 - i1 == j2 - j1:
+            for old, new in zip(old_lines[i1:i2], new_lines[j1:j2]):
+                edits.append(markdown_change('replace', new, old))
+            continue
+        for old in old_lines[i1:i2]:
+            edits.append(markdown_change('delete', anchor=old))
+        if j2 > j1:
+            previous = old_lines[i1 - 1] if i1 > 0 else anchor
+            markdown = '\n'.join(new_lines[j1:j2])
+            if previous is None:
+                edits.append(markdown_change('insert_at_start', markdown))
+            else:
+                edits.append(markdown_change('insert_after', markdown, previous))
+    return edits
+
+def plan_section_edits(old_markdown, new_markdown):
+    """Edits turning the last-synced markdown into the local markdown.
+
+    Sections are matched by heading; unchanged sections are skipped and
+    changed ones are diffed line by line. New sections are inserted before
+    the next surviving heading (or at the end). Returns None when the
+    structure diverged too much for targeted edits to be worthwhile.
+    """
+    old_sections = split_sections(old_markdown)
+    new_sections = split_sections(new_markdown)
+    old_keys = [heading for heading, _ in old_sections]
+    new_keys = [heading for heading, _ in new_sections]
+    # Headings must be unique to be addressed by lookup
+    if len(set(old_keys)) != len(old_keys) or len(set(new_keys)) != len(new_keys):
+        return None
+
+    edits = []
+    pending_inserts = []
+
+    def flush_inserts(next_heading):
+        if not pending_inserts:
+            return
+        markdown = '\n'.join(pending_inserts)
+        if next_heading is None:
+            edits.append(markdown_change('insert_at_end', markdown))
+        else:
+            edits.append(markdown_change('insert_before', markdown, next_heading))
+        pending_inserts.clear()
+
+    matcher = SequenceMatcher(None, old_keys, new_keys, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            flush_inserts(old_keys[i1])
+            for (heading, old_body), (_, new_body) in zip(old_sections[i1:i2], new_sections[j1:j2]):
+                if old_body != new_body:
+                    edits.extend(plan_line_edits(old_body, new_body, heading))
+            continue
+        for heading, body in old_sections[i1:i2]:
+            for line in ([heading] if heading else []) + body:
+                edits.append(markdown_change('delete', anchor=line))
+        for heading, body in new_sections[j1:j2]:
+            pending_inserts.extend(([heading] if heading else []) + body)
+    flush_inserts(None)
+
+    total_lines = sum(len(body) + 1 for _, body in new_sections) or 1
+    if len(edits) > MAX_SECTION_EDITS or len(edits) > total_lines * MAX_SECTION_EDIT_RATIO:
+        return None
+    return edits
+
+def push_sections(client, canvas_id, synced_markdown, markdown_content):
+    """Push only the sections that changed since the last sync.
+
+    Resolves every target section ID before editing, so an ambiguous or
+    missing section means nothing is sent. Returns the number of edits
+    applied, or None if the caller should fall back to a full replace.
+    """
+    with slack_timings.timed('phase', 'diff'):
+        plan = plan_section_edits(synced_markdown, markdown_content)
+    if plan is None:
+        return None
+
+    section_ids = {}
+    changes = []
+    for change, anchor in plan:
+        if anchor is not None:
+            if anchor not in section_ids:
+                section_ids[anchor] = lookup_section_id(client, canvas_id, anchor)
+            if section_ids[anchor] is None:
+                return None
+            change['section_id'] = section_ids[anchor]
+        changes.append(change)
+
+    # One change per call; a failure part-way raises and the caller's
+    # full replace restores a consistent canvas
+    for change in changes:
+        client.canvases_edit(canvas_id=canvas_id, changes=[change])
+    return len(changes)
+
+def push_changes(client, canvas_id, markdown_content, manifest, mode='full'):
+    """Push local content to the canvas and record it as the synced baseline.
+
+    mode 'sections' sends targeted per-section edits against the manifest's
+    last-synced markdown, but only when the canvas as last read still
+    matches that baseline; otherwise (edited in Slack since, no baseline,
+    or the structure diverged) it falls back to a whole-document replace.
+
+    Returns:
+        Short description of what was sent
+    """
+    sent = None
+    baseline = manifest.get('synced_markdown')
+    if mode == 'sections' and baseline is not None:
+        if manifest.get('canvas_hash') != content_hash(baseline):
+            print("  Canvas differs from the last-synced content, replacing whole canvas")
+        else:
+            try:
+                count = push_sections(client, canvas_id, baseline, markdown_content)
+                if count is not None:
+                    sent = f"{count} section edit{'s' if count != 1 else ''}"
+            except slack_client.SlackApiError as e:
+                print(f"  Warning: section edit failed ({e.response.get('error')}), replacing whole canvas")
+    if sent is None:
+        push_to_canvas(client, canvas_id, markdown_content)
+        sent = 'full replace'
+    manifest['synced_markdown'] = markdown_content
+    # The canvas now holds what we sent; the next read downloads it again
+    manifest['canvas_hash'] = content_hash(markdown_content)
+    mark_canvas_changed(manifest)
+    return sent
+
+def manifest_path(name):
+    return MANIFEST_DIR / f'{name}.json'
+
+def load_manifest(name):
+    """Last-sync manifest for a project ({} if none)."""
+    try:
+        with slack_timings.timed('phase', 'manifest_load'):
+            return json.loads(manifest_path(name).read_text())
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(name, manifest):
+    MANIFEST_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = manifest_path(name).with_suffix(f'.{os.getpid()}.tmp')
+    with slack_timings.timed('phase', 'manifest_save'):
+        tmp_path.write_text(json.dumps(manifest, indent=1))
+        os.replace(tmp_path, manifest_path(name))
+
+def content_hash(text):
+    return hashlib.sha256(normalize_for_comparison(text).encode()).hexdigest()
+
+def read_canvas_cached(client, canvas_id, token, manifest, parser='stream', session=None):
+    """Read a canvas, skipping the download when files_info shows it unchanged.
+
+    Compares the canvas `updated` timestamp and size with the manifest and
+    reuses the stored markdown on a match. Updates `manifest` in place.
+
+    Returns:
+        (markdown, was_cached)
+    """
+    info = client.files_info(file=canvas_id)['file']
+    updated, size = info.get('updated'), info.get('size')
+    if (updated is not None and 'canvas_markdown' in manifest
+            and manifest.get('canvas_updated') == updated
+            and manifest.get('canvas_size') == size):
+        return manifest['canvas_markdown'], True
+
+    content = read_canvas(client, canvas_id, token, parser, session, file_info=info)
+    manifest.update({
+        'canvas_updated': updated,
+        'canvas_size': size,
+        'canvas_hash': content_hash(content),
+        'canvas_markdown': content,
+    })
+    return content, False
+
+def record_local(manifest, path, content):
+    """Store the local file's stat and content in the manifest."""
+    st = (WORKSPACE_ROOT / path).stat()
+    manifest.update({
+        'local_mtime': st.st_mtime_ns,
+        'local_size': st.st_size,
+        'local_hash': content_hash(content),
+        'local_markdown': content,
+    })
+
+def read_local_cached(path, manifest):
+    """Read the local file unless its mtime and size match the manifest.
+
+    Returns:
+        (content, was_cached)
+    """
+    full_path = WORKSPACE_ROOT / path
+    if not full_path.exists():
+        raise FileNotFoundError(f"Local file not found: {full_path}")
+    st = full_path.stat()
+    if ('local_markdown' in manifest
+            and manifest.get('local_mtime') == st.st_mtime_ns
+            and manifest.get('local_size') == st.st_size):
+        return manifest['local_markdown'], True
+
+    content = read_local(path)
+    record_local(manifest, path, content)
+    return content, False
+
+def mark_canvas_changed(manifest):
+    """Force a fresh download next time (e.g. after we edited the canvas)."""
+    manifest.pop('canvas_updated', None)
+
+def sources_differ(manifest):
+    """Compare normalized canvas and local content by their stored hashes."""
+    return manifest['canvas_hash'] != manifest['local_hash']
+
 def normalize_for_comparison(text):
     """Normalize text for comparison (ignore whitespace differences)."""
     lines = [line.strip() for line in text.splitlines() if line.strip()]
@@ -112,12 +598,13 @@ def show_diff(local_content, canvas_content):
     local_lines = local_content.splitlines(keepends=True)
     canvas_lines = canvas_content.splitlines(keepends=True)
     
-    diff = list(unified_diff(
-        canvas_lines, local_lines,
-        fromfile='canvas (Slack)',
-        tofile='local (TODO.md)',
-        lineterm=''
-    ))
+    with slack_timings.timed('phase', 'diff'):
+        diff = list(unified_diff(
+            canvas_lines, local_lines,
+            fromfile='canvas (Slack)',
+            tofile='local (TODO.md)',
+            lineterm=''
+        ))
     
     if diff:
         print('\n'.join(diff))
@@ -126,53 +613,389 @@ def show_diff(local_content, canvas_content):
     
     return len(diff) > 0
 
+def select_projects(patterns):
+    """Project names matching comma-separated names or glob patterns, in registry order."""
+    wanted = [p.strip() for p in patterns.split(',') if p.strip()]
+    return [name for name in PROJECTS if any(fnmatch(name, p) for p in wanted)]
+
+def make_session(pool_size):
+    """Shared keep-alive HTTP session sized for the worker pool."""
+    import requests
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+def fetch_project(name, client, token, parser, session):
+    """Read canvas and local content for one project. Never raises."""
+    project = PROJECTS[name]
+    result = {'name': name, 'project': project, 'error': None, 'has_diff': None, 'status': ''}
+    start = time.monotonic()
+    manifest = result['manifest'] = load_manifest(name)
+    try:
+        result['canvas'], _ = read_canvas_cached(client, project['canvas_id'], token, manifest, parser, session)
+        result['local'], _ = read_local_cached(project['local_path'], manifest)
+        result['has_diff'] = sources_differ(manifest)
+        if not result['has_diff']:
+            manifest['synced_markdown'] = result['local']
+        save_manifest(name, manifest)
+    except Exception as e:
+        result['error'] = str(e)
+        result['status'] = f'error: {e}'
+    result['seconds'] = time.monotonic() - start
+    return result
+
+def apply_action(result, action, client, push_mode='full'):
+    """Push or pull one project whose sources differ. Sets result['status']."""
+    project = result['project']
+    start = time.monotonic()
+    try:
+        if action == 'push':
+            sent = push_changes(client, project['canvas_id'], result['local'], result['manifest'], push_mode)
+            result['status'] = f'pushed ({sent})'
+        else:
+            write_local(project['local_path'], result['canvas'])
+            record_local(result['manifest'], project['local_path'], result['canvas'])
+            result['manifest']['synced_markdown'] = result['canvas']
+            result['status'] = 'pulled'
+        save_manifest(result['name'], result['manifest'])
+    except Exception as e:
+        result['error'] = str(e)
+        result['status'] = f'error: {e}'
+    result['seconds'] += time.monotonic() - start
+    return result
+
+def print_status_table(results):
+    """Consolidated per-project status table."""
+    width = max([len('Project')] + [len(r['name']) for r in results])
+    print(f"{'Project':<{width}}  {'Diff':<4}  {'Time':>6}  Status")
+    print(f"{'-' * width}  ----  ------  ------")
+    for r in results:
+        diff = '-' if r['has_diff'] is None else ('yes' if r['has_diff'] else 'no')
+        print(f"{r['name']:<{width}}  {diff:<4}  {r['seconds']:>5.1f}s  {r['status']}")
+
+def sync_many(names, action, force, parser, client, token, workers, push_mode='full'):
+    """Run check/push/pull across several projects concurrently.
+
+    Reads run on a bounded thread pool sharing one WebClient and one
+    keep-alive requests.Session. Diffs and confirmation prompts are shown
+    per project in registry order; with --force, pushes/pulls also run
+    concurrently. Returns True if no project errored.
+    """
+    session = make_session(workers)
+    print(f"📋 Canvas Sync: {len(names)} projects ({action})")
+    print()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda n: fetch_project(n, client, token, parser, session), names))
+
+        to_apply = []
+        for r in results:
+            if r['error']:
+                continue
+            if not r['has_diff']:
+                r['status'] = 'in sync'
+                continue
+            if action == 'check':
+                r['status'] = 'differs'
+                print(f"=== {r['name']}: differences ===")
+                show_diff(r['local'], r['canvas'])
+                print()
+                continue
+
+            arrow = 'local → canvas' if action == 'push' else 'canvas → local'
+            print(f"=== {r['name']}: changes to {action} ({arrow}) ===")
+            if action == 'push':
+                show_diff(r['local'], r['canvas'])
+            else:
+                show_diff(r['canvas'], r['local'])
+            if not force:
+                confirm = input(f"\n{action.capitalize()} {r['name']}? [y/N] ")
+                print()
+                if confirm.lower() != 'y':
+                    r['status'] = 'skipped'
+                    continue
+                apply_action(r, action, client, push_mode)
+            else:
+                print()
+                to_apply.append(r)
+
+        # Confirmed up front with --force, so apply concurrently
+        list(pool.map(lambda r: apply_action(r, action, client, push_mode), to_apply))
+
+    print_status_table(results)
+    return not any(r['error'] for r in results)
+
+class LocalWatcher:
+    """Report changed local files, via inotify when available, else by polling mtimes.
+
+    A file whose directory doesn't exist yet is polled (its paths are listed in
+    `polled`) until the directory appears, and then watched with inotify.
+    """
+
+    def __init__(self, paths):
+        self.paths = {Path(p).resolve() for p in paths}
+        self.inotify = None
+        self.dirs = {}
+        polled = self.paths
+        if INotify is not None:
+            self.inotify = INotify()
+            # Watch directories: editors often save by writing a temp file and renaming it
+            missing = {directory for directory in {p.parent for p in self.paths} if not self._watch(directory)}
+            polled = {p for p in self.paths if p.parent in missing}
+        self.mtimes = {p: self._mtime(p) for p in polled}
+
+    @property
+    def polled(self):
+        return set(self.mtimes)
+
+    def _watch(self, directory):
+        try:
+            wd = self.inotify.add_watch(str(directory), WATCH_FLAGS)
+        except OSError:
+            return False
+        self.dirs[wd] = directory
+        return True
+
+    @staticmethod
+    def _mtime(path):
+        try:
+            return path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def wait(self, timeout):
+        """Block up to `timeout` seconds; return the set of changed watched paths."""
+        changed = set()
+        if self.mtimes:
+            timeout = min(timeout, WATCH_STAT_INTERVAL)
+        if self.inotify is not None:
+            for event in self.inotify.read(timeout=max(0, int(timeout * 1000))):
+                path = self.dirs.get(event.wd, Path()) / event.name
+                if path in self.paths:
+                    changed.add(path)
+        else:
+            time.sleep(timeout)
+
+        for path in list(self.mtimes):
+            mtime = self._mtime(path)
+            if mtime != self.mtimes[path]:
+                self.mtimes[path] = mtime
+                changed.add(path)
+            if self.inotify is not None and path.parent.is_dir() and \
+                    (path.parent in self.dirs.values() or self._watch(path.parent)):
+                del self.mtimes[path]
+        return changed
+
+
+def watch_projects(names, client, token, parser='stream', push_mode='full', force=False):
+    """Long-running sync: push debounced local edits, poll canvases for remote edits.
+
+    Local saves are collected for WATCH_DEBOUNCE seconds and pushed once.
+    Canvas metadata is polled every WATCH_POLL_MIN seconds after activity,
+    backing off to WATCH_POLL_MAX when idle. When both sides changed since
+    the last sync, the conflict is reported and neither side is touched.
+    Remote-only changes are pulled with --force, otherwise reported.
+    """
+    session = make_session(len(names))
+    states = {}
+    for name in names:
+        result = fetch_project(name, client, token, parser, session)
+        manifest = result['manifest']
+        states[name] = {
+            'name': name,
+            'project': PROJECTS[name],
+            'manifest': manifest,
+            'canvas_updated': manifest.get('canvas_updated'),
+            'due': None,
+            'reported': None,
+        }
+        status = result['status'] or ('differs - run --action check' if result['has_diff'] else 'in sync')
+        print(f"👀 {name}: {status}")
+
+    by_path = {(WORKSPACE_ROOT / s['project']['local_path']).resolve(): s for s in states.values()}
+    watcher = LocalWatcher(by_path)
+    mode = 'inotify' if watcher.inotify is not None else 'polling'
+    if watcher.inotify is not None:
+        for path in sorted(watcher.polled):
+            print(f"⚠️  {by_path[path]['name']}: {path.parent} does not exist yet; polling until it does")
+    print(f"\nWatching {len(states)} project(s) ({mode}); Ctrl-C to stop\n")
+
+    poll_interval = WATCH_POLL_MIN
+    next_poll = time.monotonic() + poll_interval
+
+    def local_changed(state):
+        content = read_local(state['project']['local_path'])
+        baseline = state['manifest'].get('synced_markdown')
+        if baseline is None:
+            baseline = state['manifest'].get('canvas_markdown', '')
+        return content, content_hash(content) != content_hash(baseline)
+
+    def canvas_updated(state):
+        return client.files_info(file=state['project']['canvas_id'])['file'].get('updated')
+
+    def push_due(state):
+        state['due'] = None
+        content, changed = local_changed(state)
+        if not changed:
+            return
+        updated = canvas_updated(state)
+        if updated != state['canvas_updated']:
+            if state['reported'] != updated:
+                state['reported'] = updated
+                print(f"⚠️  {state['name']}: conflict - canvas and local both changed; "
+                      f"resolve with --action check")
+            return
+        sent = push_changes(client, state['project']['canvas_id'], content, state['manifest'], push_mode)
+        # Remember our own edit so the next poll doesn't treat it as remote
+        state['canvas_updated'] = canvas_updated(state)
+        save_manifest(state['name'], state['manifest'])
+        print(f"✓ {state['name']}: pushed ({sent})")
+
+    def poll(state):
+        updated = canvas_updated(state)
+        if updated == state['canvas_updated'] or state['reported'] == updated:
+            return False
+        _, changed = local_changed(state)
+        if changed:
+            state['reported'] = updated
+            print(f"⚠️  {state['name']}: conflict - canvas and local both changed; "
+                  f"resolve with --action check")
+        elif force:
+            content, _ = read_canvas_cached(client, state['project']['canvas_id'], token,
+                                            state['manifest'], parser, session)
+            write_local(state['project']['local_path'], content)
+            record_local(state['manifest'], state['project']['local_path'], content)
+            state['manifest']['synced_markdown'] = content
+            state['canvas_updated'] = updated
+            save_manifest(state['name'], state['manifest'])
+            print(f"✓ {state['name']}: pulled canvas changes")
+        else:
+            state['reported'] = updated
+            print(f"ℹ️  {state['name']}: canvas changed - run --action pull (or --watch --force)")
+        return True
+
+    try:
+        while True:
+            now = time.monotonic()
+            deadlines = [next_poll] + [s['due'] for s in states.values() if s['due']]
+            for path in watcher.wait(max(0, min(deadlines) - now)):
+                by_path[path]['due'] = time.monotonic() + WATCH_DEBOUNCE
+                poll_interval = WATCH_POLL_MIN
+                next_poll = min(next_poll, time.monotonic() + poll_interval)
+
+            now = time.monotonic()
+            for state in states.values():
+                if state['due'] and state['due'] <= now:
+                    try:
+                        push_due(state)
+                    except Exception as e:
+                        print(f"✗ {state['name']}: push failed: {e}")
+
+            if now >= next_poll:
+                activity = False
+                for state in states.values():
+                    try:
+                        activity = poll(state) or activity
+                    except Exception as e:
+                        print(f"✗ {state['name']}: poll failed: {e}")
+                poll_interval = WATCH_POLL_MIN if activity else min(poll_interval * 2, WATCH_POLL_MAX)
+                next_poll = time.monotonic() + poll_interval
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+
 def main():
     parser = argparse.ArgumentParser(description='Sync TODO.md with Slack canvas')
-    parser.add_argument('--project', '-p', required=True, choices=list(PROJECTS.keys()),
+    parser.add_argument('--project', '-p', choices=list(PROJECTS.keys()),
                         help='Project to sync')
-    parser.add_argument('--action', '-a', required=True, choices=['check', 'push', 'pull'],
+    parser.add_argument('--all', action='store_true',
+                        help='Sync every registered project concurrently')
+    parser.add_argument('--projects', metavar='PATTERNS',
+                        help='Comma-separated project names or globs to sync concurrently')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Concurrent projects for --all/--projects (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--action', '-a', choices=['check', 'push', 'pull'],
                         help='Action: check (show diff), push (local→canvas), pull (canvas→local)')
+    parser.add_argument('--watch', action='store_true',
+                        help='Keep running: push local edits, poll canvases (all projects unless '
+                             '--project/--projects given)')
     parser.add_argument('--force', '-f', action='store_true',
                         help='Skip confirmation prompts')
+    parser.add_argument('--push-mode', choices=['full', 'sections'], default='full',
+                        help='full: replace the whole canvas; sections: edit only changed sections '
+                             '(falls back to full when the structure diverged)')
+    parser.add_argument('--parser', choices=['stream', 'bs4'], default='stream',
+                        help='Canvas HTML converter (default: stream)')
+    parser.add_argument('--check-parsers', metavar='HTML_FILE',
+                        help='Check that both converters give the same markdown for a saved canvas')
+    slack_timings.add_argument(parser)
     
     args = parser.parse_args()
+    slack_timings.configure(args)
     
-    project = PROJECTS[args.project]
-    token = get_token()
+    if args.check_parsers:
+        sys.exit(0 if check_parsers(args.check_parsers) else 1)
+    
+    if not args.watch and (not args.action or not (args.project or args.all or args.projects)):
+        parser.error('--action and one of --project/--all/--projects are required')
+    
+    token = slack_client.get_token()
     
     if not token:
         print("Error: SLACK_BOT_TOKEN not found")
         sys.exit(1)
     
-    client = WebClient(token=token)
+    client = slack_client.get_client(token)
+    
+    if args.watch:
+        if args.project:
+            names = [args.project]
+        elif args.projects:
+            names = select_projects(args.projects)
+        else:
+            names = list(PROJECTS)
+        watch_projects(names, client, token, args.parser, args.push_mode, args.force)
+        return
+    
+    if args.all or args.projects:
+        names = list(PROJECTS) if args.all else select_projects(args.projects)
+        if not names:
+            print(f"Error: No projects match '{args.projects}'")
+            sys.exit(1)
+        ok = sync_many(names, args.action, args.force, args.parser, client, token,
+                       args.workers, args.push_mode)
+        sys.exit(0 if ok else 1)
+    
+    project = PROJECTS[args.project]
     
     print(f"📋 Canvas Sync: {args.project}")
     print(f"   Canvas ID: {project['canvas_id']}")
     print(f"   Local: {project['local_path']}")
     print()
     
-    # Read both sources
+    # Read both sources (skipping anything unchanged since the last sync)
+    manifest = load_manifest(args.project)
     try:
-        canvas_content = read_canvas(client, project['canvas_id'], token)
-        print("✓ Read canvas from Slack")
+        canvas_content, cached = read_canvas_cached(client, project['canvas_id'], token, manifest, args.parser)
+        print("✓ Canvas unchanged since last sync" if cached else "✓ Read canvas from Slack")
     except Exception as e:
         print(f"✗ Failed to read canvas: {e}")
         sys.exit(1)
     
     try:
-        local_content = read_local(project['local_path'])
-        print("✓ Read local TODO.md")
+        local_content, cached = read_local_cached(project['local_path'], manifest)
+        print("✓ Local TODO.md unchanged since last sync" if cached else "✓ Read local TODO.md")
     except Exception as e:
         print(f"✗ Failed to read local file: {e}")
         sys.exit(1)
     
-    print()
-    
     # Compare
-    local_normalized = normalize_for_comparison(local_content)
-    canvas_normalized = normalize_for_comparison(canvas_content)
-    
-    has_diff = local_normalized != canvas_normalized
+    has_diff = sources_differ(manifest)
+    if not has_diff:
+        manifest['synced_markdown'] = local_content
+    save_manifest(args.project, manifest)
+    print()
     
     if args.action == 'check':
         print("=== Differences ===")
@@ -192,8 +1015,9 @@ def main():
                 print("Aborted.")
                 return
         
-        push_to_canvas(client, project['canvas_id'], local_content)
-        print("✓ Pushed to canvas")
+        sent = push_changes(client, project['canvas_id'], local_content, manifest, args.push_mode)
+        save_manifest(args.project, manifest)
+        print(f"✓ Pushed to canvas ({sent})")
         
     elif args.action == 'pull':
         if not has_diff:
@@ -209,9 +1033,10 @@ def main():
                 print("Aborted.")
                 return
         
-        workspace_root = Path(__file__).parent.parent.parent.parent
-        full_path = workspace_root / project['local_path']
-        full_path.write_text(canvas_content)
+        write_local(project['local_path'], canvas_content)
+        record_local(manifest, project['local_path'], canvas_content)
+        manifest['synced_markdown'] = canvas_content
+        save_manifest(args.project, manifest)
         print(f"✓ Updated {project['local_path']}")
 
 if __name__ == '__main__':
@@ -0,0 +1,518 @@
+#!/usr/bin/env python3
+"""
+Mirror a Google Drive folder tree to a local directory, concurrently and resumably.
+
+Lists the folder recursively (files.list, 1000 per page, subfolders listed in
+parallel), then downloads new or changed files through a bounded thread pool.
+Each download streams to disk in 1 MiB chunks instead of being buffered in
+memory:
+
+- Partial downloads are kept under DEST/.drive_partial/. An interrupted
+  transfer, whether a dropped connection or a killed run, continues with a
+  Range request from the bytes already on disk.
+- Finished files are checked against Drive's md5Checksum before they are
+  moved into place.
+
+DEST/.drive_mirror.json is the manifest. It maps each file ID to the local
+path, modifiedTime, md5 and size it was mirrored at, and is saved every few
+files, so a re-run (or a resumed one) fetches only what changed:
+- a file whose md5 still matches is skipped, even if its modifiedTime moved;
+- a renamed or moved file is renamed locally instead of downloaded again;
+- a file trashed in Drive is reported, and deleted locally only with --delete.
+
+Google Docs/Sheets/Slides have no binary content. They are exported
+(docx/xlsx/pptx) when their modifiedTime changes; --no-export skips them.
+
+Auth: DRIVE_ACCESS_TOKEN (e.g. from `gcloud auth print-access-token`), or a
+service account JSON (--credentials, GOOGLE_APPLICATION_CREDENTIALS, or
+.cursor/.api_keys/service-account.json; needs `pip install google-auth`).
+DRIVE_API_URL points the tool at another endpoint, e.g. fake_drive.py.
+
+Usage:
+    python drive_mirror.py FOLDER_ID artifacts/drive/grant-docs
+    python drive_mirror.py FOLDER_ID artifacts/drive/grant-docs --workers 8 --delete
+    python drive_mirror.py FOLDER_ID artifacts/drive/grant-docs --dry-run
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from datetime import datetime
+from pathlib import Path
+
+API_URL = os.environ.get('DRIVE_API_URL', 'https://www.googleapis.com/drive/v3').rstrip('/')
+CREDENTIALS_PATH = Path(__file__).parent.parent.parent / '.api_keys' / 'service-account.json'
+SCOPES = ['https://www.googleapis.com/auth/drive.readonly']
+MANIFEST_NAME = '.drive_mirror.json'
+PARTIAL_DIR = '.drive_partial'
+CHUNK_SIZE = 1024 * 1024
+LIST_PAGE_SIZE = 1000  # files.list maximum
+LIST_FIELDS = 'nextPageToken, files(id, name, mimeType, md5Checksum, size, modifiedTime)'
+DEFAULT_WORKERS = 4
+MAX_RETRIES = 6
+TIMEOUT = (10, 60)  # connect, read (between chunks)
+SAVE_EVERY = 20  # Completed files between manifest saves
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RETRY_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded'}  # Drive also rate-limits with 403
+FOLDER_MIME = 'application/vnd.google-apps.folder'
+GOOGLE_MIME_PREFIX = 'application/vnd.google-apps.'
+EXPORT_FORMATS = {
+    'application/vnd.google-apps.document':
+        ('application/vnd.openxmlformats-officedocument.wordprocessingml.document', '.docx'),
+    'application/vnd.google-apps.spreadsheet':
+        ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', '.xlsx'),
+    'application/vnd.google-apps.presentation':
+        ('application/vnd.openxmlformats-officedocument.presentationml.presentation', '.pptx'),
+    'application/vnd.google-apps.drawing': ('image/png', '.png'),
+}
+UNSAFE_NAME_RE = re.compile(r'[/\\\x00]')
+
+
+class DriveError(Exception):
+    """A failed request: HTTP status (0 for connection errors) and Drive's error reason."""
+
+    def __init__(self, status, reason, message=''):
+        super().__init__(f"{status} {reason}{': ' + message if message else ''}")
+        self.status = status
+        self.reason = reason
+
+    @classmethod
+    def from_response(cls, response):
+        try:
+            error = response.json()['error']
+            reason = (error.get('errors') or [{}])[0].get('reason') or error.get('status') or 'error'
+            return cls(response.status_code, reason, error.get('message', ''))
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return cls(response.status_code, 'http_error', response.text[:200])
+
+
+class Interrupted(Exception):
+    """Raised in workers once the run is interrupted."""
+
+
+def make_session(credentials=None, pool_size=DEFAULT_WORKERS):
+    """Pooled, authorized requests session."""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    token = os.environ.get('DRIVE_ACCESS_TOKEN')
+    if token:
+        session = requests.Session()
+        session.headers['Authorization'] = f'Bearer {token}'
+    else:
+        try:
+            from google.oauth2 import service_account
+            from google.auth.transport.requests import AuthorizedSession
+        except ImportError:
+            raise ImportError("Missing google-auth. Install with: pip install google-auth "
+                              "(or set DRIVE_ACCESS_TOKEN)")
+        path = credentials or os.environ.get('GOOGLE_APPLICATION_CREDENTIALS') or CREDENTIALS_PATH
+        creds = service_account.Credentials.from_service_account_file(str(path), scopes=SCOPES)
+        session = AuthorizedSession(creds)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def backoff(attempt):
+    """Exponential backoff with jitter, as Google recommends for its APIs."""
+    return min(32.0, 2 ** attempt) + random.uniform(0, 1)
+
+
+def safe_name(name):
+    return UNSAFE_NAME_RE.sub('_', name).strip() or '_'
+
+
+def local_names(children):
+    """(item, local file name) per child, with Docs export suffixes and duplicate names disambiguated."""
+    named = []
+    for item in children:
+        name = safe_name(item['name'])
+        export = EXPORT_FORMATS.get(item['mimeType'])
+        if export and not name.lower().endswith(export[1]):
+            name += export[1]
+        named.append((item, name))
+    taken = {}
+    result = []
+    for item, name in sorted(named, key=lambda pair: (pair[1].casefold(), pair[0]['id'])):
+        if name.casefold() in taken:
+            stem, dot, suffix = name.rpartition('.')
+            name = f"{stem} ({item['id'][:8]}).{suffix}" if dot and stem else f"{name} ({item['id'][:8]})"
+        taken[name.casefold()] = True
+        result.append((item, name))
+    return result
+
+
+def version(item):
+    """What identifies a file's content: md5 for binary files, modifiedTime for Docs."""
+    return item.get('md5Checksum') or item.get('modifiedTime')
+
+
+def file_md5(path):
+    md5 = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+def set_mtime(path, modified_time):
+    try:
+        stamp = datetime.fromisoformat(modified_time.replace('Z', '+00:00')).timestamp()
+        os.utime(path, (stamp, stamp))
+    except (ValueError, AttributeError, OSError):
+        pass
+
+
+class DriveMirror:
+    """Mirror one Drive folder into `dest`, tracked by the manifest there."""
+
+    def __init__(self, session, folder_id, dest, workers=DEFAULT_WORKERS, export=True, base_url=API_URL):
+        import requests
+
+        self.errors = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+        self.session = session
+        self.folder_id = folder_id
+        self.dest = Path(dest)
+        self.workers = workers
+        self.export = export
+        self.base_url = base_url.rstrip('/')
+        self.manifest_path = self.dest / MANIFEST_NAME
+        self.partial_dir = self.dest / PARTIAL_DIR
+        self.manifest = self.load_manifest()
+        self.stats = {'requests': 0, 'retries': 0, 'rate_limited': 0, 'resumed': 0, 'bytes': 0}
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+
+    # Manifest
+
+    def load_manifest(self):
+        try:
+            manifest = json.loads(self.manifest_path.read_text())
+        except (OSError, ValueError):
+            return {'folder_id': self.folder_id, 'files': {}}
+        if manifest.get('folder_id') != self.folder_id:
+            raise ValueError(f"{self.dest} mirrors folder {manifest.get('folder_id')}, not {self.folder_id}")
+        return manifest
+
+    def save_manifest(self):
+        self.dest.mkdir(parents=True, exist_ok=True)
+        self.manifest['updated'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+        tmp_path = self.manifest_path.with_suffix(f'.{os.getpid()}.tmp')
+        tmp_path.write_text(json.dumps(self.manifest, indent=1, ensure_ascii=False))
+        os.replace(tmp_path, self.manifest_path)
+
+    # HTTP
+
+    def _count(self, **deltas):
+        with self.lock:
+            for key, value in deltas.items():
+                self.stats[key] += value
+
+    def get(self, path, params=None, headers=None, stream=False):
+        """GET with retries on rate limits, server errors and connection errors."""
+        for attempt in range(MAX_RETRIES + 1):
+            if self.stopping.is_set():
+                raise Interrupted(path)
+            self._count(requests=1)
+            try:
+                response = self.session.get(self.base_url + path, params=params, headers=headers,
+                                            stream=stream, timeout=TIMEOUT)
+            except self.errors as e:
+                error = DriveError(0, 'connection_error', str(e))
+            else:
+                if response.status_code < 400 or response.status_code == 416:
+                    return response
+                error = DriveError.from_response(response)
+                response.close()
+                if response.status_code not in RETRY_STATUSES and error.reason not in RETRY_REASONS:
+                    raise error
+                if response.status_code == 429 or error.reason in RETRY_REASONS:
+                    self._count(rate_limited=1)
+            if attempt == MAX_RETRIES:
+                raise error
+            self._count(retries=1)
+            time.sleep(backoff(attempt))
+
+    def list_folder(self, folder_id):
+        """Every non-trashed child of a folder."""
+        params = {'q': f"'{folder_id}' in parents and trashed = false", 'fields': LIST_FIELDS,
+                  'pageSize': LIST_PAGE_SIZE, 'supportsAllDrives': 'true', 'includeItemsFromAllDrives': 'true'}
+        children = []
+        while True:
+            data = self.get('/files', params).json()
+            children.extend(data.get('files', []))
+            if not data.get('nextPageToken'):
+                return children
+            params['pageToken'] = data['nextPageToken']
+
+    def walk(self, pool):
+        """(relative path, item) for every file under the folder; folders are listed concurrently."""
+        entries, seen = [], {self.folder_id}
+        pending = {pool.submit(self.list_folder, self.folder_id): Path()}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                parent = pending.pop(future)
+                for item, name in local_names(future.result()):
+                    if item['mimeType'] == FOLDER_MIME:
+                        if item['id'] not in seen:  # A folder can have several parents
+                            seen.add(item['id'])
+                            pending[pool.submit(self.list_folder, item['id'])] = parent / name
+                    elif item['mimeType'].startswith(GOOGLE_MIME_PREFIX) and (
+                            not self.export or item['mimeType'] not in EXPORT_FORMATS):
+                        continue  # Forms, shortcuts, sites: no content to mirror
+                    else:
+                        entries.append((parent / name, item))
+        return entries
+
+    # Downloads
+
+    def download(self, rel, item):
+        """Stream one file into place. Returns its manifest entry."""
+        export = EXPORT_FORMATS.get(item['mimeType'])
+        tag = re.sub(r'\W', '', version(item) or 'x')[:32]
+        part = self.partial_dir / f"{item['id']}.{tag}.part"
+        part.parent.mkdir(parents=True, exist_ok=True)
+        md5 = hashlib.md5()
+        # Exports are generated per request and can't be resumed
+        offset = part.stat().st_size if part.exists() and not export else 0
+        if offset:
+            with open(part, 'rb') as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                    md5.update(chunk)
+            self._count(resumed=1)
+
+        for attempt in range(MAX_RETRIES + 1):
+            if export:
+                response = self.get(f"/files/{item['id']}/export", {'mimeType': export[0]}, stream=True)
+            else:
+                response = self.get(f"/files/{item['id']}", {'alt': 'media', 'supportsAllDrives': 'true'},
+                                    headers={'Range': f'bytes={offset}-'} if offset else None, stream=True)
+            if response.status_code == 416:  # Already have every byte
+                response.close()
+                break
+            if offset and response.status_code != 206:  # Range ignored: start over
+                offset, md5 = 0, hashlib.md5()
+            try:
+                with open(part, 'ab' if offset else 'wb') as f:
+                    for chunk in response.iter_content(CHUNK_SIZE):
+                        if self.stopping.is_set():
+                            raise Interrupted(item['id'])
+                        f.write(chunk)
+                        md5.update(chunk)
+                        offset += len(chunk)
+                        self._count(bytes=len(chunk))
+                break
+            except self.errors:
+                if attempt == MAX_RETRIES:
+                    raise
+                # Keep what arrived; the next request continues from there
+                if export:
+                    offset, md5 = 0, hashlib.md5()
+                else:
+                    self._count(resumed=1)
+                self._count(retries=1)
+                time.sleep(backoff(attempt) if attempt else 0)
+            finally:
+                response.close()
+
+        digest = md5.hexdigest()
+        if item.get('md5Checksum') and digest != item['md5Checksum']:
+            part.unlink(missing_ok=True)
+            raise DriveError(0, 'md5_mismatch', f"got {digest}, Drive has {item['md5Checksum']}")
+        target = self.dest / rel
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(part, target)
+        set_mtime(target, item.get('modifiedTime'))
+        return {'path': str(rel), 'modifiedTime': item.get('modifiedTime'), 'md5': digest,
+                'size': offset, 'mimeType': item['mimeType']}
+
+    # Mirror
+
+    def plan(self, entries):
+        """Split listed files into downloads, local moves and unchanged files."""
+        files = self.manifest['files']
+        downloads, moves, unchanged = [], [], []
+        for rel, item in entries:
+            old = files.get(item['id'])
+            if old and (old.get('md5') == item.get('md5Checksum') if item.get('md5Checksum')
+                        else old.get('modifiedTime') == item.get('modifiedTime')):
+                local = self.dest / old['path']
+                if local.exists() and local.stat().st_size == old['size']:
+                    (unchanged if old['path'] == str(rel) else moves).append((rel, item))
+                    continue
+            target = self.dest / rel
+            if not old and item.get('md5Checksum') and target.exists() \
+                    and target.stat().st_size == int(item.get('size', -1)) and file_md5(target) == item['md5Checksum']:
+                # Already on disk (e.g. the manifest was lost): adopt it
+                files[item['id']] = {'path': str(rel), 'modifiedTime': item.get('modifiedTime'),
+                                     'md5': item['md5Checksum'], 'size': target.stat().st_size,
+                                     'mimeType': item['mimeType']}
+                unchanged.append((rel, item))
+                continue
+            downloads.append((rel, item))
+        return downloads, moves, unchanged
+
+    def run(self, delete=False, dry_run=False, verbose=False):
+        start = time.time()
+        summary = {'listed': 0, 'downloaded': 0, 'unchanged': 0, 'moved': 0, 'failed': 0,
+                   'removed_remote': 0, 'deleted': 0, 'failures': []}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            entries = self.walk(pool)
+            summary['listed'] = len(entries)
+            downloads, moves, unchanged = self.plan(entries)
+            listed_ids = {item['id'] for _, item in entries}
+            gone = [file_id for file_id in self.manifest['files'] if file_id not in listed_ids]
+            summary.update(unchanged=len(unchanged), removed_remote=len(gone))
+            if dry_run:
+                summary['plan'] = {
+                    'download': [(str(rel), int(item.get('size') or 0)) for rel, item in downloads],
+                    'move': [(self.manifest['files'][item['id']]['path'], str(rel)) for rel, item in moves],
+                    'gone': [self.manifest['files'][file_id]['path'] for file_id in gone],
+                }
+                return summary
+
+            # A path listed in Drive this run belongs to that file, whatever the
+            # manifest said before: never unlink one on behalf of another entry
+            live_paths = {str(rel) for rel, _ in entries}
+
+            # Moves go through a temporary name first, so swapped paths don't clobber each other
+            staged = []
+            for rel, item in moves:
+                entry = self.manifest['files'][item['id']]
+                temp = self.partial_dir / f"{item['id']}.move"
+                temp.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(self.dest / entry['path'], temp)
+                staged.append((rel, item, temp))
+            for rel, item, temp in staged:
+                target = self.dest / rel
+                target.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(temp, target)
+                self.manifest['files'][item['id']].update(path=str(rel), modifiedTime=item.get('modifiedTime'))
+                summary['moved'] += 1
+                if verbose:
+                    print(f"  → {rel}")
+
+            failed_ids = set()
+            futures = {pool.submit(self.download, rel, item): (rel, item) for rel, item in downloads}
+            try:
+                for done, future in enumerate(as_completed(futures), 1):
+                    rel, item = futures[future]
+                    try:
+                        entry = future.result()
+                    except (DriveError, OSError) + self.errors as e:
+                        failed_ids.add(item['id'])
+                        summary['failed'] += 1
+                        summary['failures'].append((str(rel), str(e)))
+                        continue
+                    old = self.manifest['files'].get(item['id'])
+                    if old and old['path'] != entry['path'] and old['path'] not in live_paths:
+                        (self.dest / old['path']).unlink(missing_ok=True)
+                    self.manifest['files'][item['id']] = entry
+                    summary['downloaded'] += 1
+                    if verbose:
+                        print(f"  ✓ {rel} ({entry['size'] / 1024:.0f} KB)")
+                    if done % SAVE_EVERY == 0:
+                        self.save_manifest()
+            except KeyboardInterrupt:
+                # Stop workers at their next chunk; partial files are resumed by the next run
+                self.stopping.set()
+                self.save_manifest()
+                pool.shutdown(cancel_futures=True)
+                raise
+
+        if delete:
+            for file_id in gone:
+                entry = self.manifest['files'].pop(file_id)
+                if entry['path'] not in live_paths:
+                    (self.dest / entry['path']).unlink(missing_ok=True)
+                summary['deleted'] += 1
+        self.save_manifest()
+        self.clean_partials(failed_ids)
+        summary.update(self.stats, seconds=round(time.time() - start, 2))
+        return summary
+
+    def clean_partials(self, keep_ids):
+        """Drop partial downloads except those of files that failed this run."""
+        if not self.partial_dir.exists():
+            return
+        for part in self.partial_dir.iterdir():
+            if part.name.split('.', 1)[0] not in keep_ids:
+                part.unlink(missing_ok=True)
+        if not any(self.partial_dir.iterdir()):
+            self.partial_dir.rmdir()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Mirror a Google Drive folder to a local directory',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('folder_id', help='Drive folder ID (from its URL)')
+    parser.add_argument('dest', help='Local directory')
+    parser.add_argument('--workers', '-w', type=int, default=DEFAULT_WORKERS,
+                        help=f'Concurrent requests (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--delete', action='store_true', help='Delete local copies of files removed from Drive')
+    parser.add_argument('--no-export', action='store_true', help='Skip Google Docs/Sheets/Slides')
+    parser.add_argument('--dry-run', action='store_true', help='Show what would be downloaded, moved or removed')
+    parser.add_argument('--credentials', help='Service account JSON (default: GOOGLE_APPLICATION_CREDENTIALS)')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Print every file')
+    parser.add_argument('--json', action='store_true', help='Print the summary as JSON')
+    args = parser.parse_args()
+
+    try:
+        session = make_session(args.credentials, pool_size=args.workers)
+        mirror = DriveMirror(session, args.folder_id, args.dest, args.workers, export=not args.no_export)
+        summary = mirror.run(delete=args.delete, dry_run=args.dry_run, verbose=args.verbose)
+    except (ImportError, ValueError, OSError) as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+    except DriveError as e:
+        print(f"✗ Drive API error: {e}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print("\n✗ Interrupted; finished files are in the manifest and partial downloads resume on the next run")
+        sys.exit(130)
+
+    if args.json:
+        print(json.dumps(summary, indent=2, ensure_ascii=False))
+    elif args.dry_run:
+        plan = summary['plan']
+        total = sum(size for _, size in plan['download'])
+        for path, size in plan['download']:
+            print(f"  + {path} ({size / 1024:.0f} KB)")
+        for old, new in plan['move']:
+            print(f"  → {old} -> {new}")
+        for path in plan['gone']:
+            print(f"  - {path} (removed from Drive)")
+        print(f"{summary['listed']} files listed: {len(plan['download'])} to download ({total / 1024 / 1024:.1f} MB), "
+              f"{len(plan['move'])} to move, {summary['unchanged']} unchanged, {len(plan['gone'])} removed from Drive")
+    else:
+        for path, error in summary['failures']:
+            print(f"✗ {path}: {error}")
+        mb = summary['bytes'] / 1024 / 1024
+        rate = mb / summary['seconds'] if summary['seconds'] else 0
+        print(f"{'✓' if not summary['failed'] else '✗'} {summary['listed']} files: {summary['downloaded']} downloaded "
+              f"({mb:.1f} MB, {rate:.1f} MB/s, {summary['resumed']} resumed), {summary['moved']} moved, "
+              f"{summary['unchanged']} unchanged, {summary['failed']} failed in {summary['seconds']}s; "
+              f"{summary['requests']} requests, {summary['retries']} retries, {summary['rate_limited']} rate-limited")
+        if summary['removed_remote'] and not args.delete:
+            print(f"  {summary['removed_remote']} files removed from Drive are still local (use --delete)")
+        elif summary['deleted']:
+            print(f"  {summary['deleted']} files removed from Drive deleted locally")
+    if summary['failed']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+"""
+Local fake Google Drive v3 API for exercising drive_mirror.py without an account.
+
+Serves a generated folder tree, with in-memory state:
+
+    GET /drive/v3/files                    files.list: "'ID' in parents" and
+                                           "trashed = false" queries, pageToken paging
+    GET /drive/v3/files/ID                 metadata
+    GET /drive/v3/files/ID?alt=media       content, with Range requests (206)
+    GET /drive/v3/files/ID/export          Google Docs exported as text
+
+Like Drive, binary files carry md5Checksum and size, Docs editors files have
+neither and must be exported, and names can repeat within a folder.
+
+Latency, a per-connection bandwidth cap, random 429/503 errors and downloads
+cut off mid-body (to exercise resume) can be injected. GET /_stats returns
+per-endpoint counts and POST /_reset clears them. POST
+/_modify?change=N&add=N&trash=N&move=N edits random files, for re-run tests.
+
+Point drive_mirror.py at it with DRIVE_API_URL and any DRIVE_ACCESS_TOKEN:
+
+Usage:
+    python fake_drive.py --files 500 --max-kb 2048
+    python fake_drive.py --port 8097 --latency 0.05 --bandwidth 2048 --drop-rate 0.1
+    DRIVE_API_URL=http://127.0.0.1:8097/drive/v3 DRIVE_ACCESS_TOKEN=fake \\
+        python drive_mirror.py root /tmp/drive-mirror
+"""
+
+import re
+import sys
+import json
+import time
+import base64
+import random
+import hashlib
+import argparse
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+DEFAULT_PORT = 8097
+DEFAULT_FILES = 200
+DEFAULT_FOLDERS = 20
+DEFAULT_MAX_KB = 512
+ROOT_ID = 'root'
+LIST_DEFAULT_PAGE_SIZE = 100
+LIST_MAX_PAGE_SIZE = 1000
+FOLDER_MIME = 'application/vnd.google-apps.folder'
+DOC_MIME = 'application/vnd.google-apps.document'
+FILE_TYPES = [('.pdf', 'application/pdf'), ('.csv', 'text/csv'), ('.txt', 'text/plain'),
+              ('.png', 'image/png'), ('.docx', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document')]
+WRITE_CHUNK = 64 * 1024
+PARENT_RE = re.compile(r"'([^']+)'\s+in\s+parents")
+RANGE_RE = re.compile(r'^bytes=(\d+)-(\d*)$')
+FILE_PATH_RE = re.compile(r'^/drive/v3/files/([\w-]+)(/export)?$')
+
+
+class DriveError(Exception):
+    """An API error: HTTP status, reason and message (Drive's error body)."""
+
+    def __init__(self, status, reason, message):
+        super().__init__(message)
+        self.status = status
+        self.reason = reason
+        self.message = message
+
+    def body(self):
+        return {'error': {'code': self.status, 'message': self.message,
+                          'errors': [{'domain': 'global', 'reason': self.reason, 'message': self.message}]}}
+
+
+def timestamp(moment):
+    return moment.strftime('%Y-%m-%dT%H:%M:%S.') + f'{moment.microsecond // 1000:03d}Z'
+
+
+class DriveState:
+    """A folder tree under ROOT_ID with generated file contents."""
+
+    def __init__(self, files=DEFAULT_FILES, folders=DEFAULT_FOLDERS, max_kb=DEFAULT_MAX_KB, docs=5, seed=1):
+        self.random = random.Random(seed)
+        self.max_kb = max_kb
+        self.items = {}  # id -> metadata (without content)
+        self.contents = {}  # id -> bytes
+        self.counter = 0
+        self.lock = threading.Lock()
+        self.items[ROOT_ID] = {'id': ROOT_ID, 'name': 'Mirror root', 'mimeType': FOLDER_MIME, 'parents': [],
+                               'trashed': False, 'modifiedTime': timestamp(datetime.now(timezone.utc))}
+        folder_ids = [ROOT_ID]
+        for n in range(folders):
+            folder_ids.append(self.add(f'Folder {n:03d}', FOLDER_MIME, self.random.choice(folder_ids)))
+        last_id = None
+        for n in range(files):
+            if last_id and n % 25 == 24:
+                # Repeat the previous name in the same folder, which Drive allows
+                last = self.items[last_id]
+                last_id = self.add(last['name'], last['mimeType'], last['parents'][0])
+                continue
+            suffix, mime = FILE_TYPES[n % len(FILE_TYPES)]
+            last_id = self.add(f'file-{n:05d}{suffix}', mime, self.random.choice(folder_ids))
+        for n in range(docs):
+            self.add(f'Notes {n}', DOC_MIME, self.random.choice(folder_ids))
+
+    def new_id(self):
+        self.counter += 1
+        return f'f{self.counter:05d}' + hashlib.sha1(str(self.counter).encode()).hexdigest()[:12]
+
+    def add(self, name, mime, parent):
+        file_id = self.new_id()
+        age = timedelta(minutes=self.random.randint(1, 60 * 24 * 365))
+        self.items[file_id] = {'id': file_id, 'name': name, 'mimeType': mime, 'parents': [parent],
+                               'trashed': False, 'modifiedTime': timestamp(datetime.now(timezone.utc) - age)}
+        if mime != FOLDER_MIME:
+            self.set_content(file_id)
+        return file_id
+
+    def set_content(self, file_id):
+        item = self.items[file_id]
+        if item['mimeType'] == DOC_MIME:
+            data = f"{item['name']}\n\nDocument body revision {self.random.randint(1, 10 ** 6)}\n".encode()
+        else:
+            data = self.random.randbytes(self.random.randint(1, self.max_kb) * 1024)
+        self.contents[file_id] = data
+        if item['mimeType'] != DOC_MIME:
+            item['md5Checksum'] = hashlib.md5(data).hexdigest()
+            item['size'] = str(len(data))
+
+    def item(self, file_id):
+        item = self.items.get(file_id)
+        if item is None or item['trashed']:
+            raise DriveError(404, 'notFound', f'File not found: {file_id}.')
+        return item
+
+    def list(self, params):
+        query = params.get('q', '')
+        match = PARENT_RE.search(query)
+        parent = match.group(1) if match else None
+        items = [item for item in self.items.values()
+                 if item['id'] != ROOT_ID
+                 and (parent is None or parent in item['parents'])
+                 and not ('trashed = false' in query and item['trashed'])]
+        items.sort(key=lambda item: (item['mimeType'] != FOLDER_MIME, item['name'], item['id']))
+        try:
+            size = min(int(params.get('pageSize', LIST_DEFAULT_PAGE_SIZE)), LIST_MAX_PAGE_SIZE)
+            offset = int(base64.b64decode(params['pageToken']).decode().split(':', 1)[1]) if params.get('pageToken') else 0
+        except (ValueError, IndexError):
+            raise DriveError(400, 'invalid', 'Invalid Value')
+        body = {'kind': 'drive#fileList', 'incompleteSearch': False, 'files': items[offset:offset + size]}
+        if offset + size < len(items):
+            body['nextPageToken'] = base64.b64encode(f'offset:{offset + size}'.encode()).decode()
+        return body
+
+    def touch(self, file_id):
+        self.items[file_id]['modifiedTime'] = timestamp(datetime.now(timezone.utc))
+
+    def modify(self, change=0, add=0, trash=0, move=0):
+        """Random edits: new content, new files, trashed files, moves between folders."""
+        files = [i for i in self.items.values() if i['mimeType'] != FOLDER_MIME and not i['trashed']]
+        folders = [i['id'] for i in self.items.values() if i['mimeType'] == FOLDER_MIME]
+        result = {'changed': [], 'added': [], 'trashed': [], 'moved': []}
+        for item in self.random.sample(files, min(change, len(files))):
+            self.set_content(item['id'])
+            self.touch(item['id'])
+            result['changed'].append(item['id'])
+        for n in range(add):
+            result['added'].append(self.add(f'added-{self.counter:05d}.txt', 'text/plain', self.random.choice(folders)))
+        for item in self.random.sample(files, min(trash, len(files))):
+            item['trashed'] = True
+            result['trashed'].append(item['id'])
+        for item in self.random.sample(files, min(move, len(files))):
+            item['parents'] = [self.random.choice(folders)]
+            result['moved'].append(item['id'])
+        return result
+
+
+class Faults:
+    """Injected latency, bandwidth cap, errors and dropped downloads."""
+
+    def __init__(self, latency=0.0, bandwidth_kb=None, error_rate=0.0, drop_rate=0.0, seed=None):
+        self.latency = latency
+        self.bandwidth = bandwidth_kb * 1024 if bandwidth_kb else None
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def delay(self):
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    def chance(self, rate):
+        with self.lock:
+            return rate > 0 and self.random.random() < rate
+
+    def error(self):
+        """A rate-limit or backend error to answer with, or None."""
+        if not self.chance(self.error_rate):
+            return None
+        if self.chance(0.5):
+            return DriveError(429, 'rateLimitExceeded', 'Rate Limit Exceeded')
+        return DriveError(503, 'backendError', 'Backend Error')
+
+
+class Stats:
+    """Per-endpoint counters reported by GET /_stats."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started = time.time()
+            self.endpoints = {}
+
+    def record(self, endpoint, outcome, nbytes=0):
+        with self.lock:
+            counts = self.endpoints.setdefault(endpoint, {'calls': 0, 'ok': 0, 'error': 0, 'rate_limited': 0,
+                                                          'dropped': 0, 'bytes': 0})
+            counts['calls'] += 1
+            counts[outcome] += 1
+            counts['bytes'] += nbytes
+
+    def snapshot(self):
+        with self.lock:
+            return {'seconds': round(time.time() - self.started, 3),
+                    'endpoints': {name: dict(counts) for name, counts in self.endpoints.items()}}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like www.googleapis.com
+    server_version = 'FakeDrive/1.0'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def send_body(self, status, body, content_type='application/json; charset=UTF-8', headers=None):
+        data = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_media(self, endpoint, data, content_type):
+        """Content, honoring Range, throttled to the bandwidth cap; maybe cut off mid-body."""
+        server = self.server
+        status, headers, start = 200, {'Accept-Ranges': 'bytes'}, 0
+        match = RANGE_RE.match(self.headers.get('Range', ''))
+        if match:
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else len(data) - 1
+            if start >= len(data):
+                server.stats.record(endpoint, 'error')
+                return self.send_body(416, b'', 'text/plain', {'Content-Range': f'bytes */{len(data)}'})
+            end = min(end, len(data) - 1)
+            status = 206
+            headers['Content-Range'] = f'bytes {start}-{end}/{len(data)}'
+            data = data[start:end + 1]
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        # A dropped download stops somewhere in the middle and closes the connection
+        cut = None
+        if len(data) > 1 and server.faults.chance(server.faults.drop_rate):
+            with server.faults.lock:
+                cut = server.faults.random.randint(1, len(data) - 1)
+        limit = len(data) if cut is None else cut
+        sent = 0
+        while sent < limit:
+            chunk = data[sent:min(limit, sent + WRITE_CHUNK)]
+            self.wfile.write(chunk)
+            sent += len(chunk)
+            if server.faults.bandwidth:
+                time.sleep(len(chunk) / server.faults.bandwidth)
+        if cut is not None:
+            server.stats.record(endpoint, 'dropped', sent)
+            self.close_connection = True
+            return
+        server.stats.record(endpoint, 'ok', sent)
+
+    def api_call(self):
+        server = self.server
+        parts = urlsplit(self.path)
+        params = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        endpoint = 'files.list'
+        try:
+            match = FILE_PATH_RE.match(parts.path)
+            if parts.path == '/drive/v3/files':
+                action = lambda: self.send_body(200, self.locked(server.state.list, params))
+            elif match and match.group(2):
+                endpoint = 'files.export'
+                action = lambda: self.export(match.group(1), params)
+            elif match and params.get('alt') == 'media':
+                endpoint = 'files.get_media'
+                action = lambda: self.media(match.group(1))
+            elif match:
+                endpoint = 'files.get'
+                action = lambda: self.send_body(200, self.locked(server.state.item, match.group(1)))
+            else:
+                raise DriveError(404, 'notFound', 'Not Found')
+            server.faults.delay()
+            error = server.faults.error()
+            if error:
+                server.stats.record(endpoint, 'rate_limited' if error.status == 429 else 'error')
+                return self.send_body(error.status, error.body())
+            if not self.headers.get('Authorization', '').startswith('Bearer '):
+                raise DriveError(401, 'authError', 'Request is missing required authentication credential.')
+            action()
+            if endpoint in ('files.list', 'files.get'):
+                server.stats.record(endpoint, 'ok')
+        except DriveError as e:
+            server.stats.record(endpoint, 'error')
+            self.send_body(e.status, e.body())
+
+    def locked(self, fn, *args):
+        """fn(*args) serialized to JSON-safe data while holding the state lock."""
+        with self.server.state.lock:
+            return json.loads(json.dumps(fn(*args)))
+
+    def media(self, file_id):
+        with self.server.state.lock:
+            item = self.server.state.item(file_id)
+            if item['mimeType'] == FOLDER_MIME:
+                raise DriveError(403, 'fileNotDownloadable', 'Folders cannot be downloaded.')
+            if item['mimeType'] == DOC_MIME:
+                raise DriveError(403, 'fileNotDownloadable',
+                                 'Only files with binary content can be downloaded. Use Export with Docs Editors files.')
+            data, mime = self.server.state.contents[file_id], item['mimeType']
+        self.send_media('files.get_media', data, mime)
+
+    def export(self, file_id, params):
+        with self.server.state.lock:
+            item = self.server.state.item(file_id)
+            if item['mimeType'] != DOC_MIME:
+                raise DriveError(403, 'fileNotExportable', 'Export only supports Docs Editors files.')
+            data = self.server.state.contents[file_id]
+        mime = params.get('mimeType', '')
+        if mime not in ('text/plain', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+                        'application/pdf'):
+            raise DriveError(400, 'badRequest', f'The requested conversion is not supported: {mime}')
+        self.send_media('files.export', data, mime)
+
+    def do_GET(self):
+        if urlsplit(self.path).path == '/_stats':
+            return self.send_body(200, self.server.stats.snapshot())
+        self.api_call()
+
+    def do_POST(self):
+        parts = urlsplit(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        if parts.path == '/_reset':
+            self.server.stats.reset()
+            return self.send_body(200, {'ok': True})
+        if parts.path == '/_modify':
+            counts = {k: int(v[0]) for k, v in parse_qs(parts.query).items() if k in ('change', 'add', 'trash', 'move')}
+            with self.server.state.lock:
+                return self.send_body(200, self.server.state.modify(**counts))
+        self.send_body(404, DriveError(404, 'notFound', 'Not Found').body())
+
+
+class FakeDriveServer(ThreadingHTTPServer):
+    """Threaded fake Drive server. Use start()/stop() to run it in-process."""
+
+    daemon_threads = True
+
+    def __init__(self, port=0, host='127.0.0.1', files=DEFAULT_FILES, folders=DEFAULT_FOLDERS,
+                 max_kb=DEFAULT_MAX_KB, faults=None, verbose=False, seed=1):
+        super().__init__((host, port), Handler)
+        self.state = DriveState(files, folders, max_kb, seed=seed)
+        self.faults = faults or Faults()
+        self.stats = Stats()
+        self.verbose = verbose
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def api_url(self):
+        """Value for DRIVE_API_URL."""
+        return self.url + '/drive/v3'
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Run a local fake Google Drive v3 API',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port (default: {DEFAULT_PORT})')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--files', type=int, default=DEFAULT_FILES, help=f'Binary files (default: {DEFAULT_FILES})')
+    parser.add_argument('--folders', type=int, default=DEFAULT_FOLDERS,
+                        help=f'Nested folders under the root (default: {DEFAULT_FOLDERS})')
+    parser.add_argument('--max-kb', type=int, default=DEFAULT_MAX_KB,
+                        help=f'File sizes are random up to this many KB (default: {DEFAULT_MAX_KB})')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every request')
+    parser.add_argument('--bandwidth', type=int, metavar='KB_PER_S', help='Per-connection download speed cap')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 429/503')
+    parser.add_argument('--drop-rate', type=float, default=0.0, help='Fraction of downloads cut off mid-body')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed for the tree and faults (default: 1)')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Log every request')
+    args = parser.parse_args()
+
+    faults = Faults(args.latency, args.bandwidth, args.error_rate, args.drop_rate, args.seed)
+    try:
+        server = FakeDriveServer(args.port, args.host, args.files, args.folders, args.max_kb, faults,
+                                 args.verbose, args.seed)
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    total = sum(len(data) for data in server.state.contents.values())
+    print(f"Fake Drive with {args.files:,} files ({total / 1024 / 1024:.1f} MB) in {args.folders} folders on {server.url}")
+    print(f"  export DRIVE_API_URL={server.api_url} DRIVE_ACCESS_TOKEN=fake   # folder ID: {ROOT_ID}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped")
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
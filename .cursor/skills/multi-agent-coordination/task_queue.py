@@ -0,0 +1,672 @@
+#!/usr/bin/env python3
+"""
+Task queue for parallel agents: atomic claims on a SQLite store, rendered to EXECUTION.md.
+
+Agents claim, heartbeat and complete tasks through this CLI (or the TaskQueue
+class) instead of editing EXECUTION.md by hand. The store is
+DIR/.execution.db (SQLite in WAL mode). Every change runs in one write
+transaction, so two agents can never claim the same task, and an update is
+never lost to a concurrent rewrite of the file.
+
+- `next` atomically claims the first ready task, in plan order. A task is
+  ready when it is available and every dependency is done or skipped; a
+  dependency can also be a whole phase ("Phase 1").
+- Each claim carries a lease (default 30 minutes). `heartbeat` extends it.
+  An expired claim is treated as abandoned and can be claimed again, which
+  replaces the manual orphan-recovery protocol.
+- `complete` records notes in the completion log and lists the tasks it
+  unblocked.
+
+After every change DIR/EXECUTION.md is re-rendered from the store, with the
+usual status markers, phases, dependencies and completion log, for humans
+and for agents that only read. Sections other than the tasks and the log,
+such as handoff notes, are kept from the imported plan.
+
+Agent ID: --agent, else AGENT_ID, else the single session in sessions/active/.
+
+Usage:
+    python task_queue.py --dir projects/my-project import EXECUTION.md
+    python task_queue.py add 2.3 "Write tests" --phase "Phase 2: Implementation" --depends 2.1,2.2
+    python task_queue.py next --agent Agent-abc1
+    python task_queue.py heartbeat --agent Agent-abc1
+    python task_queue.py complete 1.3 --agent Agent-abc1 --notes "Verified 100% coverage"
+    python task_queue.py block 1.4 --notes "Waiting on API key"
+    python task_queue.py status
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import sqlite3
+import argparse
+from pathlib import Path
+
+WORKSPACE_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+ACTIVE_SESSIONS_DIR = WORKSPACE_ROOT / 'sessions' / 'active'
+STORE_NAME = '.execution.db'
+PLAN_NAME = 'EXECUTION.md'
+DEFAULT_LEASE_MINUTES = 30
+BUSY_TIMEOUT = 30.0  # Seconds to wait for another agent's write transaction
+
+STATUS_MARKS = {'available': ' ', 'claimed': '~', 'done': 'x', 'blocked': '!', 'skipped': '-'}
+MARK_STATUSES = {mark: status for status, mark in STATUS_MARKS.items()}
+MARK_STATUSES['X'] = 'done'
+FINISHED = ('done', 'skipped')
+PHASE_KEY_RE = re.compile(r'^(Phase\s+[\w.]+)', re.I)
+TASK_RE = re.compile(r'^[-*]\s+\[([ ~xX!-])\]\s+(\S*\d\S*)\s+(.*)$')
+DEPENDS_RE = re.compile(r'\s*\(depends(?:\s+on)?:\s*([^)]*)\)', re.I)
+AGENT_RE = re.compile(r'\bby\s+(\S+)')
+DATE_RE = re.compile(r'\d{4}-\d{2}-\d{2}')
+HEADING_RE = re.compile(r'^(#{1,3})\s+(.*?)\s*$')
+LOG_ROW_RE = re.compile(r'^\|\s*(\d{4}-\d{2}-\d{2}[^|]*?)\s*\|\s*([^|]*?)\s*\|\s*([^|]*?)\s*\|\s*(.*?)\s*\|\s*$')
+RENDERED_SECTIONS = {'agent protocol', 'task status key', 'tasks', 'completion log'}
+PAST_TENSE = {'release': 'Released', 'block': 'Blocked', 'skip': 'Skipped'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    phase TEXT NOT NULL DEFAULT '',
+    phase_key TEXT NOT NULL DEFAULT '',
+    position INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'available'
+        CHECK (status IN ('available', 'claimed', 'done', 'blocked', 'skipped')),
+    agent TEXT,
+    claimed_at REAL,
+    lease_until REAL,
+    completed_at REAL,
+    notes TEXT,
+    details TEXT,
+    claims INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks(status, position);
+CREATE TABLE IF NOT EXISTS deps (
+    task_id TEXT NOT NULL REFERENCES tasks(id),
+    depends_on TEXT NOT NULL,
+    PRIMARY KEY (task_id, depends_on)
+);
+CREATE TABLE IF NOT EXISTS log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    agent TEXT,
+    task_id TEXT,
+    event TEXT NOT NULL,
+    notes TEXT
+);
+CREATE INDEX IF NOT EXISTS log_event ON log(event, ts);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Dependencies still open: a task ID, or "Phase N" for every task in that phase
+OPEN_DEPS_SQL = """
+    SELECT d.depends_on FROM deps d
+    WHERE d.task_id = {task} AND EXISTS (
+        SELECT 1 FROM tasks p
+        WHERE (p.id = d.depends_on OR p.phase_key = d.depends_on COLLATE NOCASE)
+          AND p.status NOT IN ('done', 'skipped'))
+"""
+READY_SQL = f"""
+    SELECT id FROM tasks t
+    WHERE (t.status = 'available' OR (t.status = 'claimed' AND t.lease_until < :now))
+      AND NOT EXISTS ({OPEN_DEPS_SQL.format(task='t.id')})
+    ORDER BY t.position
+"""
+TASK_COLUMNS = ('id', 'title', 'phase', 'status', 'agent', 'claimed_at', 'lease_until',
+                'completed_at', 'notes', 'details', 'claims')
+
+
+class QueueError(Exception):
+    """A claim or update that isn't allowed (wrong agent, unmet dependencies, unknown task...)."""
+
+
+def phase_key(phase):
+    match = PHASE_KEY_RE.match(phase.strip())
+    return match.group(1) if match else phase.strip()
+
+
+def format_time(ts, with_time=True):
+    if not ts:
+        return ''
+    return time.strftime('%Y-%m-%d %H:%M' if with_time else '%Y-%m-%d', time.localtime(ts))
+
+
+def default_agent():
+    """AGENT_ID, else the ID of the only active session, else None."""
+    if os.environ.get('AGENT_ID'):
+        return os.environ['AGENT_ID']
+    sessions = sorted(ACTIVE_SESSIONS_DIR.glob('*.json')) if ACTIVE_SESSIONS_DIR.exists() else []
+    if len(sessions) == 1:
+        return f'Agent-{sessions[0].stem}'
+    return None
+
+
+class TaskQueue:
+    """The coordination store for one plan directory."""
+
+    def __init__(self, directory='.', render=True):
+        self.directory = Path(directory)
+        self.store_path = self.directory / STORE_NAME
+        self.plan_path = self.directory / PLAN_NAME
+        self.auto_render = render
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE
+        self.conn = sqlite3.connect(str(self.store_path), timeout=BUSY_TIMEOUT, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    # Transactions
+
+    def write(self, fn, *args, render=None):
+        """Run fn(*args) in one write transaction; EXECUTION.md is rendered before the lock is released."""
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            result = fn(*args)
+            if self.auto_render if render is None else render:
+                self.render()
+            self.conn.execute('COMMIT')
+        except BaseException:
+            self.conn.execute('ROLLBACK')
+            raise
+        return result
+
+    def log(self, event, task_id=None, agent=None, notes=None, ts=None):
+        self.conn.execute('INSERT INTO log (ts, agent, task_id, event, notes) VALUES (?, ?, ?, ?, ?)',
+                          (ts or time.time(), agent, task_id, event, notes))
+
+    # Reads
+
+    def task(self, task_id):
+        row = self.conn.execute(f"SELECT {', '.join(TASK_COLUMNS)} FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        if row is None:
+            raise QueueError(f"No task {task_id}")
+        task = dict(zip(TASK_COLUMNS, row))
+        task['depends'] = self.depends(task_id)
+        return task
+
+    def tasks(self):
+        rows = self.conn.execute(f"SELECT {', '.join(TASK_COLUMNS)} FROM tasks ORDER BY position").fetchall()
+        deps = {}
+        for task_id, depends_on in self.conn.execute('SELECT task_id, depends_on FROM deps ORDER BY rowid'):
+            deps.setdefault(task_id, []).append(depends_on)
+        return [dict(zip(TASK_COLUMNS, row), depends=deps.get(row[0], [])) for row in rows]
+
+    def depends(self, task_id):
+        return [row[0] for row in self.conn.execute('SELECT depends_on FROM deps WHERE task_id = ? ORDER BY rowid',
+                                                    (task_id,))]
+
+    def open_deps(self, task_id):
+        return [row[0] for row in self.conn.execute(OPEN_DEPS_SQL.format(task='?'), (task_id,))]
+
+    def ready(self, now=None):
+        """IDs of tasks that can be claimed now, in plan order."""
+        return [row[0] for row in self.conn.execute(READY_SQL, {'now': now or time.time()})]
+
+    def status(self):
+        now = time.time()
+        counts = dict(self.conn.execute('SELECT status, COUNT(*) FROM tasks GROUP BY status').fetchall())
+        claimed = [{'id': task_id, 'title': title, 'agent': agent, 'lease_left_min': round((lease - now) / 60, 1)}
+                   for task_id, title, agent, lease in self.conn.execute(
+                       "SELECT id, title, agent, lease_until FROM tasks WHERE status = 'claimed' ORDER BY position")]
+        return {'title': self.meta('title') or self.directory.resolve().name,
+                'counts': {status: counts.get(status, 0) for status in STATUS_MARKS},
+                'ready': self.ready(now), 'claimed': claimed,
+                'expired': [c['id'] for c in claimed if c['lease_left_min'] < 0]}
+
+    def meta(self, key, default=None):
+        row = self.conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        self.conn.execute('INSERT INTO meta (key, value) VALUES (?, ?) '
+                          'ON CONFLICT(key) DO UPDATE SET value = excluded.value', (key, value))
+
+    # Changes
+
+    def _add(self, task_id, title, phase='', depends=(), status='available', details=None):
+        if self.conn.execute('SELECT 1 FROM tasks WHERE id = ?', (task_id,)).fetchone():
+            raise QueueError(f"Task {task_id} already exists")
+        position = self.conn.execute('SELECT COALESCE(MAX(position), 0) + 1 FROM tasks').fetchone()[0]
+        self.conn.execute('INSERT INTO tasks (id, title, phase, phase_key, position, status, details) '
+                          'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                          (task_id, title, phase, phase_key(phase), position, status, details))
+        for dep in depends:
+            known = self.conn.execute('SELECT 1 FROM tasks WHERE id = ? OR phase_key = ? COLLATE NOCASE',
+                                      (dep, dep)).fetchone()
+            if not known:
+                raise QueueError(f"Task {task_id} depends on unknown task or phase '{dep}'")
+            self.conn.execute('INSERT OR IGNORE INTO deps (task_id, depends_on) VALUES (?, ?)', (task_id, dep))
+        # Checked in the same transaction, so write() rolls the task back on a cycle
+        cycle = self.find_cycle() if depends else None
+        if cycle:
+            raise QueueError(f"Dependency cycle: {' -> '.join(cycle)}")
+        self.log('add', task_id)
+
+    def add(self, task_id, title, phase='', depends=(), details=None):
+        self.write(self._add, task_id, title, phase, depends, 'available', details)
+
+    def _claim(self, task_id, agent, lease_minutes, now):
+        """Claim task_id if it is ready (or an expired claim). Returns the task."""
+        task = self.task(task_id)
+        if task['status'] == 'claimed' and task['agent'] == agent and task['lease_until'] >= now:
+            return task
+        if task['status'] == 'claimed' and task['lease_until'] >= now:
+            raise QueueError(f"Task {task_id} is claimed by {task['agent']} until {format_time(task['lease_until'])}")
+        if task['status'] not in ('available', 'claimed'):
+            raise QueueError(f"Task {task_id} is {task['status']}")
+        waiting = self.open_deps(task_id)
+        if waiting:
+            raise QueueError(f"Task {task_id} is waiting on {', '.join(waiting)}")
+        if task['status'] == 'claimed':
+            self.log('expire', task_id, task['agent'], f"lease expired {format_time(task['lease_until'])}")
+        self.conn.execute("UPDATE tasks SET status = 'claimed', agent = ?, claimed_at = ?, lease_until = ?, "
+                          "claims = claims + 1 WHERE id = ?", (agent, now, now + lease_minutes * 60, task_id))
+        self.log('claim', task_id, agent)
+        return self.task(task_id)
+
+    def claim(self, task_id, agent, lease_minutes=DEFAULT_LEASE_MINUTES):
+        return self.write(self._claim, task_id, agent, lease_minutes, time.time())
+
+    def claim_next(self, agent, lease_minutes=DEFAULT_LEASE_MINUTES):
+        """Atomically claim the first ready task. None if nothing is ready."""
+        def claim_first():
+            now = time.time()
+            ready = self.conn.execute(READY_SQL + ' LIMIT 1', {'now': now}).fetchone()
+            return self._claim(ready[0], agent, lease_minutes, now) if ready else None
+        return self.write(claim_first)
+
+    def heartbeat(self, agent, task_id=None, lease_minutes=DEFAULT_LEASE_MINUTES):
+        """Extend the agent's leases. Returns (renewed IDs, IDs the agent no longer holds)."""
+        def renew():
+            now = time.time()
+            held = [row[0] for row in self.conn.execute(
+                "SELECT id FROM tasks WHERE status = 'claimed' AND agent = ? AND (? IS NULL OR id = ?)",
+                (agent, task_id, task_id))]
+            self.conn.execute(
+                "UPDATE tasks SET lease_until = ? WHERE status = 'claimed' AND agent = ? AND (? IS NULL OR id = ?)",
+                (now + lease_minutes * 60, agent, task_id, task_id))
+            lost = [task_id] if task_id and task_id not in held else []
+            return held, lost
+        # Leases aren't shown in EXECUTION.md, so heartbeats don't re-render it
+        return self.write(renew, render=False)
+
+    def _finish(self, task_id, agent, status, notes, force):
+        task = self.task(task_id)
+        if task['status'] in FINISHED:
+            raise QueueError(f"Task {task_id} is already {task['status']}")
+        if status == 'done' and not force and (task['status'] != 'claimed' or task['agent'] != agent):
+            holder = f"claimed by {task['agent']}" if task['status'] == 'claimed' else task['status']
+            raise QueueError(f"Task {task_id} is {holder}; claim it first (or --force)")
+        before = set(self.ready())
+        now = time.time()
+        self.conn.execute('UPDATE tasks SET status = ?, agent = COALESCE(?, agent), completed_at = ?, '
+                          'lease_until = NULL, notes = COALESCE(?, notes) WHERE id = ?',
+                          (status, agent, now, notes, task_id))
+        self.log('complete' if status == 'done' else 'skip', task_id, agent, notes)
+        return [ready for ready in self.ready() if ready not in before]
+
+    def complete(self, task_id, agent, notes=None, force=False):
+        """Mark a claimed task done. Returns the IDs it unblocked."""
+        return self.write(self._finish, task_id, agent, 'done', notes, force)
+
+    def skip(self, task_id, agent=None, notes=None):
+        return self.write(self._finish, task_id, agent, 'skipped', notes, True)
+
+    def _set_status(self, task_id, agent, status, notes, expect):
+        task = self.task(task_id)
+        if task['status'] not in expect:
+            raise QueueError(f"Task {task_id} is {task['status']}")
+        if status == 'available' and task['status'] == 'claimed' and agent and task['agent'] != agent:
+            raise QueueError(f"Task {task_id} is claimed by {task['agent']}")
+        self.conn.execute('UPDATE tasks SET status = ?, agent = ?, lease_until = NULL, notes = COALESCE(?, notes) '
+                          'WHERE id = ?', (status, agent if status == 'blocked' else None, notes, task_id))
+        self.log({'available': 'release', 'blocked': 'block'}[status], task_id, agent, notes)
+
+    def release(self, task_id, agent=None, notes=None):
+        """Give a claim back (or unblock a blocked task)."""
+        self.write(self._set_status, task_id, agent, 'available', notes, ('claimed', 'blocked'))
+
+    def block(self, task_id, agent=None, notes=None):
+        self.write(self._set_status, task_id, agent, 'blocked', notes, ('available', 'claimed'))
+
+    # EXECUTION.md
+
+    def import_plan(self, text):
+        """Load tasks, statuses, dependencies and the completion log from an EXECUTION.md."""
+        plan = parse_plan(text)
+
+        def load():
+            if self.conn.execute('SELECT 1 FROM tasks LIMIT 1').fetchone():
+                raise QueueError(f"{self.store_path} already has tasks")
+            if plan['title']:
+                self.set_meta('title', plan['title'])
+            self.set_meta('sections', json.dumps(plan['sections']))
+            # Dependencies may point forward, so add every task before linking
+            for task in plan['tasks']:
+                self._add(task['id'], task['title'], task['phase'], (), task['status'], task['details'])
+                self.conn.execute('UPDATE tasks SET agent = ?, notes = ?, completed_at = ? WHERE id = ?',
+                                  (task['agent'], task['notes'], task['completed_at'], task['id']))
+                if task['status'] == 'claimed':
+                    # Claims made by hand get one lease from now to finish or heartbeat
+                    now = time.time()
+                    self.conn.execute('UPDATE tasks SET claimed_at = ?, lease_until = ?, claims = 1 WHERE id = ?',
+                                      (now, now + DEFAULT_LEASE_MINUTES * 60, task['id']))
+            for task in plan['tasks']:
+                for dep in task['depends']:
+                    known = self.conn.execute('SELECT 1 FROM tasks WHERE id = ? OR phase_key = ? COLLATE NOCASE',
+                                              (dep, dep)).fetchone()
+                    if not known:
+                        raise QueueError(f"Task {task['id']} depends on unknown task or phase '{dep}'")
+                    self.conn.execute('INSERT OR IGNORE INTO deps (task_id, depends_on) VALUES (?, ?)',
+                                      (task['id'], dep))
+            cycle = self.find_cycle()
+            if cycle:
+                raise QueueError(f"Dependency cycle: {' -> '.join(cycle)}")
+            for entry in plan['log']:
+                self.log('complete', entry['task'], entry['agent'], entry['notes'], entry['ts'])
+            return len(plan['tasks'])
+        return self.write(load)
+
+    def find_cycle(self):
+        """A dependency cycle as a list of IDs, or None."""
+        phases = {}
+        for task_id, key in self.conn.execute('SELECT id, phase_key FROM tasks'):
+            phases.setdefault(key.casefold(), []).append(task_id)
+        edges = {}
+        for task_id, dep in self.conn.execute('SELECT task_id, depends_on FROM deps'):
+            edges.setdefault(task_id, []).extend(phases.get(dep.casefold(), [dep]))
+        # Iterative depth-first search, so long dependency chains don't hit the recursion limit
+        done = set()
+        for start in edges:
+            if start in done:
+                continue
+            path, on_path = [start], {start}
+            stack = [iter(edges.get(start, []))]
+            while stack:
+                nxt = next(stack[-1], None)
+                if nxt is None:
+                    node = path.pop()
+                    on_path.discard(node)
+                    done.add(node)
+                    stack.pop()
+                    continue
+                if nxt in on_path:
+                    return path[path.index(nxt):] + [nxt]
+                if nxt not in done:
+                    path.append(nxt)
+                    on_path.add(nxt)
+                    stack.append(iter(edges.get(nxt, [])))
+        return None
+
+    def render(self, path=None):
+        """Write EXECUTION.md from the store (atomically)."""
+        path = Path(path or self.plan_path)
+        text = render_plan(self.meta('title') or self.directory.resolve().name, self.tasks(),
+                           self.completion_log(), json.loads(self.meta('sections') or '[]'))
+        tmp_path = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+        tmp_path.write_text(text)
+        os.replace(tmp_path, path)
+        return path
+
+    def completion_log(self):
+        return [{'ts': ts, 'agent': agent, 'task': task_id, 'notes': notes}
+                for ts, agent, task_id, notes in self.conn.execute(
+                    "SELECT ts, agent, task_id, notes FROM log WHERE event = 'complete' ORDER BY ts, id")]
+
+
+def parse_date(text):
+    """Timestamp of the first YYYY-MM-DD in text, or None."""
+    match = DATE_RE.search(text or '')
+    try:
+        return time.mktime(time.strptime(match.group(0), '%Y-%m-%d')) if match else None
+    except ValueError:
+        return None
+
+
+def split_depends(text):
+    depends = DEPENDS_RE.search(text)
+    return [d.strip() for d in depends.group(1).split(',') if d.strip()] if depends else []
+
+
+def parse_plan(text):
+    """Title, tasks, completion log and other sections of an EXECUTION.md."""
+    plan = {'title': None, 'tasks': [], 'log': [], 'sections': []}
+    section, phase, phase_depends, task, extra = '', '', [], None, None
+    for line in text.splitlines():
+        heading = HEADING_RE.match(line)
+        if heading:
+            level, name = len(heading.group(1)), heading.group(2)
+            task = None
+            if level == 1:
+                plan['title'] = re.sub(r':?\s*Execution Plan$', '', name, flags=re.I).strip() or None
+                extra = None
+                continue
+            if PHASE_KEY_RE.match(name):
+                # "### Phase 2: Build (depends: Phase 1)" applies to every task in the phase
+                phase, phase_depends = DEPENDS_RE.sub('', name).strip(), split_depends(name)
+                continue
+            if level == 2:
+                section = name.casefold()
+                phase, phase_depends = '', []
+                extra = None if section in RENDERED_SECTIONS else [line]
+                if extra is not None:
+                    plan['sections'].append(extra)
+                continue
+        if extra is not None:
+            extra.append(line)
+            continue
+        match = TASK_RE.match(line.strip()) if not line.startswith((' ', '\t')) else None
+        if match and section != 'task status key':
+            mark, task_id, rest = match.groups()
+            head, _, tail = rest.partition(' — ')
+            depends = split_depends(head)
+            depends += [dep for dep in phase_depends if dep not in depends]
+            status = MARK_STATUSES[mark]
+            agent = AGENT_RE.search(tail)
+            notes = tail.split(':', 1)[1].strip() if status in ('blocked', 'skipped') and ':' in tail else None
+            task = {'id': task_id, 'title': DEPENDS_RE.sub('', head).strip(), 'phase': phase, 'status': status,
+                    'depends': depends, 'agent': agent.group(1) if agent else None, 'notes': notes,
+                    'completed_at': parse_date(tail) if status in FINISHED else None, 'details': None}
+            plan['tasks'].append(task)
+            continue
+        if task is not None and line.startswith((' ', '\t')) and line.strip():
+            task['details'] = (task['details'] + '\n' if task['details'] else '') + line.rstrip()
+            continue
+        row = LOG_ROW_RE.match(line.strip()) if section == 'completion log' else None
+        if row:
+            date, agent, task_id, notes = row.groups()
+            plan['log'].append({'ts': parse_date(date) or time.time(), 'agent': agent or None,
+                                'task': task_id or None, 'notes': notes.replace('\\|', '|') or None})
+    plan['sections'] = ['\n'.join(lines).strip() for lines in plan['sections']]
+    return plan
+
+
+def render_plan(title, tasks, log, sections):
+    lines = [
+        f'# {title}: Execution Plan', '',
+        f'<!-- Rendered from {STORE_NAME} by task_queue.py. Change tasks through the CLI; '
+        f'edits to this file are overwritten. -->', '',
+        '## Agent Protocol',
+        '1. `python task_queue.py next --agent ID` claims the next ready task (dependencies done)',
+        '2. Execute with verification; `heartbeat --agent ID` at least every '
+        f'{DEFAULT_LEASE_MINUTES} minutes, or the claim expires and the task is re-offered',
+        '3. `complete TASK --agent ID --notes "..."` once verified',
+        '4. `release`, `block` or `skip` a task you cannot finish', '',
+        '## Task Status Key',
+        '| Symbol | Meaning |',
+        '|--------|---------|',
+        '| [ ] | Available |',
+        '| [~] | In progress (claimed) |',
+        '| [x] | Complete (verified) |',
+        '| [!] | Blocked |',
+        '| [-] | Skipped |', '',
+        '## Tasks',
+    ]
+    phase = None
+    for task in tasks:
+        if task['phase'] != phase or phase is None:
+            phase = task['phase']
+            lines.extend(['', f'### {phase}' if phase else '### Tasks'])
+        depends = f" (depends: {', '.join(task['depends'])})" if task['depends'] else ''
+        status = task['status']
+        if status == 'done':
+            suffix = f" — DONE by {task['agent'] or '?'} {format_time(task['completed_at'], False)}".rstrip()
+        elif status == 'claimed':
+            suffix = f" — CLAIMED by {task['agent']}"
+        elif status == 'blocked':
+            suffix = f" — BLOCKED: {task['notes'] or 'no reason given'}"
+        elif status == 'skipped':
+            suffix = f" — SKIPPED: {task['notes']}" if task['notes'] else ' — SKIPPED'
+        else:
+            suffix = ''
+        lines.append(f"- [{STATUS_MARKS[status]}] {task['id']} {task['title']}{depends}{suffix}")
+        if task['details']:
+            lines.append(task['details'])
+    lines.extend(['', '## COMPLETION LOG', '| Date | Agent | Task | Notes |', '|------|-------|------|-------|'])
+    for entry in log:
+        notes = (entry['notes'] or '').replace('|', '\\|').replace('\n', ' ')
+        lines.append(f"| {format_time(entry['ts'], False)} | {entry['agent'] or ''} | {entry['task'] or ''} | {notes} |")
+    for section in sections:
+        lines.extend(['', section])
+    return '\n'.join(lines) + '\n'
+
+
+def print_status(status):
+    counts = status['counts']
+    total = sum(counts.values())
+    print(f"{status['title']}: {counts['done']}/{total} done, {counts['claimed']} claimed, "
+          f"{counts['available']} available, {counts['blocked']} blocked, {counts['skipped']} skipped")
+    print(f"  ready: {', '.join(status['ready']) or '-'}")
+    for claim in status['claimed']:
+        lease = f"{claim['lease_left_min']} min left" if claim['lease_left_min'] >= 0 else 'EXPIRED'
+        print(f"  [~] {claim['id']} {claim['title']} — {claim['agent']} ({lease})")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Atomic task queue for parallel agents, rendered to EXECUTION.md',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--dir', default=os.environ.get('EXECUTION_DIR', '.'),
+                        help='Plan directory holding EXECUTION.md and the store (default: EXECUTION_DIR or .)')
+    parser.add_argument('--no-render', action='store_true', help='Do not re-render EXECUTION.md')
+    commands = parser.add_subparsers(dest='command', metavar='COMMAND')
+
+    def agent_command(name, help, task=True, task_required=True):
+        sub = commands.add_parser(name, help=help)
+        if task:
+            sub.add_argument('task', nargs=None if task_required else '?', help='Task ID')
+        sub.add_argument('--agent', default=default_agent(), help='Agent ID (default: AGENT_ID or the active session)')
+        return sub
+
+    import_parser = commands.add_parser('import', help='Load an existing EXECUTION.md into an empty store')
+    import_parser.add_argument('file', nargs='?', help=f'Plan to import (default: DIR/{PLAN_NAME})')
+    add_parser = commands.add_parser('add', help='Add a task')
+    add_parser.add_argument('task', help='Task ID, e.g. 2.3')
+    add_parser.add_argument('title')
+    add_parser.add_argument('--phase', default='', help='Phase heading, e.g. "Phase 2: Implementation"')
+    add_parser.add_argument('--depends', default='', help='Comma-separated task IDs or phases ("Phase 1")')
+    for sub in (agent_command('next', 'Claim the next ready task', task=False),
+                agent_command('claim', 'Claim a specific task')):
+        sub.add_argument('--lease', type=float, default=DEFAULT_LEASE_MINUTES,
+                         help=f'Lease in minutes (default: {DEFAULT_LEASE_MINUTES})')
+        sub.add_argument('--json', action='store_true', help='Print the claimed task as JSON')
+    heartbeat_parser = agent_command('heartbeat', "Extend the agent's leases", task_required=False)
+    heartbeat_parser.add_argument('--lease', type=float, default=DEFAULT_LEASE_MINUTES,
+                                  help=f'New lease in minutes from now (default: {DEFAULT_LEASE_MINUTES})')
+    complete_parser = agent_command('complete', 'Mark a claimed task done')
+    complete_parser.add_argument('--force', action='store_true', help='Complete even if not claimed by this agent')
+    for sub in (complete_parser, agent_command('release', 'Give a claim back, or unblock a task'),
+                agent_command('block', 'Mark a task blocked'), agent_command('skip', 'Mark a task skipped')):
+        sub.add_argument('--notes', help='Completion notes or reason')
+    status_parser = commands.add_parser('status', help='Counts, ready tasks and live claims')
+    status_parser.add_argument('--json', action='store_true', help='Output as JSON')
+    commands.add_parser('render', help=f'Re-render DIR/{PLAN_NAME}')
+
+    args = parser.parse_args()
+    if not args.command:
+        parser.print_help()
+        sys.exit(1)
+    if getattr(args, 'agent', '') is None and args.command in ('next', 'claim', 'heartbeat', 'complete'):
+        print("✗ No agent ID. Pass --agent or set AGENT_ID")
+        sys.exit(1)
+
+    queue = TaskQueue(args.dir, render=not args.no_render)
+    try:
+        if args.command == 'import':
+            source = Path(args.file) if args.file else queue.plan_path
+            text = source.read_text()
+            if source.resolve() == queue.plan_path.resolve():
+                backup = source.with_name(source.name + '.bak')
+                backup.write_text(text)
+                print(f"  (original kept as {backup})")
+            count = queue.import_plan(text)
+            print(f"✓ Imported {count} tasks into {queue.store_path}; ready: {', '.join(queue.ready()) or '-'}")
+
+        elif args.command == 'add':
+            depends = [d.strip() for d in args.depends.split(',') if d.strip()]
+            queue.add(args.task, args.title, args.phase, depends)
+            print(f"✓ Added {args.task} {args.title}")
+
+        elif args.command in ('next', 'claim'):
+            task = (queue.claim_next(args.agent, args.lease) if args.command == 'next'
+                    else queue.claim(args.task, args.agent, args.lease))
+            if task is None:
+                status = queue.status()
+                counts = status['counts']
+                if counts['available'] + counts['claimed'] + counts['blocked'] == 0:
+                    print("✓ All tasks are done")
+                    sys.exit(0)
+                print(f"No task ready: {counts['claimed']} claimed, {counts['available']} waiting on dependencies, "
+                      f"{counts['blocked']} blocked")
+                sys.exit(2)
+            if args.json:
+                print(json.dumps(task, indent=2))
+            else:
+                print(f"✓ Claimed {task['id']} {task['title']} until {format_time(task['lease_until'])}")
+                if task['details']:
+                    print(task['details'])
+
+        elif args.command == 'heartbeat':
+            held, lost = queue.heartbeat(args.agent, args.task, args.lease)
+            if lost:
+                print(f"✗ {', '.join(lost)} no longer claimed by {args.agent}; stop work on it and run `next`")
+                sys.exit(1)
+            print(f"✓ Lease extended {args.lease:g} min: {', '.join(held) or 'no claimed tasks'}")
+
+        elif args.command == 'complete':
+            unblocked = queue.complete(args.task, args.agent, args.notes, args.force)
+            print(f"✓ Completed {args.task}" + (f"; now ready: {', '.join(unblocked)}" if unblocked else ''))
+
+        elif args.command in ('release', 'block', 'skip'):
+            getattr(queue, args.command)(args.task, args.agent, args.notes)
+            print(f"✓ {PAST_TENSE[args.command]} {args.task}")
+
+        elif args.command == 'status':
+            status = queue.status()
+            if args.json:
+                print(json.dumps(status, indent=2))
+            else:
+                print_status(status)
+
+        elif args.command == 'render':
+            print(f"✓ Rendered {queue.render()}")
+
+    except (QueueError, OSError) as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+    finally:
+        queue.close()
+
+
+if __name__ == '__main__':
+    main()
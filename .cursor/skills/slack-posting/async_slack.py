@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Async Slack posting API for agents running asyncio orchestration code.
+
+Mirrors post_message.py (post_message, set_channel_topic, set_channel_purpose,
+create_channel, list_channels) on top of slack_sdk's AsyncWebClient. All
+calls on an event loop share one aiohttp session. Close it with
+`async with async_slack.session():` around the work, or await close() before
+the loop ends. Channel lookups go through the same on-disk cache as
+the sync scripts. Cache reads and writes run in a worker thread
+(asyncio.to_thread), since they parse JSON and take a file lock.
+
+Usage:
+    import asyncio
+    import async_slack
+
+    async def main():
+        async with async_slack.session():
+            await async_slack.post_message(token, "proj-my-project", "Update: done")
+            await async_slack.post_to_channels(token, ["proj-a", "proj-b"], "Weekly sync at 3pm")
+
+    asyncio.run(main())
+
+Requires: pip install slack_sdk aiohttp
+"""
+
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+
+import aiohttp
+from slack_sdk.web.async_client import AsyncWebClient
+from slack_sdk.errors import SlackApiError
+from slack_sdk.http_retry.builtin_async_handlers import (
+    AsyncConnectionErrorRetryHandler, AsyncRateLimitErrorRetryHandler
+)
+
+import channel_cache
+import slack_client
+
+DEFAULT_CONCURRENCY = 8
+
+_lock = threading.Lock()
+_sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+_clients: Dict[asyncio.AbstractEventLoop, Dict[str, AsyncWebClient]] = {}
+
+
+def get_client(token: str) -> AsyncWebClient:
+    """Return the client for a token on the running loop, sharing that loop's HTTP session.
+
+    Must be called from inside a running event loop. Each loop gets its own
+    session (aiohttp sessions are bound to the loop that created them), and
+    entries for loops that have since closed are dropped.
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        for old_loop in [old_loop for old_loop in _sessions if old_loop.is_closed()]:
+            del _sessions[old_loop]
+            _clients.pop(old_loop, None)
+        if loop not in _sessions or _sessions[loop].closed:
+            _sessions[loop] = aiohttp.ClientSession()
+            _clients[loop] = {}
+        clients = _clients[loop]
+        if token not in clients:
+            kwargs = {'base_url': slack_client.API_URL.rstrip('/') + '/'} if slack_client.API_URL else {}
+            # Same retry policy as slack_client's sync clients: a 429 waits out Retry-After
+            handlers = [AsyncConnectionErrorRetryHandler(max_retry_count=slack_client.CONNECTION_RETRIES),
+                        AsyncRateLimitErrorRetryHandler(max_retry_count=slack_client.RATE_LIMIT_RETRIES)]
+            clients[token] = AsyncWebClient(token=token, session=_sessions[loop],
+                                            retry_handlers=handlers, **kwargs)
+        return clients[token]
+
+
+async def close() -> None:
+    """Close the running loop's shared HTTP session (call once at shutdown)."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        session = _sessions.pop(loop, None)
+        _clients.pop(loop, None)
+    if session is not None:
+        await session.close()
+
+
+@asynccontextmanager
+async def session() -> AsyncIterator[None]:
+    """Scope for async_slack calls on this loop; the shared session is closed on exit.
+
+        async with async_slack.session():
+            await async_slack.post_message(token, "proj-a", "hi")
+    """
+    try:
+        yield
+    finally:
+        await close()
+
+
+def _is_channel_id(channel: str) -> bool:
+    return channel.startswith('C') and channel[1:].isalnum()
+
+
+async def refresh_directory(client: AsyncWebClient) -> Optional[Dict[str, str]]:
+    """Re-fetch the full channel directory into the shared cache. None on API error."""
+    channels = {}
+    try:
+        cursor = None
+        while True:
+            result = await client.conversations_list(
+                types="public_channel,private_channel",
+                limit=200,
+                cursor=cursor
+            )
+
+            for channel in result["channels"]:
+                channels[channel["name"]] = channel["id"]
+
+            cursor = result.get("response_metadata", {}).get("next_cursor")
+            if not cursor:
+                break
+
+    except SlackApiError as e:
+        print(f"Error listing channels: {e.response['error']}")
+        return None
+
+    await asyncio.to_thread(channel_cache.store_directory, client, channels)
+    return channels
+
+
+async def find_channel_id(client: AsyncWebClient, channel_name: str, refresh: bool = False) -> Optional[str]:
+    """Find channel ID from channel name (cached on disk, see channel_cache.py)."""
+    channel_name = channel_name.lstrip('#')
+
+    if not refresh:
+        channel_id = await asyncio.to_thread(channel_cache.cached_channel_id, client, channel_name)
+        if channel_id:
+            return channel_id
+
+    channels = await refresh_directory(client)
+    if channels is None:
+        return None
+    return channels.get(channel_name)
+
+
+async def _call_with_channel(client: AsyncWebClient, channel: str, method, channel_arg: str = 'channel', **kwargs):
+    """Resolve `channel` and call `method`, retrying once if a cached ID was stale.
+
+    Async counterpart of channel_cache.call_with_channel(). Returns None when
+    the channel name cannot be resolved.
+    """
+    if _is_channel_id(channel):
+        return await method(**{channel_arg: channel}, **kwargs)
+
+    channel_name = channel.lstrip('#')
+    channel_id = await find_channel_id(client, channel_name)
+    if not channel_id:
+        return None
+    try:
+        return await method(**{channel_arg: channel_id}, **kwargs)
+    except SlackApiError as e:
+        if e.response.get('error') not in channel_cache.STALE_CHANNEL_ERRORS:
+            raise
+        await asyncio.to_thread(channel_cache.forget_channel, client, channel_name)
+        fresh_id = await find_channel_id(client, channel_name, refresh=True)
+        if not fresh_id or fresh_id == channel_id:
+            raise
+        return await method(**{channel_arg: fresh_id}, **kwargs)
+
+
+async def post_message(token: str, channel: str, message: str, thread_ts: Optional[str] = None) -> bool:
+    """Post a message to a Slack channel.
+
+    Args:
+        token: Slack Bot Token (xoxb-...)
+        channel: Channel name (with or without #) or channel ID
+        message: Message text (supports Slack markdown)
+        thread_ts: Optional parent message timestamp to reply in a thread
+
+    Returns:
+        True if successful, False otherwise
+    """
+    client = get_client(token)
+    channel_name = channel.lstrip('#')
+    kwargs = {'text': message}
+    if thread_ts:
+        kwargs['thread_ts'] = thread_ts
+
+    try:
+        result = await _call_with_channel(client, channel, client.chat_postMessage, **kwargs)
+        if result is None:
+            print(f"Error: Channel '{channel_name}' not found")
+            return False
+        print(f"✓ Posted to #{channel_name}")
+        return True
+    except SlackApiError as e:
+        error = e.response['error']
+        if error == 'not_in_channel':
+            print(f"Error: Bot is not a member of #{channel_name}. Please add the bot to the channel first.")
+        elif error == 'channel_not_found':
+            print(f"Error: Channel '{channel_name}' not found or bot doesn't have access.")
+        else:
+            print(f"Error posting message: {error}")
+        return False
+
+
+async def set_channel_topic(token: str, channel: str, topic: str) -> bool:
+    """Set a channel's topic (max 250 chars). Returns True if successful."""
+    client = get_client(token)
+    try:
+        result = await _call_with_channel(client, channel, client.conversations_setTopic, topic=topic[:250])
+        if result is None:
+            print(f"Error: Channel '{channel}' not found")
+            return False
+        print(f"✓ Set topic for #{channel}")
+        return True
+    except SlackApiError as e:
+        print(f"Error setting topic: {e.response['error']}")
+        return False
+
+
+async def set_channel_purpose(token: str, channel: str, purpose: str) -> bool:
+    """Set a channel's purpose/description (max 250 chars). Returns True if successful."""
+    client = get_client(token)
+    try:
+        result = await _call_with_channel(client, channel, client.conversations_setPurpose, purpose=purpose[:250])
+        if result is None:
+            print(f"Error: Channel '{channel}' not found")
+            return False
+        print(f"✓ Set purpose for #{channel}")
+        return True
+    except SlackApiError as e:
+        print(f"Error setting purpose: {e.response['error']}")
+        return False
+
+
+async def create_channel(token: str, name: str, description: Optional[str] = None,
+                         is_private: bool = False) -> Optional[str]:
+    """Create a new Slack channel. Returns the channel ID (existing one if the name is taken)."""
+    client = get_client(token)
+
+    # Sanitize channel name (lowercase, no spaces, max 80 chars)
+    clean_name = name.lower().replace(' ', '-').replace('_', '-')[:80]
+
+    try:
+        result = await client.conversations_create(name=clean_name, is_private=is_private)
+        channel_id = result['channel']['id']
+        await asyncio.to_thread(channel_cache.remember_channel, client, clean_name, channel_id)
+        print(f"✓ Created channel #{clean_name} ({channel_id})")
+
+        if description:
+            try:
+                await client.conversations_setPurpose(channel=channel_id, purpose=description[:250])
+                print(f"  Set purpose: {description[:50]}...")
+            except SlackApiError as e:
+                print(f"  Warning: Could not set purpose: {e.response['error']}")
+
+        return channel_id
+
+    except SlackApiError as e:
+        error = e.response['error']
+        if error == 'name_taken':
+            print(f"Error: Channel #{clean_name} already exists")
+            existing_id = await find_channel_id(client, clean_name)
+            if existing_id:
+                await asyncio.to_thread(channel_cache.remember_channel, client, clean_name, existing_id)
+                print(f"  Existing channel ID: {existing_id}")
+            return existing_id
+        print(f"Error creating channel: {error}")
+        return None
+
+
+async def list_channels(token: str) -> List[dict]:
+    """Return all accessible channels (paginated), sorted by name."""
+    client = get_client(token)
+    channels = []
+    try:
+        cursor = None
+        while True:
+            result = await client.conversations_list(
+                types="public_channel,private_channel",
+                limit=200,
+                cursor=cursor
+            )
+            channels.extend(result["channels"])
+            cursor = result.get("response_metadata", {}).get("next_cursor")
+            if not cursor:
+                break
+    except SlackApiError as e:
+        print(f"Error listing channels: {e.response['error']}")
+        return []
+
+    await asyncio.to_thread(channel_cache.store_directory, client, {c["name"]: c["id"] for c in channels})
+    return sorted(channels, key=lambda c: c["name"])
+
+
+async def gather_limited(coros: Iterable, limit: int = DEFAULT_CONCURRENCY) -> list:
+    """Await coroutines concurrently with at most `limit` in flight, keeping order."""
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(coro):
+        async with semaphore:
+            return await coro
+
+    return await asyncio.gather(*(run(coro) for coro in coros))
+
+
+async def post_to_channels(token: str, channels: Iterable[str], message: str,
+                           limit: int = DEFAULT_CONCURRENCY) -> Dict[str, bool]:
+    """Post the same message to many channels in one await.
+
+    Returns:
+        {channel: success} for each channel
+    """
+    channels = list(channels)
+    client = get_client(token)
+    # Warm the channel cache once so concurrent posts don't each paginate
+    names = [c for c in channels if not _is_channel_id(c)]
+    cached = await asyncio.to_thread(lambda: [channel_cache.cached_channel_id(client, c) for c in names])
+    if not all(cached):
+        await refresh_directory(client)
+    results = await gather_limited((post_message(token, c, message) for c in channels), limit)
+    return dict(zip(channels, results))
+
+
+async def set_topics(token: str, topics: Dict[str, str], limit: int = DEFAULT_CONCURRENCY) -> Dict[str, bool]:
+    """Set topics for many channels concurrently. `topics` maps channel → topic."""
+    results = await gather_limited(
+        (set_channel_topic(token, channel, topic) for channel, topic in topics.items()), limit
+    )
+    return dict(zip(topics, results))
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the Slack scripts using `python -X importtime`.
+
+Runs each script's cheap paths (--help, local-only commands) in fresh
+interpreters and reports wall time, total import time, and which heavy
+dependencies (slack_sdk, requests, bs4) were loaded. For comparison it also
+measures importing those dependencies eagerly, which is what every run paid
+before slack_client.py made them lazy.
+
+Usage:
+    python bench_startup.py
+    python bench_startup.py --runs 20 --json
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+SKILLS_DIR = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ('slack_sdk', 'requests', 'bs4', 'aiohttp')
+# Dependencies each script imported at module level before the lazy-import change
+EAGER_DEPS = {
+    'post_message.py': ['slack_sdk'],
+    'channel_cache.py': ['slack_sdk'],
+    'create_canvas.py': ['slack_sdk'],
+    'sync_canvas.py': ['slack_sdk', 'requests', 'bs4'],
+}
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+SAMPLE_HTML = '<h1>Tasks</h1><ul><li class="checked">Done</li><li>Open</li></ul><p>Notes</p>'
+
+
+def cases(html_path):
+    """(label, script path, args) for every cheap path measured."""
+    posting, canvas = SKILLS_DIR / 'slack-posting', SKILLS_DIR / 'canvas-sync'
+    return [
+        ('post_message --help', posting / 'post_message.py', ['--help']),
+        ('channel_cache --show', posting / 'channel_cache.py', ['--show']),
+        ('create_canvas --help', canvas / 'create_canvas.py', ['--help']),
+        ('sync_canvas --help', canvas / 'sync_canvas.py', ['--help']),
+        ('sync_canvas --check-parsers', canvas / 'sync_canvas.py', ['--check-parsers', str(html_path)]),
+    ]
+
+
+def parse_importtime(stderr):
+    """Total import time (µs) of top-level imports and the set of modules loaded."""
+    total, modules = 0, set()
+    for line in stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if not match:
+            continue
+        cumulative, indent, name = int(match.group(2)), match.group(3), match.group(4)
+        modules.add(name)
+        if len(indent) <= 1:
+            total += cumulative
+    return total, modules
+
+
+def run_once(argv, env):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', *argv],
+                            capture_output=True, text=True, env=env)
+    wall = time.perf_counter() - start
+    import_us, modules = parse_importtime(result.stderr)
+    return wall, import_us, modules
+
+
+def measure(argv, runs, env):
+    walls, imports, modules = [], [], set()
+    for _ in range(runs):
+        wall, import_us, loaded = run_once(argv, env)
+        walls.append(wall)
+        imports.append(import_us)
+        modules |= loaded
+    return {
+        'wall_ms': round(statistics.median(walls) * 1000, 1),
+        'import_ms': round(statistics.median(imports) / 1000, 1),
+        'heavy_loaded': sorted(m for m in HEAVY_MODULES if m in modules),
+    }
+
+
+def eager_cost(deps, runs, env):
+    """Median import time of `deps` in a fresh interpreter, skipping any not installed."""
+    available = [d for d in deps if subprocess.run(
+        [sys.executable, '-c', f'import {d}'], capture_output=True, env=env).returncode == 0]
+    if not available:
+        return 0.0, []
+    result = measure(['-c', 'import ' + ', '.join(available)], runs, env)
+    return result['import_ms'], available
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Measure startup/import time of the Slack scripts',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--runs', '-n', type=int, default=10, help='Runs per case (default: 10)')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        html_path = Path(tmp) / 'canvas.html'
+        html_path.write_text(SAMPLE_HTML)
+        # Keep the benchmark away from the real channel cache and tokens
+        env = dict(os.environ, SLACK_CHANNEL_CACHE=str(Path(tmp) / 'cache.json'), SLACK_BOT_TOKEN='')
+
+        report = []
+        for label, script, script_args in cases(html_path):
+            result = measure([str(script), *script_args], args.runs, env)
+            saved_ms, deps = eager_cost(EAGER_DEPS[script.name], args.runs, env)
+            report.append({'case': label, **result, 'eager_import_ms': saved_ms, 'eager_deps': deps})
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{'case':<30} {'wall ms':>8} {'import ms':>10} {'eager deps ms':>14}  heavy modules loaded")
+    for r in report:
+        heavy = ', '.join(r['heavy_loaded']) or '-'
+        print(f"{r['case']:<30} {r['wall_ms']:>8} {r['import_ms']:>10} {r['eager_import_ms']:>14}  {heavy}")
+    print("\n'eager deps ms' is the median cost of the module-level imports each script had "
+          "before (slack_sdk; plus requests and bs4 for sync_canvas), which these paths no longer pay.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+On-disk channel name → ID cache shared by the Slack scripts.
+
+Resolving a channel name means paging through `conversations_list` 200
+channels at a time. This module does that once, stores the whole directory
+in `.cursor/.slack_channel_cache.json` (per token) and answers later lookups
+from disk until the TTL expires. Updates take an flock on the `.lock` file
+next to it, so concurrent scripts don't drop each other's entries; lookups
+re-parse the file only when it has changed.
+
+Used by:
+    .cursor/skills/slack-posting/post_message.py
+    .cursor/skills/canvas-sync/create_canvas.py
+
+Usage:
+    python channel_cache.py --show
+    python channel_cache.py --clear
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import slack_client
+import slack_timings
+
+try:
+    import fcntl
+except ImportError:  # Windows: updates are still atomic, just not serialized
+    fcntl = None
+
+CACHE_PATH = Path(os.environ.get(
+    'SLACK_CHANNEL_CACHE',
+    Path(__file__).parent.parent.parent / '.slack_channel_cache.json'
+))
+CACHE_TTL_SECONDS = int(os.environ.get('SLACK_CHANNEL_CACHE_TTL', 24 * 60 * 60))
+
+# Errors that mean a cached channel ID may be stale (renamed, archived, recreated)
+STALE_CHANNEL_ERRORS = ('channel_not_found', 'not_in_channel')
+
+# Last parsed cache, keyed by the file's (mtime, size, inode)
+_memo = (None, {})
+_memo_lock = threading.Lock()
+
+
+def _cache_key(client) -> str:
+    """Cache entries are per token, since bot and user tokens see different channels."""
+    token = getattr(client, 'token', None) or ''
+    return hashlib.sha256(token.encode()).hexdigest()[:16]
+
+
+def _load() -> dict:
+    try:
+        with slack_timings.timed('phase', 'channel_cache_load') as fields:
+            try:
+                text = CACHE_PATH.read_text()
+            except FileNotFoundError:
+                fields['miss'] = True  # No cache yet: a miss, not an error
+                return {}
+            data = json.loads(text)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _load_cached() -> dict:
+    """The parsed cache, re-read only when the file changed. Callers must not modify it."""
+    global _memo
+    try:
+        st = CACHE_PATH.stat()
+        stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+    except OSError:
+        return {}
+    with _memo_lock:
+        if _memo[0] != stamp:
+            _memo = (stamp, _load())
+        return _memo[1]
+
+
+@contextmanager
+def _locked():
+    """Serialize read-modify-write updates across processes with an flock."""
+    if fcntl is None:
+        yield
+        return
+    try:
+        lock_file = open(CACHE_PATH.with_name(CACHE_PATH.name + '.lock'), 'a')
+    except OSError:
+        yield
+        return
+    with lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
+
+
+def _save(data: dict) -> None:
+    """Write the cache atomically. Failures only cost a re-fetch later."""
+    tmp_path = CACHE_PATH.with_name(CACHE_PATH.name + f'.{os.getpid()}.tmp')
+    try:
+        tmp_path.write_text(json.dumps(data, indent=1, sort_keys=True))
+        os.replace(tmp_path, CACHE_PATH)
+    except OSError:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+
+
+def _fetch_directory(client) -> Dict[str, str]:
+    """Page through every public/private channel visible to the token."""
+    channels = {}
+    cursor = None
+    while True:
+        result = client.conversations_list(
+            types="public_channel,private_channel",
+            limit=200,
+            cursor=cursor
+        )
+
+        for channel in result["channels"]:
+            channels[channel["name"]] = channel["id"]
+
+        cursor = result.get("response_metadata", {}).get("next_cursor")
+        if not cursor:
+            break
+    return channels
+
+
+def store_directory(client, channels: Dict[str, str]) -> None:
+    """Replace the cached directory for this client's token."""
+    with _locked():
+        data = _load()
+        data[_cache_key(client)] = {'fetched_at': time.time(), 'channels': channels}
+        _save(data)
+
+
+def refresh_directory(client) -> Optional[Dict[str, str]]:
+    """Re-fetch the full channel directory and store it. None on API error."""
+    try:
+        channels = _fetch_directory(client)
+    except slack_client.SlackApiError as e:
+        print(f"Error listing channels: {e.response['error']}")
+        return None
+
+    store_directory(client, channels)
+    return channels
+
+
+def cached_channel_id(client, channel_name: str) -> Optional[str]:
+    """Channel ID from a fresh cache entry, without any API calls."""
+    entry = _load_cached().get(_cache_key(client))
+    if entry and time.time() - entry.get('fetched_at', 0) < CACHE_TTL_SECONDS:
+        return entry.get('channels', {}).get(channel_name.lstrip('#'))
+    return None
+
+
+def find_channel_id(client, channel_name: str, refresh: bool = False) -> Optional[str]:
+    """Find channel ID from channel name, using the on-disk cache when fresh.
+
+    A name missing from a fresh cache triggers one refresh, so channels
+    created elsewhere since the last fetch are still found.
+    """
+    channel_name = channel_name.lstrip('#')
+
+    if not refresh:
+        channel_id = cached_channel_id(client, channel_name)
+        if channel_id:
+            return channel_id
+
+    channels = refresh_directory(client)
+    if channels is None:
+        return None
+    return channels.get(channel_name)
+
+
+def remember_channel(client, channel_name: str, channel_id: str) -> None:
+    """Record a channel we created or discovered without a full refresh."""
+    with _locked():
+        data = _load()
+        entry = data.setdefault(_cache_key(client), {'fetched_at': 0, 'channels': {}})
+        entry.setdefault('channels', {})[channel_name.lstrip('#')] = channel_id
+        _save(data)
+
+
+def forget_channel(client, channel_name: str) -> None:
+    """Drop a single cached name, e.g. after Slack rejected its ID."""
+    with _locked():
+        data = _load()
+        entry = data.get(_cache_key(client))
+        if entry and entry.get('channels', {}).pop(channel_name.lstrip('#'), None):
+            _save(data)
+
+
+def call_with_channel(client, channel_id: str, method: Callable, channel_name: Optional[str] = None,
+                      channel_arg: str = 'channel', **kwargs):
+    """Call a channel-scoped API method, retrying once if a cached ID was stale.
+
+    `channel_name` is the name `channel_id` was resolved from (None when the
+    caller passed an ID directly, which disables the retry). On
+    `channel_not_found`/`not_in_channel` the name is dropped from the cache
+    and re-resolved; the call is retried only if that yields a different ID.
+    Otherwise the original SlackApiError propagates.
+    """
+    try:
+        return method(**{channel_arg: channel_id}, **kwargs)
+    except slack_client.SlackApiError as e:
+        if not channel_name or e.response.get('error') not in STALE_CHANNEL_ERRORS:
+            raise
+        forget_channel(client, channel_name)
+        fresh_id = find_channel_id(client, channel_name, refresh=True)
+        if not fresh_id or fresh_id == channel_id:
+            raise
+        return method(**{channel_arg: fresh_id}, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Inspect or clear the Slack channel cache',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--show', action='store_true', help='Print cached entries')
+    parser.add_argument('--clear', action='store_true', help='Delete the cache file')
+
+    args = parser.parse_args()
+
+    if args.clear:
+        try:
+            CACHE_PATH.unlink()
+            print(f"✓ Removed {CACHE_PATH}")
+        except FileNotFoundError:
+            print("Cache already empty")
+        sys.exit(0)
+
+    if args.show:
+        data = _load()
+        if not data:
+            print("Cache is empty")
+        for key, entry in data.items():
+            age = time.time() - entry.get('fetched_at', 0)
+            print(f"Token {key}: {len(entry.get('channels', {}))} channels, fetched {age / 60:.0f} min ago")
+        sys.exit(0)
+
+    parser.print_help()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,710 @@
+#!/usr/bin/env python3
+"""
+Local fake Slack Web API for exercising the Slack scripts without a workspace.
+
+Implements the methods the scripts call, with in-memory state:
+
+    auth.test, conversations.list (cursor pagination), conversations.info,
+    conversations.join, conversations.create, conversations.setTopic,
+    conversations.setPurpose, conversations.history, conversations.replies,
+    chat.postMessage, users.info, files.info, files.getUploadURLExternal,
+    files.completeUploadExternal, canvases.edit, canvases.sections.lookup,
+    conversations.canvases.create
+
+plus `url_private` downloads and upload URLs. Canvases are stored one section
+per markdown line (what sync_canvas's section push addresses) and downloaded
+as the HTML sync_canvas.py parses. Posted messages, thread replies and shared
+uploads are kept, so history can be read back; --dms adds DM conversations
+with seeded messages.
+
+Latency, random 429s and a per-method request rate cap can be injected; a
+429 carries Retry-After like Slack's. GET /_stats returns per-method call,
+429 and error counts and POST /_reset clears them.
+
+Point the scripts at it with SLACK_API_URL (read by slack_client.py):
+
+Usage:
+    python fake_slack.py --channels 50000 --latency 0.05
+    python fake_slack.py --port 8099 --error-rate 0.05 --retry-after 1
+    SLACK_API_URL=http://127.0.0.1:8099/api/ SLACK_BOT_TOKEN=xoxb-fake \\
+        python post_message.py load-00042 "hello"
+
+load_test.py starts one in-process and measures the scripts against it.
+"""
+
+import re
+import sys
+import json
+import time
+import base64
+import random
+import argparse
+import threading
+from collections import deque
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+DEFAULT_PORT = 8099
+DEFAULT_CHANNELS = 1000
+LIST_DEFAULT_LIMIT = 100
+LIST_MAX_LIMIT = 1000  # Slack ignores larger conversations.list limits
+HISTORY_DEFAULT_LIMIT = 100
+HISTORY_MAX_LIMIT = 999
+SEED_MESSAGES = 20  # Messages seeded into each --dms conversation
+MAX_KEPT_UPLOAD = 8 * 1024 * 1024  # Larger uploads are counted but not kept for download
+MAX_TEXT_CHARS = 40000  # chat.postMessage rejects longer text (msg_too_long)
+CHANNEL_NAME_RE = re.compile(r'^[a-z0-9_-]{1,80}$')
+HEADING_RE = re.compile(r'^(#{1,6})\s+(.*)$')
+CHECKBOX_RE = re.compile(r'^[-*]\s+\[([ xX])\]\s*(.*)$')
+BULLET_RE = re.compile(r'^(?:[-*+]|\d+[.)])\s+(.*)$')
+# Parameters slack_sdk sends JSON-encoded inside form bodies
+JSON_PARAMS = ('changes', 'criteria', 'document_content', 'files')
+TEAM_ID, USER_ID, BOT_ID = 'T0FAKE', 'U0FAKEBOT', 'B0FAKEBOT'
+
+
+class SlackError(Exception):
+    """Becomes {"ok": false, "error": <error>}."""
+
+    def __init__(self, error):
+        super().__init__(error)
+        self.error = error
+
+
+def render_section(markdown):
+    """HTML for one canvas section (a markdown line)."""
+    match = HEADING_RE.match(markdown)
+    if match:
+        level = min(len(match.group(1)), 3)
+        return f'<h{level}>{escape(match.group(2))}</h{level}>'
+    if markdown.strip() in ('---', '***'):
+        return '<hr>'
+    match = CHECKBOX_RE.match(markdown)
+    if match:
+        checked = ' class="checked"' if match.group(1) in 'xX' else ''
+        return f'<ul><li{checked}>{escape(match.group(2))}</li></ul>'
+    match = BULLET_RE.match(markdown)
+    if match:
+        return f'<ul><li>{escape(match.group(1))}</li></ul>'
+    return f'<p>{escape(markdown)}</p>'
+
+
+def section_type(markdown):
+    match = HEADING_RE.match(markdown)
+    return f'h{min(len(match.group(1)), 3)}' if match else 'any'
+
+
+def section_text(markdown):
+    for pattern in (HEADING_RE, CHECKBOX_RE, BULLET_RE):
+        match = pattern.match(markdown)
+        if match:
+            return match.group(match.lastindex)
+    return markdown
+
+
+class SlackState:
+    """Workspace state shared by all handler threads (guarded by `lock`)."""
+
+    def __init__(self, channels=DEFAULT_CHANNELS, prefix='load', dms=0):
+        self.lock = threading.Lock()
+        self.channels = {}  # id -> channel dict
+        self.by_name = {}
+        self.order = []  # channel IDs in conversations.list order
+        self.canvases = {}  # file id -> {'channel', 'title', 'sections': [(id, markdown)], 'updated'}
+        self.uploads = {}  # file id -> {'name', 'size', 'done', 'content'}
+        self.messages = {}  # channel id -> messages in ts order (top-level and replies)
+        self.by_ts = {}  # (channel id, ts) -> message
+        self.users = {USER_ID: {'id': USER_ID, 'name': 'fakebot', 'real_name': 'Fake Bot', 'is_bot': True}}
+        self.next_id = 1
+        self.last_ts = 0.0
+        self.add_channel('general')
+        for n in range(1, channels + 1):
+            self.add_channel(f'{prefix}-{n:05d}', is_private=n % 10 == 0)
+        for n in range(1, dms + 1):
+            self.add_dm(n)
+
+    def new_id(self, prefix):
+        self.next_id += 1
+        return f'{prefix}0{self.next_id:08X}'
+
+    def new_ts(self):
+        self.last_ts = max(time.time(), self.last_ts + 0.000001)
+        return f'{self.last_ts:.6f}'
+
+    def add_channel(self, name, is_private=False):
+        channel = {
+            'id': self.new_id('C'), 'name': name, 'is_channel': True, 'is_private': is_private,
+            'is_archived': False, 'is_member': True, 'created': int(time.time()),
+            'topic': {'value': ''}, 'purpose': {'value': ''}, 'num_members': 1, 'properties': {},
+        }
+        self.channels[channel['id']] = channel
+        self.by_name[name] = channel
+        self.order.append(channel['id'])
+        return channel
+
+    def add_dm(self, n):
+        user_id = f'U{n:08d}'
+        self.users[user_id] = {'id': user_id, 'name': f'user{n}', 'real_name': f'User {n}', 'is_bot': False}
+        channel = {'id': self.new_id('D'), 'is_im': True, 'user': user_id, 'created': int(time.time()),
+                   'is_member': True, 'is_private': True, 'properties': {}}
+        self.channels[channel['id']] = channel
+        self.order.append(channel['id'])
+        parent = None
+        for i in range(SEED_MESSAGES):
+            thread_ts = parent['ts'] if parent and i % 5 == 4 else None
+            message = self.add_message(channel, user_id if i % 2 else USER_ID,
+                                       f'Message {i} with user{n}', thread_ts)
+            if i % 5 == 0:
+                parent = message
+        return channel
+
+    def add_message(self, channel, user, text, thread_ts=None, files=None):
+        ts = self.new_ts()
+        message = {'type': 'message', 'user': user, 'text': text, 'ts': ts}
+        if user == USER_ID:
+            message['bot_id'] = BOT_ID
+        if files:
+            message['files'] = files
+        if thread_ts:
+            parent = self.by_ts.get((channel['id'], thread_ts))
+            if parent is None:
+                raise SlackError('thread_not_found')
+            message['thread_ts'] = thread_ts
+            parent['thread_ts'] = thread_ts
+            parent['reply_count'] = parent.get('reply_count', 0) + 1
+            parent['latest_reply'] = ts
+            parent['reply_users'] = sorted(set(parent.get('reply_users', [])) | {user})
+        self.messages.setdefault(channel['id'], []).append(message)
+        self.by_ts[(channel['id'], ts)] = message
+        return message
+
+    def channel(self, ref):
+        """Channel by ID, name or #name."""
+        if not ref:
+            raise SlackError('channel_not_found')
+        channel = self.channels.get(ref) or self.by_name.get(ref.lstrip('#'))
+        if channel is None:
+            raise SlackError('channel_not_found')
+        return channel
+
+    def canvas(self, canvas_id):
+        canvas = self.canvases.get(canvas_id)
+        if canvas is None:
+            raise SlackError('canvas_not_found')
+        return canvas
+
+    def new_sections(self, markdown):
+        return [(self.new_id('temp:C:'), line.strip()) for line in (markdown or '').splitlines() if line.strip()]
+
+    def create_canvas(self, channel, title, markdown):
+        canvas_id = self.new_id('F')
+        self.canvases[canvas_id] = {'channel': channel['id'], 'title': title or 'Canvas',
+                                    'sections': self.new_sections(markdown), 'updated': int(time.time())}
+        channel['properties']['canvas'] = {'file_id': canvas_id, 'is_empty': not markdown}
+        return canvas_id
+
+    def canvas_html(self, canvas_id):
+        canvas = self.canvas(canvas_id)
+        body = ''.join(render_section(markdown) for _, markdown in canvas['sections'])
+        return f'<html><head><title>{escape(canvas["title"])}</title></head><body>{body}</body></html>'
+
+
+class FakeSlack:
+    """API method implementations. Each takes the request args and returns the response body."""
+
+    def __init__(self, state, base_url=''):
+        self.state = state
+        self.base_url = base_url
+
+    def auth_test(self, args):
+        return {'url': 'https://fake-workspace.slack.com/', 'team': 'Fake Workspace', 'user': 'fakebot',
+                'team_id': TEAM_ID, 'user_id': USER_ID, 'bot_id': BOT_ID}
+
+    def conversations_list(self, args):
+        state = self.state
+        types = set((args.get('types') or 'public_channel').split(','))
+        limit = min(int(args.get('limit') or LIST_DEFAULT_LIMIT), LIST_MAX_LIMIT)
+        cursor = args.get('cursor')
+        try:
+            start = int(base64.b64decode(cursor).decode().split(':')[1]) if cursor else 0
+        except (ValueError, IndexError):
+            raise SlackError('invalid_cursor')
+        # Like Slack, a page holds up to `limit` channels scanned, fewer after type filtering
+        end = min(start + limit, len(state.order))
+        page = []
+        for channel_id in state.order[start:end]:
+            channel = state.channels[channel_id]
+            kind = 'im' if channel.get('is_im') else 'private_channel' if channel['is_private'] else 'public_channel'
+            if kind in types and not (channel.get('is_archived') and args.get('exclude_archived') in ('true', True)):
+                page.append(channel)
+        next_cursor = base64.b64encode(f'offset:{end}'.encode()).decode() if end < len(state.order) else ''
+        return {'channels': page, 'response_metadata': {'next_cursor': next_cursor}}
+
+    def conversations_info(self, args):
+        return {'channel': self.state.channel(args.get('channel'))}
+
+    def conversations_join(self, args):
+        channel = self.state.channel(args.get('channel'))
+        channel['is_member'] = True
+        return {'channel': channel}
+
+    def conversations_create(self, args):
+        name = args.get('name') or ''
+        if not CHANNEL_NAME_RE.match(name):
+            raise SlackError('invalid_name_specials')
+        if name in self.state.by_name:
+            raise SlackError('name_taken')
+        is_private = args.get('is_private') in ('true', '1', True)
+        return {'channel': self.state.add_channel(name, is_private)}
+
+    def _set_channel_field(self, args, field):
+        channel = self.state.channel(args.get('channel'))
+        channel[field] = {'value': args.get(field) or ''}
+        return {'channel': channel}
+
+    def conversations_setTopic(self, args):
+        return self._set_channel_field(args, 'topic')
+
+    def conversations_setPurpose(self, args):
+        return self._set_channel_field(args, 'purpose')
+
+    def chat_postMessage(self, args):
+        channel = self.state.channel(args.get('channel'))
+        if not channel['is_member']:
+            raise SlackError('not_in_channel')
+        text = args.get('text') or ''
+        if not text and not args.get('blocks'):
+            raise SlackError('no_text')
+        if len(text) > MAX_TEXT_CHARS:
+            raise SlackError('msg_too_long')
+        message = self.state.add_message(channel, USER_ID, text, args.get('thread_ts'))
+        return {'channel': channel['id'], 'ts': message['ts'], 'message': message}
+
+    def _page(self, messages, args):
+        """Slice messages by oldest/latest/inclusive with cursor pagination."""
+        oldest, latest = float(args.get('oldest') or 0), float(args.get('latest') or 'inf')
+        inclusive = args.get('inclusive') in ('true', '1', True)
+        selected = [m for m in messages
+                    if (oldest <= float(m['ts']) <= latest if inclusive else oldest < float(m['ts']) < latest)]
+        limit = min(int(args.get('limit') or HISTORY_DEFAULT_LIMIT), HISTORY_MAX_LIMIT)
+        cursor = args.get('cursor')
+        try:
+            start = int(base64.b64decode(cursor).decode().split(':')[1]) if cursor else 0
+        except (ValueError, IndexError):
+            raise SlackError('invalid_cursor')
+        page = selected[start:start + limit]
+        more = start + limit < len(selected)
+        next_cursor = base64.b64encode(f'next:{start + limit}'.encode()).decode() if more else ''
+        return {'messages': page, 'has_more': more, 'response_metadata': {'next_cursor': next_cursor}}
+
+    def conversations_history(self, args):
+        channel = self.state.channel(args.get('channel'))
+        top_level = [m for m in self.state.messages.get(channel['id'], [])
+                     if m.get('thread_ts', m['ts']) == m['ts'] or m.get('subtype') == 'thread_broadcast']
+        return self._page(top_level[::-1], args)  # Newest first
+
+    def conversations_replies(self, args):
+        channel = self.state.channel(args.get('channel'))
+        parent = self.state.by_ts.get((channel['id'], args.get('ts')))
+        if parent is None:
+            raise SlackError('thread_not_found')
+        replies = [m for m in self.state.messages[channel['id']]
+                   if m.get('thread_ts') == parent['ts'] and m is not parent]
+        # The parent always comes first, whatever the oldest/cursor window
+        result = self._page(replies, args)
+        if not args.get('cursor'):
+            result['messages'] = [parent] + result['messages']
+        return result
+
+    def users_info(self, args):
+        user = self.state.users.get(args.get('user'))
+        if user is None:
+            raise SlackError('user_not_found')
+        return {'user': user}
+
+    def files_info(self, args):
+        file_id = args.get('file')
+        if file_id in self.state.canvases:
+            canvas = self.state.canvases[file_id]
+            size = sum(len(markdown) for _, markdown in canvas['sections'])
+            return {'file': {'id': file_id, 'name': canvas['title'], 'title': canvas['title'],
+                             'filetype': 'quip', 'pretty_type': 'Canvas', 'size': size,
+                             'created': canvas['updated'], 'updated': canvas['updated'],
+                             'url_private': f'{self.base_url}/files/{file_id}/canvas.html',
+                             'channels': [canvas['channel']]}}
+        upload = self.state.uploads.get(file_id)
+        if upload and upload['done']:
+            return {'file': self.file_object(file_id)}
+        raise SlackError('file_not_found')
+
+    def file_object(self, file_id):
+        upload = self.state.uploads[file_id]
+        url = f'{self.base_url}/files/{file_id}/{upload["name"]}'
+        return {'id': file_id, 'name': upload['name'], 'title': upload.get('title') or upload['name'],
+                'mimetype': 'application/octet-stream', 'size': upload['size'],
+                'url_private': url, 'url_private_download': url}
+
+    def files_getUploadURLExternal(self, args):
+        if not args.get('filename') or not args.get('length'):
+            raise SlackError('invalid_arguments')
+        file_id = self.state.new_id('F')
+        self.state.uploads[file_id] = {'name': args['filename'], 'size': None, 'done': False, 'content': None}
+        return {'upload_url': f'{self.base_url}/upload/{file_id}', 'file_id': file_id}
+
+    def files_completeUploadExternal(self, args):
+        files = args.get('files') or []
+        for entry in files:
+            upload = self.state.uploads.get(entry.get('id'))
+            if upload is None or upload['size'] is None:
+                raise SlackError('file_not_found')
+        channel = self.state.channel(args['channel_id']) if args.get('channel_id') else None
+        for entry in files:
+            self.state.uploads[entry['id']].update(done=True, title=entry.get('title'))
+        shared = [self.file_object(entry['id']) for entry in files]
+        if channel is not None:
+            self.state.add_message(channel, USER_ID, args.get('initial_comment') or '',
+                                   args.get('thread_ts'), files=shared)
+        return {'files': shared}
+
+    def conversations_canvases_create(self, args):
+        channel = self.state.channel(args.get('channel_id'))
+        if channel['properties'].get('canvas'):
+            raise SlackError('channel_canvas_already_exists')
+        content = args.get('document_content') or {}
+        canvas_id = self.state.create_canvas(channel, args.get('title'), content.get('markdown'))
+        return {'canvas_id': canvas_id}
+
+    def canvases_sections_lookup(self, args):
+        canvas = self.state.canvas(args.get('canvas_id'))
+        criteria = args.get('criteria') or {}
+        text = criteria.get('contains_text')
+        types = set(criteria.get('section_types') or [])
+        if not text and not types:
+            raise SlackError('invalid_arguments')
+        sections = []
+        for section_id, markdown in canvas['sections']:
+            kind = section_type(markdown)
+            if types and kind not in types and not ('any_header' in types and kind != 'any'):
+                continue
+            if text and text not in section_text(markdown):
+                continue
+            sections.append({'id': section_id})
+        return {'sections': sections}
+
+    def canvases_edit(self, args):
+        canvas = self.state.canvas(args.get('canvas_id'))
+        changes = args.get('changes')
+        if not isinstance(changes, list) or len(changes) != 1:
+            raise SlackError('invalid_arguments')  # Slack accepts exactly one change per call
+        change = changes[0]
+        operation = change.get('operation')
+        markdown = (change.get('document_content') or {}).get('markdown')
+        sections = canvas['sections']
+        section_id = change.get('section_id')
+        if operation in ('replace', 'delete', 'insert_after', 'insert_before') and section_id:
+            index = next((i for i, (sid, _) in enumerate(sections) if sid == section_id), None)
+            if index is None:
+                raise SlackError('canvas_editing_failed')
+        elif operation in ('delete', 'insert_after', 'insert_before'):
+            raise SlackError('invalid_arguments')
+
+        new = self.state.new_sections(markdown) if markdown is not None else []
+        if operation == 'replace':
+            if section_id:
+                sections[index:index + 1] = new
+            else:
+                sections[:] = new
+        elif operation == 'delete':
+            del sections[index]
+        elif operation == 'insert_after':
+            sections[index + 1:index + 1] = new
+        elif operation == 'insert_before':
+            sections[index:index] = new
+        elif operation == 'insert_at_start':
+            sections[:0] = new
+        elif operation == 'insert_at_end':
+            sections.extend(new)
+        else:
+            raise SlackError('invalid_arguments')
+        canvas['updated'] = int(time.time())
+        return {}
+
+
+class Faults:
+    """Injected latency and rate limiting."""
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, max_rps=None, retry_after=1, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.max_rps = max_rps
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.windows = {}  # method -> deque of request times in the last second
+        self.lock = threading.Lock()
+
+    def delay(self):
+        seconds = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def rate_limited(self, method):
+        """True if this call should get a 429."""
+        with self.lock:
+            if self.error_rate and self.random.random() < self.error_rate:
+                return True
+            if not self.max_rps:
+                return False
+            now = time.monotonic()
+            window = self.windows.setdefault(method, deque())
+            while window and now - window[0] >= 1:
+                window.popleft()
+            if len(window) >= self.max_rps:
+                return True
+            window.append(now)
+            return False
+
+
+class Stats:
+    """Per-method counters reported by GET /_stats."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started = time.time()
+            self.methods = {}
+
+    def record(self, method, outcome, nbytes=0):
+        with self.lock:
+            entry = self.methods.setdefault(method, {'calls': 0, 'rate_limited': 0, 'errors': 0, 'bytes': 0})
+            entry['calls'] += 1
+            entry['bytes'] += nbytes
+            if outcome == 'rate_limited':
+                entry['rate_limited'] += 1
+            elif outcome == 'error':
+                entry['errors'] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {'seconds': round(time.time() - self.started, 3),
+                    'methods': {m: dict(v) for m, v in sorted(self.methods.items())}}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like slack.com
+    server_version = 'FakeSlack/1.0'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def send_body(self, status, body, content_type='application/json; charset=utf-8', headers=None):
+        data = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def authorized(self):
+        auth = self.headers.get('Authorization', '')
+        token = auth[len('Bearer '):] if auth.startswith('Bearer ') else None
+        if token is None:
+            return 'not_authed'
+        if self.server.token and token != self.server.token:
+            return 'invalid_auth'
+        return None
+
+    def read_args(self):
+        """Query string plus a form or JSON body, with JSON-valued parameters decoded."""
+        query = urlsplit(self.path).query
+        args = {k: v[0] for k, v in parse_qs(query).items()}
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        if raw:
+            if self.headers.get('Content-Type', '').startswith('application/json'):
+                args.update(json.loads(raw))
+            else:
+                args.update({k: v[0] for k, v in parse_qs(raw.decode()).items()})
+        for key in JSON_PARAMS:
+            if isinstance(args.get(key), str):
+                try:
+                    args[key] = json.loads(args[key])
+                except ValueError:
+                    pass
+        return args
+
+    def api_call(self, method):
+        server = self.server
+        server.faults.delay()
+        # Consume the body even for a 429, or a keep-alive client's next request is misread
+        try:
+            args = self.read_args()
+        except ValueError:
+            server.stats.record(method, 'error')
+            self.send_body(200, {'ok': False, 'error': 'invalid_json'})
+            return
+        if server.faults.rate_limited(method):
+            server.stats.record(method, 'rate_limited')
+            self.send_body(429, {'ok': False, 'error': 'ratelimited'},
+                           headers={'Retry-After': str(server.faults.retry_after)})
+            return
+        handler = getattr(server.api, method.replace('.', '_'), None)
+        error = self.authorized()
+        if handler is None:
+            error = 'unknown_method'
+        body = {'ok': False, 'error': error}
+        if error is None:
+            try:
+                with server.state.lock:
+                    body = {'ok': True, **handler(args)}
+            except SlackError as e:
+                body = {'ok': False, 'error': e.error}
+        server.stats.record(method, 'ok' if body['ok'] else 'error')
+        self.send_body(200, body)
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == '/_stats':
+            return self.send_body(200, self.server.stats.snapshot())
+        if path.startswith('/api/'):
+            return self.api_call(path[len('/api/'):])
+        if path.startswith('/files/'):
+            return self.download(path.split('/')[2])
+        self.send_body(404, {'ok': False, 'error': 'not_found'})
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        if path == '/_reset':
+            self.server.stats.reset()
+            return self.send_body(200, {'ok': True})
+        if path.startswith('/api/'):
+            return self.api_call(path[len('/api/'):])
+        if path.startswith('/upload/'):
+            return self.upload(path.split('/')[2])
+        self.send_body(404, {'ok': False, 'error': 'not_found'})
+
+    def download(self, file_id):
+        server = self.server
+        server.faults.delay()
+        if self.authorized():
+            server.stats.record('url_private', 'error')
+            return self.send_body(403, b'forbidden', 'text/plain')
+        with server.state.lock:
+            upload = server.state.uploads.get(file_id)
+            if file_id in server.state.canvases:
+                body, content_type = server.state.canvas_html(file_id).encode(), 'text/html; charset=utf-8'
+            elif upload and upload['done'] and upload['content'] is not None:
+                body, content_type = bytes(upload['content']), 'application/octet-stream'
+            else:
+                body = None
+        if body is None:
+            server.stats.record('url_private', 'error')
+            return self.send_body(404, b'not found', 'text/plain')
+        server.stats.record('url_private', 'ok', len(body))
+        self.send_body(200, body, content_type)
+
+    def upload(self, file_id):
+        """Upload URL target: reads the body in blocks, keeping it only up to MAX_KEPT_UPLOAD."""
+        server = self.server
+        remaining = int(self.headers.get('Content-Length') or 0)
+        size = remaining
+        content = bytearray() if size <= MAX_KEPT_UPLOAD else None
+        while remaining > 0:
+            block = self.rfile.read(min(remaining, 64 * 1024))
+            if not block:
+                break
+            remaining -= len(block)
+            if content is not None:
+                content += block
+        with server.state.lock:
+            upload = server.state.uploads.get(file_id)
+            if upload is not None:
+                upload.update(size=size, content=content)
+        server.stats.record('upload', 'ok' if upload else 'error', size)
+        if upload is None:
+            return self.send_body(404, b'not found', 'text/plain')
+        self.send_body(200, b'OK - ' + str(size).encode(), 'text/plain')
+
+
+class FakeSlackServer(ThreadingHTTPServer):
+    """Threaded fake Slack server. Use start()/stop() to run it in-process."""
+
+    daemon_threads = True
+
+    def __init__(self, port=0, host='127.0.0.1', channels=DEFAULT_CHANNELS, token=None,
+                 faults=None, verbose=False, dms=0):
+        super().__init__((host, port), Handler)
+        self.state = SlackState(channels, dms=dms)
+        self.api = FakeSlack(self.state, self.url)
+        self.faults = faults or Faults()
+        self.stats = Stats()
+        self.token = token
+        self.verbose = verbose
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def api_url(self):
+        """Value for SLACK_API_URL."""
+        return self.url + '/api/'
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Run a local fake Slack Web API',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port (default: {DEFAULT_PORT})')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--channels', type=int, default=DEFAULT_CHANNELS,
+                        help=f'Generated channels load-00001... (default: {DEFAULT_CHANNELS})')
+    parser.add_argument('--dms', type=int, default=0,
+                        help=f'DM conversations to add, each seeded with {SEED_MESSAGES} messages and threads')
+    parser.add_argument('--token', help='Only accept this token (default: any Bearer token)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every request')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Extra random 0..N seconds per request')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of API calls answered with 429')
+    parser.add_argument('--max-rps', type=float, help='429 once a method exceeds this many calls per second')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds on 429 (default: 1)')
+    parser.add_argument('--seed', type=int, help='Random seed for jitter and --error-rate')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Log every request')
+    args = parser.parse_args()
+
+    faults = Faults(args.latency, args.jitter, args.error_rate, args.max_rps, args.retry_after, args.seed)
+    try:
+        server = FakeSlackServer(args.port, args.host, args.channels, args.token, faults, args.verbose, args.dms)
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Fake Slack with {args.channels + 1:,} channels on {server.url}")
+    print(f"  export SLACK_API_URL={server.api_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped")
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
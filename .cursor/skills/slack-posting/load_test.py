@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Load test for the Slack scripts against the local fake Slack server.
+
+Starts fake_slack.py in-process (or uses --url), points slack_client at it,
+and runs the scripts' real code paths, reporting per scenario: operations,
+wall time, throughput, client-side latency (p50/p95/max), and the API calls
+and 429s the server saw.
+
+Scenarios:
+    find_channel  channel_cache.find_channel_id: one cold lookup (full
+                  conversations.list pagination) then --lookups cached ones
+    post          post_message.post_message, --concurrency threads
+    batch         post_message.BulkPoster (client-side pacing at Slack's rates)
+    canvas_read   sync_canvas.read_canvas: files.info + url_private download + parse
+    canvas_push   sync_canvas.push_changes, full replace and section edits
+
+Usage:
+    python load_test.py
+    python load_test.py --channels 50000 --latency 0.05 --jitter 0.05
+    python load_test.py --scenarios post,batch --error-rate 0.05 --json
+    python load_test.py --url http://127.0.0.1:8099   # external fake_slack.py
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import contextlib
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'canvas-sync'))
+
+import channel_cache
+import fake_slack
+import post_message
+import slack_client
+from slack_timings import percentile
+
+SCENARIOS = ('find_channel', 'post', 'batch', 'canvas_read', 'canvas_push')
+TOKEN = 'xoxb-load-test'
+
+
+def server_stats(url, reset=False):
+    request = urllib.request.Request(url + ('/_reset' if reset else '/_stats'), data=b'' if reset else None)
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+def timed(fn, items, concurrency=1):
+    """Run fn(item) for every item; returns (latencies, errors, wall seconds)."""
+    def one(item):
+        start = time.perf_counter()
+        try:
+            ok = fn(item) is not False
+        except Exception:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    # The scripts print per operation; keep the report readable
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        if concurrency > 1:
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                results = list(pool.map(one, items))
+        else:
+            results = [one(item) for item in items]
+    wall = time.perf_counter() - start
+    return [r[0] for r in results], sum(1 for r in results if not r[1]), wall
+
+
+def result(name, latencies, errors, wall, stats, **extra):
+    methods = stats['methods']
+    return {
+        'scenario': name,
+        'ops': len(latencies),
+        'errors': errors,
+        'wall_s': round(wall, 3),
+        'ops_per_s': round(len(latencies) / wall, 1) if wall else 0.0,
+        'p50_ms': round(percentile(latencies, 0.5) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 1),
+        'max_ms': round(max(latencies, default=0) * 1000, 1),
+        'api_calls': sum(m['calls'] for m in methods.values()),
+        'rate_limited': sum(m['rate_limited'] for m in methods.values()),
+        'methods': {name: m['calls'] for name, m in methods.items()},
+        **extra,
+    }
+
+
+def channel_names(args, count):
+    rng = random.Random(args.seed)
+    return [f'load-{rng.randint(1, args.channels):05d}' for _ in range(count)]
+
+
+def run_find_channel(args, url, client):
+    channel_cache.CACHE_PATH.unlink(missing_ok=True)
+    server_stats(url, reset=True)
+    cold, cold_errors, cold_wall = timed(lambda name: channel_cache.find_channel_id(client, name),
+                                         channel_names(args, 1))
+    cold_stats = server_stats(url)
+    server_stats(url, reset=True)
+    names = channel_names(args, args.lookups)
+    warm, errors, wall = timed(lambda name: channel_cache.find_channel_id(client, name), names)
+    return [result('find_channel (cold)', cold, cold_errors, cold_wall, cold_stats),
+            result('find_channel (cached)', warm, errors, wall, server_stats(url))]
+
+
+def run_post(args, url, client):
+    channel_cache.find_channel_id(client, 'general')  # Directory cached, as in normal use
+    server_stats(url, reset=True)
+    names = channel_names(args, args.messages)
+    latencies, errors, wall = timed(
+        lambda name: post_message.post_message(TOKEN, name, f'load test message to {name}'),
+        names, args.concurrency)
+    return [result('post', latencies, errors, wall, server_stats(url))]
+
+
+def run_batch(args, url, client):
+    channel_cache.find_channel_id(client, 'general')
+    server_stats(url, reset=True)
+    lines = [json.dumps({'channel': name, 'text': f'batch message {i}'})
+             for i, name in enumerate(channel_names(args, args.batch_messages))]
+    poster = post_message.BulkPoster(TOKEN, workers=args.concurrency)
+    start = time.perf_counter()
+    summary = poster.run(lines)
+    wall = time.perf_counter() - start
+    # BulkPoster has no per-message timing; report the mean as every percentile
+    mean = wall / max(1, len(lines))
+    return [result('batch', [mean] * len(lines), summary['failed'], wall, server_stats(url),
+                   retries=summary['retries'], rate_limit_wait_s=round(summary['rate_limit_wait'], 1))]
+
+
+def canvas_markdown(lines, version=0):
+    body = []
+    for n in range(lines):
+        if n % 10 == 0:
+            body.append(f'## Section {n // 10 + 1}')
+        elif n % 3 == 0:
+            body.append(f'- [{"x" if n % 2 else " "}] Task {n}')
+        else:
+            body.append(f'Paragraph {n} of the load-test canvas, revision {version if n == 1 else 0}.')
+    return '\n'.join(body)
+
+
+def make_canvases(args, client):
+    """Create one canvas per channel for the canvas scenarios. Returns canvas IDs."""
+    markdown = canvas_markdown(args.canvas_lines)
+    canvas_ids = []
+    for n in range(1, args.canvases + 1):
+        channel_id = channel_cache.find_channel_id(client, f'load-{n:05d}')
+        try:
+            response = client.conversations_canvases_create(
+                channel_id=channel_id, document_content={'type': 'markdown', 'markdown': markdown})
+            canvas_ids.append(response['canvas_id'])
+        except slack_client.SlackApiError as e:
+            if e.response.get('error') != 'channel_canvas_already_exists':
+                raise
+            # Re-run against an external server: reset the existing canvas
+            info = client.conversations_info(channel=channel_id)
+            canvas_id = info['channel']['properties']['canvas']['file_id']
+            client.canvases_edit(canvas_id=canvas_id, changes=[{
+                'operation': 'replace', 'document_content': {'type': 'markdown', 'markdown': markdown}}])
+            canvas_ids.append(canvas_id)
+    return canvas_ids
+
+
+def run_canvas_read(args, url, client):
+    import sync_canvas
+    canvas_ids = make_canvases(args, client)
+    session = sync_canvas.make_session(args.concurrency)
+    server_stats(url, reset=True)
+    latencies, errors, wall = timed(
+        lambda canvas_id: sync_canvas.read_canvas(client, canvas_id, TOKEN, session=session),
+        canvas_ids, args.concurrency)
+    return [result('canvas_read', latencies, errors, wall, server_stats(url))]
+
+
+def run_canvas_push(args, url, client):
+    import sync_canvas
+    canvas_ids = make_canvases(args, client)
+    old, new = canvas_markdown(args.canvas_lines), canvas_markdown(args.canvas_lines, version=1)
+    results = []
+    for mode in ('full', 'sections'):
+        server_stats(url, reset=True)
+        latencies, errors, wall = timed(
+            lambda canvas_id: sync_canvas.push_changes(
+                client, canvas_id, new, {'synced_markdown': old, 'canvas_hash': sync_canvas.content_hash(old)}, mode),
+            canvas_ids, args.concurrency)
+        results.append(result(f'canvas_push ({mode})', latencies, errors, wall, server_stats(url)))
+        old, new = new, old
+    return results
+
+
+RUNNERS = {
+    'find_channel': run_find_channel,
+    'post': run_post,
+    'batch': run_batch,
+    'canvas_read': run_canvas_read,
+    'canvas_push': run_canvas_push,
+}
+
+
+def print_report(results, config):
+    print(f"Fake Slack: {config}")
+    print(f"{'scenario':<24} {'ops':>6} {'err':>4} {'wall s':>7} {'ops/s':>8} "
+          f"{'p50 ms':>7} {'p95 ms':>7} {'max ms':>8} {'calls':>6} {'429s':>5}")
+    for r in results:
+        print(f"{r['scenario']:<24} {r['ops']:>6} {r['errors']:>4} {r['wall_s']:>7} {r['ops_per_s']:>8} "
+              f"{r['p50_ms']:>7} {r['p95_ms']:>7} {r['max_ms']:>8} {r['api_calls']:>6} {r['rate_limited']:>5}")
+    print("\nAPI calls by method:")
+    for r in results:
+        methods = ', '.join(f'{m} {n}' for m, n in r['methods'].items()) or '-'
+        print(f"  {r['scenario']:<24} {methods}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Load-test the Slack scripts against a local fake Slack server',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--url', help='Use a running fake_slack.py at this URL instead of starting one')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help=f'Comma-separated subset of: {", ".join(SCENARIOS)}')
+    parser.add_argument('--channels', type=int, default=fake_slack.DEFAULT_CHANNELS,
+                        help=f'Channels in the fake workspace (default: {fake_slack.DEFAULT_CHANNELS})')
+    parser.add_argument('--latency', type=float, default=0.0, help='Server latency per request (seconds)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Extra random server latency (seconds)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of API calls answered with 429')
+    parser.add_argument('--max-rps', type=float, help='Server-side per-method calls/second before 429')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds on 429 (default: 1)')
+    parser.add_argument('--concurrency', '-c', type=int, default=4, help='Client threads (default: 4)')
+    parser.add_argument('--lookups', type=int, default=1000, help='Cached channel lookups (default: 1000)')
+    parser.add_argument('--messages', type=int, default=200, help='post scenario messages (default: 200)')
+    parser.add_argument('--batch-messages', type=int, default=25,
+                        help='batch scenario messages; paced at Slack rates (default: 25)')
+    parser.add_argument('--canvases', type=int, default=20, help='Canvases for canvas scenarios (default: 20)')
+    parser.add_argument('--canvas-lines', type=int, default=200, help='Lines per canvas (default: 200)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    scenarios = [s.strip() for s in args.scenarios.split(',') if s.strip()]
+    unknown = [s for s in scenarios if s not in RUNNERS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    server = None
+    if args.url:
+        url = args.url.rstrip('/')
+        config = f"{url} (external)"
+    else:
+        faults = fake_slack.Faults(args.latency, args.jitter, args.error_rate, args.max_rps,
+                                   args.retry_after, args.seed)
+        server = fake_slack.FakeSlackServer(channels=args.channels, faults=faults).start()
+        url = server.url
+        config = (f"{args.channels:,} channels, latency {args.latency}s+{args.jitter}s, "
+                  f"429 rate {args.error_rate}, max rps {args.max_rps or '-'}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Never touch the real channel cache or workspace
+        channel_cache.CACHE_PATH = Path(tmp) / 'channel_cache.json'
+        slack_client.API_URL = url + '/api/'
+        client = slack_client.get_client(TOKEN)
+        results = []
+        try:
+            for name in scenarios:
+                results.extend(RUNNERS[name](args, url, client))
+        finally:
+            if server:
+                server.stop()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results, config)
+
+
+if __name__ == '__main__':
+    main()
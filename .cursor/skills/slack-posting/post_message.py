@@ -5,27 +5,66 @@ Slack Message Posting Utility
 Usage:
     python post_message.py <channel> <message> [--token TOKEN]
     python post_message.py --test [--token TOKEN]
+    python post_message.py --batch messages.jsonl [--workers N]
+    python post_message.py <channel> --file report.md [<lead-in message>]
 
 Examples:
     python post_message.py "#general" "Hello from the agent!"
     python post_message.py "proj-my-project" "Update: task complete"
     python post_message.py --test
+    some_job | python post_message.py --batch -
+    python post_message.py "proj-my-project" --file artifacts/example-news-summary.md
+    generate_digest | python post_message.py "proj-my-project" --file - "Weekly digest"
+
+--file content is split on markdown blocks into a first message plus thread
+replies; above --upload-over bytes (default 40000) it is uploaded as a file.
+
+Batch input is JSON lines: {"channel": "proj-x", "text": "...", "thread_ts": "..."}
 """
 
 import os
 import sys
+import json
+import time
+import shutil
 import argparse
-from typing import Optional
-from slack_sdk import WebClient
-from slack_sdk.errors import SlackApiError
+import tempfile
+import threading
+import urllib.request
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, List, Optional
+
+import channel_cache
+import slack_client
+import slack_timings
+
+if TYPE_CHECKING:
+    from slack_sdk import WebClient
+    from slack_sdk.errors import SlackApiError
+
+# Slack rate-limit tiers in requests/second (https://api.slack.com/docs/rate-limits)
+TIER_RATES = {1: 1 / 60, 2: 20 / 60, 3: 50 / 60, 4: 100 / 60}
+METHOD_TIERS = {
+    'conversations_list': 2,
+    'conversations_create': 2,
+    'conversations_setTopic': 2,
+    'conversations_setPurpose': 2,
+    'conversations_canvases_create': 2,
+}
+POST_RATE_PER_CHANNEL = 1.0  # chat.postMessage: ~1 message/second per channel
+POST_RATE_WORKSPACE = 5.0  # chat.postMessage across all channels
+DEFAULT_WORKERS = 4
+MAX_RETRIES = 5
+MAX_TEXT_CHARS = 3900  # Slack recommends keeping message text under 4,000 chars
+UPLOAD_THRESHOLD = 40000  # --file content above this many bytes is uploaded as a file
+UPLOAD_BLOCK_SIZE = 64 * 1024
+UPLOAD_TIMEOUT = 300
 
 
 def get_token(provided_token: Optional[str] = None) -> str:
-    """Get Slack token from argument or environment."""
-    if provided_token:
-        return provided_token
-    
-    token = os.environ.get('SLACK_BOT_TOKEN')
+    """Get Slack token from argument, environment or .cursor/.api_keys.txt."""
+    token = slack_client.get_token(provided_token)
     if not token:
         print("Error: No Slack token provided.")
         print("Either pass --token or set SLACK_BOT_TOKEN environment variable.")
@@ -33,35 +72,6 @@ def get_token(provided_token: Optional[str] = None) -> str:
     return token
 
 
-def find_channel_id(client: WebClient, channel_name: str) -> Optional[str]:
-    """Find channel ID from channel name."""
-    channel_name = channel_name.lstrip('#')
-    
-    try:
-        # Paginate through all channels
-        cursor = None
-        while True:
-            result = client.conversations_list(
-                types="public_channel,private_channel",
-                limit=200,
-                cursor=cursor
-            )
-            
-            for channel in result["channels"]:
-                if channel["name"] == channel_name:
-                    return channel["id"]
-            
-            cursor = result.get("response_metadata", {}).get("next_cursor")
-            if not cursor:
-                break
-                
-    except SlackApiError as e:
-        print(f"Error listing channels: {e.response['error']}")
-        return None
-    
-    return None
-
-
 def post_message(token: str, channel: str, message: str) -> bool:
     """Post a message to a Slack channel.
     
@@ -73,23 +83,25 @@ def post_message(token: str, channel: str, message: str) -> bool:
     Returns:
         True if successful, False otherwise
     """
-    client = WebClient(token=token)
+    client = slack_client.get_client(token)
     channel_name = channel.lstrip('#')
     
     # If channel starts with C and is alphanumeric, assume it's already an ID
     if channel.startswith('C') and channel[1:].isalnum():
         channel_id = channel
     else:
-        channel_id = find_channel_id(client, channel_name)
+        channel_id = channel_cache.find_channel_id(client, channel_name)
         if not channel_id:
             print(f"Error: Channel '{channel_name}' not found")
             return False
     
     try:
-        result = client.chat_postMessage(channel=channel_id, text=message)
+        lookup_name = None if channel_id == channel else channel_name
+        channel_cache.call_with_channel(client, channel_id, client.chat_postMessage,
+                                        channel_name=lookup_name, text=message)
         print(f"✓ Posted to #{channel_name}")
         return True
-    except SlackApiError as e:
+    except slack_client.SlackApiError as e:
         error = e.response['error']
         if error == 'not_in_channel':
             print(f"Error: Bot is not a member of #{channel_name}. Please add the bot to the channel first.")
@@ -102,7 +114,7 @@ def post_message(token: str, channel: str, message: str) -> bool:
 
 def test_connection(token: str) -> bool:
     """Test the Slack connection and token validity."""
-    client = WebClient(token=token)
+    client = slack_client.get_client(token)
     
     try:
         result = client.auth_test()
@@ -111,14 +123,14 @@ def test_connection(token: str) -> bool:
         print(f"  Team: {result['team']}")
         print(f"  URL: {result['url']}")
         return True
-    except SlackApiError as e:
+    except slack_client.SlackApiError as e:
         print(f"✗ Token test failed: {e.response['error']}")
         return False
 
 
 def list_channels(token: str) -> None:
     """List all accessible channels."""
-    client = WebClient(token=token)
+    client = slack_client.get_client(token)
     
     try:
         result = client.conversations_list(
@@ -131,7 +143,7 @@ def list_channels(token: str) -> None:
             prefix = "🔒" if channel.get("is_private") else "#"
             print(f"  {prefix} {channel['name']}")
             
-    except SlackApiError as e:
+    except slack_client.SlackApiError as e:
         print(f"Error listing channels: {e.response['error']}")
 
 
@@ -146,21 +158,24 @@ def set_channel_topic(token: str, channel: str, topic: str) -> bool:
     Returns:
         True if successful
     """
-    client = WebClient(token=token)
+    client = slack_client.get_client(token)
     
     if not channel.startswith('C'):
-        channel_id = find_channel_id(client, channel)
+        channel_id = channel_cache.find_channel_id(client, channel)
         if not channel_id:
             print(f"Error: Channel '{channel}' not found")
             return False
+        lookup_name = channel
     else:
         channel_id = channel
+        lookup_name = None
     
     try:
-        client.conversations_setTopic(channel=channel_id, topic=topic[:250])
+        channel_cache.call_with_channel(client, channel_id, client.conversations_setTopic,
+                                        channel_name=lookup_name, topic=topic[:250])
         print(f"✓ Set topic for #{channel}")
         return True
-    except SlackApiError as e:
+    except slack_client.SlackApiError as e:
         print(f"Error setting topic: {e.response['error']}")
         return False
 
@@ -176,21 +191,24 @@ def set_channel_purpose(token: str, channel: str, purpose: str) -> bool:
     Returns:
         True if successful
     """
-    client = WebClient(token=token)
+    client = slack_client.get_client(token)
     
     if not channel.startswith('C'):
-        channel_id = find_channel_id(client, channel)
+        channel_id = channel_cache.find_channel_id(client, channel)
         if not channel_id:
             print(f"Error: Channel '{channel}' not found")
             return False
+        lookup_name = channel
     else:
         channel_id = channel
+        lookup_name = None
     
     try:
-        client.conversations_setPurpose(channel=channel_id, purpose=purpose[:250])
+        channel_cache.call_with_channel(client, channel_id, client.conversations_setPurpose,
+                                        channel_name=lookup_name, purpose=purpose[:250])
         print(f"✓ Set purpose for #{channel}")
         return True
-    except SlackApiError as e:
+    except slack_client.SlackApiError as e:
         print(f"Error setting purpose: {e.response['error']}")
         return False
 
@@ -207,7 +225,7 @@ def create_channel(token: str, name: str, description: Optional[str] = None, is_
     Returns:
         Channel ID if successful, None otherwise
     """
-    client = WebClient(token=token)
+    client = slack_client.get_client(token)
     
     # Sanitize channel name (lowercase, no spaces, max 80 chars)
     clean_name = name.lower().replace(' ', '-').replace('_', '-')[:80]
@@ -218,6 +236,7 @@ def create_channel(token: str, name: str, description: Optional[str] = None, is_
             is_private=is_private
         )
         channel_id = result['channel']['id']
+        channel_cache.remember_channel(client, clean_name, channel_id)
         print(f"✓ Created channel #{clean_name} ({channel_id})")
         
         # Set description/purpose if provided
@@ -225,18 +244,19 @@ def create_channel(token: str, name: str, description: Optional[str] = None, is_
             try:
                 client.conversations_setPurpose(channel=channel_id, purpose=description[:250])
                 print(f"  Set purpose: {description[:50]}...")
-            except SlackApiError as e:
+            except slack_client.SlackApiError as e:
                 print(f"  Warning: Could not set purpose: {e.response['error']}")
         
         return channel_id
         
-    except SlackApiError as e:
+    except slack_client.SlackApiError as e:
         error = e.response['error']
         if error == 'name_taken':
             print(f"Error: Channel #{clean_name} already exists")
             # Return existing channel ID
-            existing_id = find_channel_id(client, clean_name)
+            existing_id = channel_cache.find_channel_id(client, clean_name)
             if existing_id:
+                channel_cache.remember_channel(client, clean_name, existing_id)
                 print(f"  Existing channel ID: {existing_id}")
             return existing_id
         else:
@@ -244,6 +264,418 @@ def create_channel(token: str, name: str, description: Optional[str] = None, is_
         return None
 
 
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, up to `burst` saved."""
+
+    def __init__(self, rate: float, burst: float = 1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Block until a token is available. Returns seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float) -> None:
+        """Hold all callers back, e.g. for a 429 Retry-After."""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class RateLimiter:
+    """Per-method token buckets sized to Slack's rate-limit tiers.
+
+    chat.postMessage gets one bucket per channel (Slack's ~1/sec/channel
+    guidance) in addition to a workspace-wide bucket.
+    """
+
+    def __init__(self, post_rate: float = POST_RATE_WORKSPACE):
+        self.post_rate = post_rate
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, method: str, key: Optional[str] = None) -> TokenBucket:
+        with self.lock:
+            if (method, key) not in self.buckets:
+                if method == 'chat_postMessage':
+                    rate = POST_RATE_PER_CHANNEL if key else self.post_rate
+                    burst = 1 if key else max(1, self.post_rate)
+                else:
+                    rate, burst = TIER_RATES[METHOD_TIERS.get(method, 3)], 1
+                self.buckets[(method, key)] = TokenBucket(rate, burst)
+            return self.buckets[(method, key)]
+
+    def acquire(self, method: str, channel: Optional[str] = None) -> float:
+        waited = self.bucket(method).acquire()
+        if channel and method == 'chat_postMessage':
+            waited += self.bucket(method, channel).acquire()
+        return waited
+
+    def pause(self, method: str, seconds: float) -> None:
+        self.bucket(method).pause(seconds)
+
+
+def retry_after_seconds(error: 'SlackApiError') -> Optional[float]:
+    """Seconds to wait if the error is a 429, else None."""
+    response = error.response
+    if getattr(response, 'status_code', None) != 429 and response.get('error') != 'ratelimited':
+        return None
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        return float(headers.get('Retry-After', headers.get('retry-after', 1)))
+    except (TypeError, ValueError):
+        return 1.0
+
+
+class BulkPoster:
+    """Post a stream of messages through one shared client and worker pool.
+
+    Messages for the same channel are posted in input order (so thread
+    replies land after their parent); different channels run concurrently.
+    """
+
+    def __init__(self, token: str, workers: int = DEFAULT_WORKERS,
+                 post_rate: float = POST_RATE_WORKSPACE, client: Optional['WebClient'] = None):
+        # BulkPoster paces and retries 429s itself, across all workers
+        self.client = client or slack_client.get_client(token, retry_rate_limits=False)
+        # The directory refresh pages through conversations.list; each page honours Retry-After
+        self.lookup_client = client or slack_client.get_client(token)
+        self.refresh_lock = threading.Lock()
+        self.directory = None  # Channel directory, once refreshed during this batch
+        self.limiter = RateLimiter(post_rate)
+        self.workers = workers
+        self.lock = threading.Lock()
+        self.queues = {}  # channel -> deque of (line_no, message)
+        self.active = set()  # channels with a drain task running
+        self.channel_ids = {}
+        self.pending = threading.BoundedSemaphore(workers * 50)
+        self.stats = {'posted': 0, 'failed': 0, 'retries': 0, 'rate_limit_wait': 0.0}
+        self.failures = []
+
+    def resolve(self, channel: str) -> Optional[str]:
+        if channel.startswith('C') and channel[1:].isalnum():
+            return channel
+        with self.lock:
+            if channel in self.channel_ids:
+                return self.channel_ids[channel]
+        channel_id = channel_cache.cached_channel_id(self.client, channel)
+        if not channel_id:
+            # One refresh per batch, shared by every worker that misses the cache
+            with self.refresh_lock:
+                if self.directory is None:
+                    self.limiter.acquire('conversations_list')
+                    self.directory = channel_cache.refresh_directory(self.lookup_client)
+                directory = self.directory
+            if directory is None:
+                return None  # Refresh failed: not cached, so the next message tries again
+            channel_id = directory.get(channel.lstrip('#'))
+        with self.lock:
+            self.channel_ids[channel] = channel_id
+        return channel_id
+
+    def record(self, key: str, amount=1) -> None:
+        with self.lock:
+            self.stats[key] += amount
+
+    def fail(self, line_no: int, channel: str, error: str) -> None:
+        with self.lock:
+            self.stats['failed'] += 1
+            self.failures.append({'line': line_no, 'channel': channel, 'error': error})
+
+    def post_one(self, line_no: int, message: dict) -> None:
+        channel = message['channel']
+        channel_id = self.resolve(channel)
+        if not channel_id:
+            self.fail(line_no, channel, 'channel_not_found')
+            return
+
+        kwargs = {'text': message['text']}
+        if message.get('thread_ts'):
+            kwargs['thread_ts'] = message['thread_ts']
+        lookup_name = None if channel_id == channel else channel.lstrip('#')
+
+        for attempt in range(MAX_RETRIES + 1):
+            waited = self.limiter.acquire('chat_postMessage', channel_id)
+            self.record('rate_limit_wait', waited)
+            if waited:
+                slack_timings.record('wait', 'rate_limiter', waited)
+            try:
+                channel_cache.call_with_channel(self.client, channel_id, self.client.chat_postMessage,
+                                                channel_name=lookup_name, **kwargs)
+                self.record('posted')
+                return
+            except slack_client.SlackApiError as e:
+                wait = retry_after_seconds(e)
+                if wait is None or attempt == MAX_RETRIES:
+                    self.fail(line_no, channel, e.response.get('error', str(e)))
+                    return
+                self.record('retries')
+                self.record('rate_limit_wait', wait)
+                slack_timings.record('wait', 'retry_after', wait)
+                self.limiter.pause('chat_postMessage', wait)
+
+    def drain(self, channel: str) -> None:
+        """Post queued messages for one channel until its queue is empty."""
+        while True:
+            with self.lock:
+                queue = self.queues[channel]
+                if not queue:
+                    self.active.discard(channel)
+                    return
+                line_no, message = queue.popleft()
+            try:
+                self.post_one(line_no, message)
+            except Exception as e:
+                self.fail(line_no, channel, str(e))
+            finally:
+                self.pending.release()
+
+    def run(self, lines) -> dict:
+        """Post every JSON line in `lines`. Returns the summary dict."""
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for line_no, line in enumerate(lines, 1):
+                if not line.strip():
+                    continue
+                try:
+                    message = json.loads(line)
+                    channel, text = message['channel'], message['text']
+                except (ValueError, KeyError, TypeError) as e:
+                    self.fail(line_no, '?', f'bad input: {e}')
+                    continue
+                # Back-pressure: don't read far ahead of the workers
+                self.pending.acquire()
+                with self.lock:
+                    self.queues.setdefault(channel, deque()).append((line_no, message))
+                    start_drain = channel not in self.active
+                    self.active.add(channel)
+                if start_drain:
+                    pool.submit(self.drain, channel)
+        elapsed = time.monotonic() - start
+        summary = dict(self.stats)
+        summary['elapsed'] = elapsed
+        summary['per_second'] = summary['posted'] / elapsed if elapsed else 0.0
+        summary['failures'] = self.failures
+        return summary
+
+
+def post_batch(token: str, source: str, workers: int = DEFAULT_WORKERS,
+               post_rate: float = POST_RATE_WORKSPACE) -> bool:
+    """Post JSON-lines messages from a file (or '-' for stdin).
+
+    Each line: {"channel": "...", "text": "...", "thread_ts": "..." (optional)}
+
+    Returns:
+        True if every message was posted
+    """
+    poster = BulkPoster(token, workers=workers, post_rate=post_rate)
+    if source == '-':
+        summary = poster.run(sys.stdin)
+    else:
+        with open(source, 'r') as f:
+            summary = poster.run(f)
+
+    print(f"✓ Posted {summary['posted']} messages in {summary['elapsed']:.1f}s "
+          f"({summary['per_second']:.2f}/s)")
+    print(f"  Retries: {summary['retries']}, rate-limit wait: {summary['rate_limit_wait']:.1f}s")
+    if summary['failed']:
+        print(f"✗ Failed: {summary['failed']}")
+        for failure in summary['failures']:
+            print(f"  line {failure['line']} ({failure['channel']}): {failure['error']}")
+    return summary['failed'] == 0
+
+
+def split_markdown(text: str, limit: int = MAX_TEXT_CHARS) -> List[str]:
+    """Split markdown into chunks of at most `limit` chars on block boundaries.
+
+    Blocks are paragraphs, lists and fenced code blocks (separated by blank
+    lines). Blocks are packed greedily; a block longer than `limit` is packed
+    line by line instead. A code fence open where a chunk ends is closed there
+    and re-opened at the start of the next chunk.
+    """
+    blocks, current, in_fence = [], [], False
+    for line in text.splitlines():
+        if line.lstrip().startswith('```'):
+            in_fence = not in_fence
+        if not line.strip() and not in_fence:
+            if current:
+                blocks.append('\n'.join(current))
+                current = []
+            continue
+        current.append(line)
+    if current:
+        blocks.append('\n'.join(current))
+
+    chunks = []
+    chunk = ''
+    fence = None  # Opening line of the code block still open at the end of `chunk`
+
+    def flush():
+        nonlocal chunk
+        chunks.append(chunk + '\n```' if fence else chunk)
+        chunk = fence or ''
+
+    for block in blocks:
+        if len(block) <= limit:
+            if chunk and len(chunk) + 2 + len(block) > limit:
+                flush()
+            chunk = f"{chunk}\n\n{block}" if chunk else block
+            continue
+        for number, line in enumerate(block.split('\n')):
+            sep = ('\n' if number else '\n\n') if chunk else ''
+            after = (None if fence else line.strip()) if line.lstrip().startswith('```') else fence
+            closing = 4 if after else 0  # '\n```'
+            if chunk and chunk != fence and len(chunk) + len(sep) + len(line) + closing > limit:
+                flush()
+                sep = '\n' if chunk else ''
+            # A single line longer than a chunk is cut wherever the limit falls
+            while len(chunk) + len(sep) + len(line) + closing > limit:
+                room = max(1, limit - len(chunk) - len(sep) - closing)
+                chunk += sep + line[:room]
+                line = line[room:]
+                flush()
+                sep = '\n' if chunk else ''
+            chunk += sep + line
+            fence = after
+    if chunk and chunk != fence:
+        chunks.append(chunk + '\n```' if fence else chunk)
+    return chunks
+
+
+def post_long_message(token: str, channel: str, text: str) -> bool:
+    """Post text too long for one message: first chunk in the channel, the rest as thread replies.
+
+    Returns:
+        True if every chunk was posted
+    """
+    client = slack_client.get_client(token)
+    channel_name = channel.lstrip('#')
+    with slack_timings.timed('phase', 'split', bytes=len(text)):
+        chunks = split_markdown(text)
+    if not chunks:
+        print("Error: Nothing to post")
+        return False
+
+    if channel.startswith('C') and channel[1:].isalnum():
+        channel_id, lookup_name = channel, None
+    else:
+        channel_id, lookup_name = channel_cache.find_channel_id(client, channel_name), channel_name
+        if not channel_id:
+            print(f"Error: Channel '{channel_name}' not found")
+            return False
+
+    pacer = TokenBucket(POST_RATE_PER_CHANNEL)
+    try:
+        pacer.acquire()
+        result = channel_cache.call_with_channel(client, channel_id, client.chat_postMessage,
+                                                 channel_name=lookup_name, text=chunks[0])
+        channel_id, thread_ts = result['channel'], result['ts']
+        for chunk in chunks[1:]:
+            pacer.acquire()
+            client.chat_postMessage(channel=channel_id, text=chunk, thread_ts=thread_ts)
+    except slack_client.SlackApiError as e:
+        print(f"Error posting message: {e.response['error']}")
+        return False
+
+    print(f"✓ Posted to #{channel_name} ({len(chunks)} parts, {len(chunks) - 1} in thread)")
+    return True
+
+
+def upload_file(token: str, channel: str, path: str, title: Optional[str] = None,
+                comment: Optional[str] = None, filename: Optional[str] = None) -> bool:
+    """Share a file in a channel without reading it into memory.
+
+    Uses the same external-upload API as WebClient.files_upload_v2 (which
+    buffers the whole file): get an upload URL, stream the file body to it,
+    then complete the upload into the channel.
+    """
+    client = slack_client.get_client(token)
+    channel_name = channel.lstrip('#')
+    channel_id = channel if channel.startswith('C') and channel[1:].isalnum() \
+        else channel_cache.find_channel_id(client, channel_name)
+    if not channel_id:
+        print(f"Error: Channel '{channel_name}' not found")
+        return False
+
+    filename = filename or os.path.basename(path)
+    size = os.path.getsize(path)
+    try:
+        target = client.files_getUploadURLExternal(filename=filename, length=size)
+        with open(path, 'rb') as f, slack_timings.timed('http', 'upload', bytes_out=size) as timing:
+            request = urllib.request.Request(
+                target['upload_url'], data=f, method='POST',
+                headers={'Content-Length': str(size), 'Content-Type': 'application/octet-stream'}
+            )
+            # urllib sends file objects in blocks, so memory stays flat
+            with urllib.request.urlopen(request, timeout=UPLOAD_TIMEOUT) as response:
+                timing['status'] = response.status
+                if response.status != 200:
+                    print(f"Error uploading file: HTTP {response.status}")
+                    return False
+        client.files_completeUploadExternal(
+            files=[{'id': target['file_id'], 'title': title or filename}],
+            channel_id=channel_id,
+            initial_comment=comment
+        )
+    except slack_client.SlackApiError as e:
+        print(f"Error uploading file: {e.response['error']}")
+        return False
+    except OSError as e:
+        print(f"Error uploading file: {e}")
+        return False
+
+    print(f"✓ Uploaded {filename} ({size / 1024:.0f} KB) to #{channel_name}")
+    return True
+
+
+def post_file(token: str, channel: str, source: str, comment: Optional[str] = None,
+              upload_over: int = UPLOAD_THRESHOLD, title: Optional[str] = None) -> bool:
+    """Post a markdown file (or '-' for stdin) as threaded chunks, or upload it if large.
+
+    Content up to `upload_over` bytes is chunked into a thread (with
+    `comment` as a lead-in); anything larger is uploaded as a file. Stdin is
+    read only up to the threshold; beyond it the rest is spooled to a
+    temporary file in blocks and uploaded from there.
+    """
+    if source != '-':
+        if os.path.getsize(source) > upload_over:
+            return upload_file(token, channel, source, title, comment)
+        with slack_timings.timed('phase', 'read_local'), \
+                open(source, 'r', encoding='utf-8', errors='replace') as f:
+            text = f.read()
+    else:
+        stdin = sys.stdin.buffer
+        head = stdin.read(upload_over + 1)
+        if len(head) > upload_over:
+            with slack_timings.timed('phase', 'spool'), \
+                    tempfile.NamedTemporaryFile(prefix='slack-upload-', suffix='.md', delete=False) as tmp:
+                tmp.write(head)
+                shutil.copyfileobj(stdin, tmp, UPLOAD_BLOCK_SIZE)
+            try:
+                return upload_file(token, channel, tmp.name, title or 'message.md', comment, 'message.md')
+            finally:
+                os.unlink(tmp.name)
+        text = head.decode('utf-8', errors='replace')
+
+    if comment:
+        text = f"{comment}\n\n{text}"
+    return post_long_message(token, channel, text)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Post messages to Slack channels",
@@ -261,8 +693,20 @@ def main():
     parser.add_argument('--private', action='store_true', help='Create as private channel (for --create-channel)')
     parser.add_argument('--set-topic', nargs=2, metavar=('CHANNEL', 'TOPIC'), help='Set channel topic')
     parser.add_argument('--set-purpose', nargs=2, metavar=('CHANNEL', 'PURPOSE'), help='Set channel purpose/description')
+    parser.add_argument('--batch', metavar='FILE', help="Post JSON-lines messages from FILE ('-' for stdin)")
+    parser.add_argument('--file', '-f', metavar='FILE', help="Post markdown from FILE ('-' for stdin), chunked into a thread")
+    parser.add_argument('--upload-over', type=int, default=UPLOAD_THRESHOLD, metavar='BYTES',
+                        help=f'Upload --file content larger than this as a file (default: {UPLOAD_THRESHOLD})')
+    parser.add_argument('--title', help='File title when --file content is uploaded')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Concurrent channels for --batch (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--rate', type=float, default=POST_RATE_WORKSPACE,
+                        help=f'Workspace-wide messages/second for --batch (default: {POST_RATE_WORKSPACE})')
+    slack_timings.add_argument(parser)
     
-    args = parser.parse_args()
+    # Intermixed so positionals may follow options: CHANNEL --file FILE "lead-in"
+    args = parser.parse_intermixed_args()
+    slack_timings.configure(args)
     
     token = get_token(args.token)
     
@@ -285,12 +729,25 @@ def main():
         success = set_channel_purpose(token, args.set_purpose[0], args.set_purpose[1])
         sys.exit(0 if success else 1)
     
+    if args.batch:
+        success = post_batch(token, args.batch, args.workers, args.rate)
+        sys.exit(0 if success else 1)
+    
+    if args.file:
+        if not args.channel:
+            parser.error('--file needs a channel')
+        success = post_file(token, args.channel, args.file, args.message, args.upload_over, args.title)
+        sys.exit(0 if success else 1)
+    
     if not args.channel or not args.message:
         parser.print_help()
         print("\nError: Both channel and message are required.")
         sys.exit(1)
     
-    success = post_message(token, args.channel, args.message)
+    if len(args.message) > MAX_TEXT_CHARS:
+        success = post_long_message(token, args.channel, args.message)
+    else:
+        success = post_message(token, args.channel, args.message)
     sys.exit(0 if success else 1)
 
 
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Shared Slack client setup for the Slack scripts.
+
+Resolves the bot token once per process (argument, SLACK_BOT_TOKEN, or
+.cursor/.api_keys.txt; get_user_token() does the same for SLACK_USER_TOKEN)
+and hands out one WebClient per token with
+slack_sdk's connection and rate-limit retry handlers attached. slack_sdk
+is only imported when a client or SlackApiError is first needed, so
+`--help` and local-only code paths start without it.
+
+SLACK_API_URL points every client at another Web API root, e.g. the local
+fake_slack.py server (`http://127.0.0.1:8099/api/`). While slack_timings is
+enabled, clients record every call (see slack_timings.py).
+
+Used by:
+    .cursor/skills/slack-posting/post_message.py
+    .cursor/skills/slack-posting/channel_cache.py
+    .cursor/skills/canvas-sync/sync_canvas.py
+    .cursor/skills/canvas-sync/create_canvas.py
+
+Usage:
+    import slack_client
+
+    client = slack_client.get_client()          # token from env / .api_keys.txt
+    try:
+        client.auth_test()
+    except slack_client.SlackApiError as e:     # imported lazily
+        print(e.response['error'])
+"""
+
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+import slack_timings
+
+API_KEYS_PATH = Path(__file__).parent.parent.parent / '.api_keys.txt'
+CONNECTION_RETRIES = 2
+RATE_LIMIT_RETRIES = 3
+API_URL = os.environ.get('SLACK_API_URL')  # None: slack_sdk's default (https://slack.com/api/)
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def _token_from_file(name: str = 'SLACK_BOT_TOKEN', path: Path = API_KEYS_PATH) -> Optional[str]:
+    """NAME=... from the keys file, read once per process and name."""
+    try:
+        with open(path) as f:
+            for line in f:
+                if line.startswith(name + '='):
+                    return line.split('=', 1)[1].strip()
+    except OSError:
+        pass
+    return None
+
+
+def get_token(provided_token: Optional[str] = None) -> Optional[str]:
+    """Slack token from argument, SLACK_BOT_TOKEN, or .cursor/.api_keys.txt. None if unset."""
+    return provided_token or os.environ.get('SLACK_BOT_TOKEN') or _token_from_file()
+
+
+def get_user_token(provided_token: Optional[str] = None) -> Optional[str]:
+    """User (xoxp-) token from argument, SLACK_USER_TOKEN, or .cursor/.api_keys.txt. None if unset."""
+    return provided_token or os.environ.get('SLACK_USER_TOKEN') or _token_from_file('SLACK_USER_TOKEN')
+
+
+def get_client(token: Optional[str] = None, retry_rate_limits: bool = True):
+    """Return the process-wide WebClient for a token.
+
+    Clients are created on first use and reused afterwards, so every call
+    in a process shares one connection setup. Callers that do their own
+    429 handling (e.g. post_message's BulkPoster) pass
+    `retry_rate_limits=False` to get a client that surfaces rate limits.
+    """
+    token = get_token(token)
+    key = (token, retry_rate_limits)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            from slack_sdk import WebClient
+            from slack_sdk.http_retry.builtin_handlers import (
+                ConnectionErrorRetryHandler, RateLimitErrorRetryHandler
+            )
+            handlers = [ConnectionErrorRetryHandler(max_retry_count=CONNECTION_RETRIES)]
+            if retry_rate_limits:
+                handlers.append(RateLimitErrorRetryHandler(max_retry_count=RATE_LIMIT_RETRIES))
+            kwargs = {'base_url': API_URL.rstrip('/') + '/'} if API_URL else {}
+            client = WebClient(token=token, retry_handlers=handlers, **kwargs)
+            _clients[key] = client
+    if slack_timings.enabled():
+        slack_timings.instrument_client(client)
+    return client
+
+
+def __getattr__(name):
+    # Lazy `slack_client.SlackApiError`: importing slack_sdk.errors loads all of slack_sdk
+    if name == 'SlackApiError':
+        from slack_sdk.errors import SlackApiError
+        return SlackApiError
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,673 @@
+#!/usr/bin/env python3
+"""
+Incremental Slack history mirror - channels and DMs in a local SQLite store.
+
+Tracked conversations are synced into .cursor/.slack_history.db. Each run
+asks conversations.history only for messages newer than the stored latest
+`ts`, and conversations.replies only for replies newer than the stored
+`latest_reply` of new threads and of threads active in the last
+--thread-days. Shared files are downloaded once into a
+content-addressed cache (.cursor/.slack_files/<sha256[:2]>/<sha256>), so a
+file shared in several places, or shared again, is never fetched twice.
+
+Reading and searching work entirely from the store (no API calls):
+
+Usage:
+    python slack_history.py --add proj-my-project,general --dms   # track, then sync
+    python slack_history.py --sync                                 # sync everything tracked
+    python slack_history.py --search "deploy failed" --channel proj-my-project
+    python slack_history.py --read @alice --limit 30
+    python slack_history.py --read proj-my-project --thread 1760781234.123456
+    python slack_history.py --status
+    python slack_history.py --file F0123ABCD                       # cached path of a file
+
+DMs need a user token (SLACK_USER_TOKEN, or SLACK_USER_TOKEN= in
+.cursor/.api_keys.txt); without one the bot token is used, which can only
+read channels the bot is in. Edits and deletions of already-synced
+messages, and first replies to them, are only picked up by re-reading
+history with --rescan-days.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+import tempfile
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import channel_cache
+import slack_client
+import slack_timings
+
+CURSOR_DIR = Path(__file__).parent.parent.parent
+STORE_PATH = Path(os.environ.get('SLACK_HISTORY_DB', CURSOR_DIR / '.slack_history.db'))
+FILES_DIR = Path(os.environ.get('SLACK_FILES_DIR', CURSOR_DIR / '.slack_files'))
+INITIAL_DAYS = 30  # History fetched the first time a conversation is synced
+THREAD_WINDOW_DAYS = 3  # Stored threads active this recently are checked for new replies (0: off)
+PAGE_LIMIT = 200  # Slack's recommended maximum page size
+DOWNLOAD_WORKERS = 4
+MAX_FILE_MB = 50
+CHUNK_SIZE = 64 * 1024
+DEFAULT_TOP_K = 10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    user_id TEXT,
+    tracked INTEGER NOT NULL DEFAULT 1,
+    latest_ts TEXT,
+    synced_at REAL
+);
+CREATE TABLE IF NOT EXISTS messages (
+    channel TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    thread_ts TEXT,
+    user_id TEXT,
+    subtype TEXT,
+    text TEXT NOT NULL DEFAULT '',
+    reply_count INTEGER NOT NULL DEFAULT 0,
+    latest_reply TEXT,
+    edited_ts TEXT,
+    PRIMARY KEY (channel, ts)
+);
+CREATE INDEX IF NOT EXISTS messages_thread ON messages(channel, thread_ts);
+CREATE TABLE IF NOT EXISTS threads (
+    channel TEXT NOT NULL,
+    thread_ts TEXT NOT NULL,
+    latest_reply TEXT,
+    PRIMARY KEY (channel, thread_ts)
+);
+CREATE TABLE IF NOT EXISTS files (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    mimetype TEXT,
+    size INTEGER,
+    url TEXT,
+    sha256 TEXT,
+    fetched_at REAL  -- Set with sha256 NULL: skipped as too large
+);
+CREATE TABLE IF NOT EXISTS message_files (
+    channel TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    file_id TEXT NOT NULL,
+    PRIMARY KEY (channel, ts, file_id)
+);
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    real_name TEXT
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    text, content='messages', content_rowid='rowid', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS messages_ai AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts(rowid, text) VALUES (new.rowid, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_ad AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts(messages_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_au AFTER UPDATE OF text ON messages BEGIN
+    INSERT INTO messages_fts(messages_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+    INSERT INTO messages_fts(rowid, text) VALUES (new.rowid, new.text);
+END;
+"""
+
+UPSERT_MESSAGE = """
+INSERT INTO messages (channel, ts, thread_ts, user_id, subtype, text, reply_count, latest_reply, edited_ts)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (channel, ts) DO UPDATE SET
+    thread_ts = excluded.thread_ts, user_id = excluded.user_id, subtype = excluded.subtype,
+    text = excluded.text, reply_count = excluded.reply_count,
+    latest_reply = excluded.latest_reply, edited_ts = excluded.edited_ts
+"""
+
+
+def connect(path=STORE_PATH):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path))
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def ts_float(ts):
+    return float(ts) if ts else 0.0
+
+
+def format_ts(ts):
+    return datetime.fromtimestamp(ts_float(ts)).strftime('%Y-%m-%d %H:%M')
+
+
+# Tracking
+
+def conversation_kind(channel):
+    if channel.get('is_im'):
+        return 'im'
+    if channel.get('is_mpim'):
+        return 'mpim'
+    return 'private' if channel.get('is_private') else 'channel'
+
+
+def track(conn, channel, name=None):
+    """Add or re-enable a conversation (a conversations.* channel object)."""
+    name = name or channel.get('name') or channel['id']
+    with conn:
+        conn.execute("""
+            INSERT INTO conversations (id, name, kind, user_id, tracked) VALUES (?, ?, ?, ?, 1)
+            ON CONFLICT (id) DO UPDATE SET name = excluded.name, tracked = 1
+        """, (channel['id'], name, conversation_kind(channel), channel.get('user')))
+
+
+def user_name(client, conn, user_id):
+    """Display name for a user ID, from the store or users.info (then stored)."""
+    row = conn.execute('SELECT name FROM users WHERE id = ?', (user_id,)).fetchone()
+    if row:
+        return row[0]
+    try:
+        user = client.users_info(user=user_id)['user']
+    except slack_client.SlackApiError:
+        return user_id
+    name = user.get('name') or user_id
+    with conn:
+        conn.execute('INSERT OR REPLACE INTO users (id, name, real_name) VALUES (?, ?, ?)',
+                     (user_id, name, user.get('real_name')))
+    return name
+
+
+def add_channels(client, conn, names):
+    """Track channels by name or ID. Returns the names that could not be found."""
+    missing = []
+    for name in names:
+        name = name.strip().lstrip('#')
+        if not name:
+            continue
+        channel_id = name if re.match(r'^[CGD][A-Z0-9]+$', name) else channel_cache.find_channel_id(client, name)
+        try:
+            channel = client.conversations_info(channel=channel_id)['channel'] if channel_id else None
+        except slack_client.SlackApiError:
+            channel = None
+        if channel is None:
+            missing.append(name)
+            continue
+        if channel.get('is_im'):
+            track(conn, channel, '@' + user_name(client, conn, channel['user']))
+        else:
+            track(conn, channel)
+    return missing
+
+
+def add_dms(client, conn):
+    """Track every DM and group DM visible to the token. Returns how many."""
+    count = 0
+    cursor = None
+    while True:
+        result = client.conversations_list(types='im,mpim', limit=PAGE_LIMIT, cursor=cursor)
+        for channel in result['channels']:
+            if channel.get('is_user_deleted'):
+                continue
+            name = '@' + user_name(client, conn, channel['user']) if channel.get('is_im') else None
+            track(conn, channel, name)
+            count += 1
+        cursor = result.get('response_metadata', {}).get('next_cursor')
+        if not cursor:
+            return count
+
+
+# Sync
+
+def store_message(conn, channel_id, message):
+    """Upsert one message and record its files (downloaded later by fetch_files)."""
+    conn.execute(UPSERT_MESSAGE, (
+        channel_id, message['ts'], message.get('thread_ts'), message.get('user') or message.get('bot_id'),
+        message.get('subtype'), message.get('text') or '', message.get('reply_count', 0),
+        message.get('latest_reply'), (message.get('edited') or {}).get('ts'),
+    ))
+    for file in message.get('files') or []:
+        if not file.get('id'):
+            continue
+        conn.execute('INSERT OR IGNORE INTO message_files (channel, ts, file_id) VALUES (?, ?, ?)',
+                     (channel_id, message['ts'], file['id']))
+        conn.execute('INSERT OR IGNORE INTO files (id, name, mimetype, size, url) VALUES (?, ?, ?, ?, ?)',
+                     (file['id'], file.get('name'), file.get('mimetype'), file.get('size'),
+                      file.get('url_private_download') or file.get('url_private')))
+
+
+def paginate(method, **kwargs):
+    """Messages from every page of a conversations.history/replies call."""
+    cursor = None
+    while True:
+        result = method(limit=PAGE_LIMIT, cursor=cursor, **kwargs)
+        yield from result.get('messages', [])
+        cursor = result.get('response_metadata', {}).get('next_cursor')
+        if not cursor or not result.get('has_more', True):
+            return
+
+
+def sync_conversation(client, conn, conversation, initial_days=INITIAL_DAYS, thread_days=THREAD_WINDOW_DAYS,
+                      rescan_days=0):
+    """Fetch new messages and new thread replies for one conversation.
+
+    conversations.history starts at the stored latest `ts` (or `rescan_days`
+    back, to catch edits and deletions). Threads found there with new
+    replies, and stored threads active in the last `thread_days`, are read
+    with conversations.replies from their stored `latest_reply` on.
+
+    Returns:
+        dict with counts of messages fetched, new messages stored and threads updated
+    """
+    channel_id, latest_ts = conversation
+    now = time.time()
+    if latest_ts is None:
+        oldest = now - initial_days * 86400 if initial_days else 0
+    else:
+        oldest = ts_float(latest_ts)
+        if rescan_days:
+            oldest = min(oldest, now - rescan_days * 86400)
+    synced = dict(conn.execute('SELECT thread_ts, latest_reply FROM threads WHERE channel = ?', (channel_id,)))
+
+    count_sql = 'SELECT COUNT(*) FROM messages WHERE channel = ?'
+    stored = conn.execute(count_sql, (channel_id,)).fetchone()[0]
+    stats = {'messages': 0, 'threads': 0}
+    newest = latest_ts
+    threads = set()
+    with conn:
+        for message in paginate(client.conversations_history, channel=channel_id, oldest=f'{oldest:.6f}'):
+            store_message(conn, channel_id, message)
+            stats['messages'] += 1
+            if ts_float(message['ts']) > ts_float(newest):
+                newest = message['ts']
+            latest_reply = message.get('latest_reply')
+            if message.get('reply_count') and ts_float(latest_reply) > ts_float(synced.get(message['ts'])):
+                threads.add(message['ts'])
+
+    # Replies don't appear in conversations.history, so recently active
+    # threads are asked for anything newer than their stored latest reply
+    if thread_days and latest_ts is not None:
+        active_since = now - thread_days * 86400
+        threads.update(thread_ts for thread_ts, latest_reply in synced.items()
+                       if max(ts_float(thread_ts), ts_float(latest_reply)) >= active_since)
+
+    for thread_ts in sorted(threads):
+        # The parent always comes back first and is upserted (reply_count, latest_reply)
+        oldest_reply = synced.get(thread_ts) or thread_ts
+        latest_reply = oldest_reply
+        replies = 0
+        with conn:
+            for message in paginate(client.conversations_replies, channel=channel_id, ts=thread_ts,
+                                    oldest=oldest_reply):
+                store_message(conn, channel_id, message)
+                if message['ts'] != thread_ts:
+                    replies += 1
+                    if ts_float(message['ts']) > ts_float(latest_reply):
+                        latest_reply = message['ts']
+            conn.execute('INSERT OR REPLACE INTO threads (channel, thread_ts, latest_reply) VALUES (?, ?, ?)',
+                         (channel_id, thread_ts, latest_reply))
+        stats['messages'] += replies
+        if replies:
+            stats['threads'] += 1
+
+    with conn:
+        conn.execute('UPDATE conversations SET latest_ts = ?, synced_at = ? WHERE id = ?',
+                     (newest, now, channel_id))
+    stats['new'] = conn.execute(count_sql, (channel_id,)).fetchone()[0] - stored
+    return stats
+
+
+def cache_path(sha256):
+    return FILES_DIR / sha256[:2] / sha256
+
+
+def download_file(session, token, url, max_bytes):
+    """Stream a file into the cache while hashing it. Returns its sha256, or None if too large."""
+    FILES_DIR.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    with session.get(url, headers={'Authorization': f'Bearer {token}'}, stream=True, timeout=60) as response, \
+            slack_timings.timed('http', 'file_download') as timing:
+        response.raise_for_status()
+        with tempfile.NamedTemporaryFile(dir=FILES_DIR, prefix='.download-', delete=False) as tmp:
+            try:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > max_bytes:
+                        break
+                    digest.update(chunk)
+                    tmp.write(chunk)
+            except BaseException:
+                os.unlink(tmp.name)
+                raise
+        timing['bytes'] = size
+    if size > max_bytes:
+        os.unlink(tmp.name)
+        return None
+    sha256 = digest.hexdigest()
+    target = cache_path(sha256)
+    if target.exists():
+        os.unlink(tmp.name)  # Same content already cached under another file ID
+    else:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp.name, target)
+    return sha256
+
+
+def fetch_files(conn, token, max_mb=MAX_FILE_MB, workers=DOWNLOAD_WORKERS):
+    """Download every recorded file that isn't cached yet. Returns (downloaded, skipped, failed).
+
+    Failed downloads are retried on the next sync; files skipped as too
+    large are fetched once --max-file-mb allows them.
+    """
+    max_bytes = max_mb * 1024 * 1024
+    candidates = conn.execute(
+        'SELECT id, url, size FROM files WHERE sha256 IS NULL AND (fetched_at IS NULL OR size <= ?)',
+        (max_bytes,)).fetchall()
+    # Cached files whose blob went missing are fetched again
+    candidates += [(file_id, url, size) for file_id, url, size, sha256 in conn.execute(
+        'SELECT id, url, size, sha256 FROM files WHERE sha256 IS NOT NULL') if not cache_path(sha256).exists()]
+    todo = [c for c in candidates if c[1] and (c[2] or 0) <= max_bytes]
+    todo_ids = {c[0] for c in todo}
+    skipped = len(candidates) - len(todo)
+    with conn:
+        conn.executemany('UPDATE files SET fetched_at = ? WHERE id = ? AND sha256 IS NULL',
+                         [(time.time(), c[0]) for c in candidates if c[0] not in todo_ids])
+    if not todo:
+        return 0, skipped, 0
+
+    import requests
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    def fetch(item):
+        file_id, url, _ = item
+        try:
+            return file_id, download_file(session, token, url, max_bytes), None
+        except (OSError, requests.RequestException) as e:
+            return file_id, None, str(e)
+
+    downloaded = failed = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for file_id, sha256, error in pool.map(fetch, todo):
+            if error:
+                print(f"  Warning: download of {file_id} failed: {error}")
+                failed += 1
+            elif sha256 is None:
+                with conn:
+                    conn.execute('UPDATE files SET fetched_at = ? WHERE id = ?', (time.time(), file_id))
+                skipped += 1
+            else:
+                with conn:
+                    conn.execute('UPDATE files SET sha256 = ?, fetched_at = ? WHERE id = ?',
+                                 (sha256, time.time(), file_id))
+                downloaded += 1
+    return downloaded, skipped, failed
+
+
+def sync_all(client, conn, token, initial_days=INITIAL_DAYS, thread_days=THREAD_WINDOW_DAYS,
+             files=True, max_mb=MAX_FILE_MB, rescan_days=0):
+    """Sync every tracked conversation, then fetch new files. Returns True if all succeeded."""
+    conversations = conn.execute(
+        'SELECT id, name, latest_ts FROM conversations WHERE tracked = 1 ORDER BY name').fetchall()
+    if not conversations:
+        print("Nothing tracked yet: use --add CHANNELS or --dms")
+        return True
+
+    ok = True
+    start = time.monotonic()
+    for channel_id, name, latest_ts in conversations:
+        try:
+            stats = sync_conversation(client, conn, (channel_id, latest_ts), initial_days, thread_days, rescan_days)
+        except slack_client.SlackApiError as e:
+            print(f"✗ {name}: {e.response.get('error')}")
+            ok = False
+            continue
+        detail = f", {stats['threads']} threads updated" if stats['threads'] else ''
+        print(f"✓ {name}: {stats['new']} new messages ({stats['messages']} fetched){detail}")
+
+    # Authors seen for the first time get a display name (one users.info each, then stored)
+    for (user_id,) in conn.execute("""
+            SELECT DISTINCT user_id FROM messages
+            WHERE user_id LIKE 'U%' AND user_id NOT IN (SELECT id FROM users)""").fetchall():
+        user_name(client, conn, user_id)
+
+    if files:
+        downloaded, skipped, failed = fetch_files(conn, token, max_mb)
+        if downloaded or skipped or failed:
+            print(f"Files: {downloaded} downloaded, {skipped} skipped (over {max_mb} MB or no URL), "
+                  f"{failed} failed")
+        ok = ok and not failed
+    print(f"Synced {len(conversations)} conversations in {time.monotonic() - start:.1f}s")
+    return ok
+
+
+# Local reads
+
+def to_fts_query(text):
+    """Turn plain search words into an FTS5 query (all terms, any order)."""
+    terms = re.findall(r'\w+', text)
+    return ' '.join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def resolve(conn, ref):
+    """Conversation ID for a stored name (general, #general, @alice) or ID."""
+    if not ref:
+        return None
+    row = conn.execute('SELECT id FROM conversations WHERE id = ? OR name = ? OR name = ?',
+                       (ref, ref.lstrip('#'), ref)).fetchone()
+    return row[0] if row else None
+
+
+def row_dict(row):
+    channel, name, ts, thread_ts, user, text, reply_count, files = row
+    return {'channel': name or channel, 'ts': ts, 'time': format_ts(ts), 'thread_ts': thread_ts,
+            'user': user, 'text': text, 'reply_count': reply_count,
+            'files': [str(cache_path(sha)) if sha else f'{file_id} (not cached)'
+                      for file_id, sha in (json.loads(files) if files else [])]}
+
+
+MESSAGE_COLUMNS = """
+    m.channel, c.name, m.ts, m.thread_ts, COALESCE(u.name, m.user_id), m.text, m.reply_count,
+    (SELECT json_group_array(json_array(f.id, f.sha256)) FROM message_files mf
+     JOIN files f ON f.id = mf.file_id WHERE mf.channel = m.channel AND mf.ts = m.ts)
+"""
+MESSAGE_JOINS = """
+    LEFT JOIN conversations c ON c.id = m.channel
+    LEFT JOIN users u ON u.id = m.user_id
+"""
+
+
+def search(conn, query, channel_id=None, top_k=DEFAULT_TOP_K, raw=False):
+    """Best-matching stored messages, best first."""
+    match = query if raw else to_fts_query(query)
+    if not match:
+        return []
+    sql = f"""
+        SELECT {MESSAGE_COLUMNS}
+        FROM messages_fts JOIN messages m ON m.rowid = messages_fts.rowid {MESSAGE_JOINS}
+        WHERE messages_fts MATCH ?
+    """
+    params = [match]
+    if channel_id:
+        sql += ' AND m.channel = ?'
+        params.append(channel_id)
+    sql += ' ORDER BY bm25(messages_fts) LIMIT ?'
+    params.append(top_k)
+    return [row_dict(row) for row in conn.execute(sql, params)]
+
+
+def read_messages(conn, channel_id, limit=50, days=None, thread_ts=None):
+    """Stored messages in time order: the latest `limit` top-level ones, or one thread."""
+    sql = f"SELECT {MESSAGE_COLUMNS} FROM messages m {MESSAGE_JOINS} WHERE m.channel = ?"
+    params = [channel_id]
+    if thread_ts:
+        sql += ' AND (m.thread_ts = ? OR m.ts = ?)'
+        params += [thread_ts, thread_ts]
+    else:
+        sql += ' AND (m.thread_ts IS NULL OR m.thread_ts = m.ts)'
+    if days:
+        sql += ' AND CAST(m.ts AS REAL) >= ?'
+        params.append(time.time() - days * 86400)
+    sql += ' ORDER BY CAST(m.ts AS REAL) DESC LIMIT ?'
+    params.append(limit)
+    return [row_dict(row) for row in conn.execute(sql, params)][::-1]
+
+
+def status(conn):
+    rows = conn.execute("""
+        SELECT c.name, c.kind, c.tracked, c.latest_ts, c.synced_at,
+               (SELECT COUNT(*) FROM messages m WHERE m.channel = c.id),
+               (SELECT COUNT(*) FROM threads t WHERE t.channel = c.id)
+        FROM conversations c ORDER BY c.tracked DESC, c.name
+    """).fetchall()
+    files, cached = conn.execute('SELECT COUNT(*), COUNT(sha256) FROM files').fetchone()
+    blobs = [p for p in FILES_DIR.glob('??/*')] if FILES_DIR.exists() else []
+    return {
+        'conversations': [
+            {'name': name, 'kind': kind, 'tracked': bool(tracked), 'messages': messages, 'threads': threads,
+             'latest': format_ts(latest) if latest else None,
+             'synced': datetime.fromtimestamp(synced).strftime('%Y-%m-%d %H:%M') if synced else None}
+            for name, kind, tracked, latest, synced, messages, threads in rows
+        ],
+        'files': files, 'files_cached': cached, 'blobs': len(blobs),
+        'cache_mb': round(sum(p.stat().st_size for p in blobs) / 1024 / 1024, 1),
+        'store': str(STORE_PATH),
+    }
+
+
+def print_messages(messages):
+    for m in messages:
+        replies = f"  [{m['reply_count']} replies, thread {m['ts']}]" if m['reply_count'] else ''
+        indent = '    ' if m['thread_ts'] and m['thread_ts'] != m['ts'] else ''
+        print(f"{indent}{m['time']}  #{m['channel']}  {m['user']}: {m['text']}{replies}")
+        for path in m['files']:
+            print(f"{indent}    file: {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Mirror Slack channels and DMs into a local store',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--add', metavar='CHANNELS', help='Track comma-separated channel names/IDs, then sync')
+    parser.add_argument('--dms', action='store_true', help='Track all DMs and group DMs, then sync')
+    parser.add_argument('--remove', metavar='NAMES', help='Stop tracking (stored history is kept)')
+    parser.add_argument('--sync', action='store_true', help='Fetch new messages for everything tracked')
+    parser.add_argument('--days', type=int, default=INITIAL_DAYS,
+                        help=f'History to fetch on first sync (default: {INITIAL_DAYS}; 0 = all)')
+    parser.add_argument('--thread-days', type=int, default=THREAD_WINDOW_DAYS,
+                        help=f'Check stored threads active in the last DAYS for new replies '
+                             f'(default: {THREAD_WINDOW_DAYS}; 0 = off)')
+    parser.add_argument('--rescan-days', type=int, default=0, metavar='DAYS',
+                        help='Also re-read the last DAYS of history for edits and deletions')
+    parser.add_argument('--no-files', action='store_true', help="Don't download shared files")
+    parser.add_argument('--max-file-mb', type=int, default=MAX_FILE_MB,
+                        help=f'Skip files larger than this (default: {MAX_FILE_MB})')
+    parser.add_argument('--search', '-s', metavar='QUERY', help='Search stored messages')
+    parser.add_argument('--raw', action='store_true', help='Treat QUERY as FTS5 syntax')
+    parser.add_argument('-k', type=int, default=DEFAULT_TOP_K, help=f'Search results (default: {DEFAULT_TOP_K})')
+    parser.add_argument('--read', metavar='CONVERSATION', help='Print stored messages (name, #name, @user or ID)')
+    parser.add_argument('--channel', metavar='CONVERSATION', help='Restrict --search to one conversation')
+    parser.add_argument('--thread', metavar='TS', help='With --read: print one thread')
+    parser.add_argument('--limit', type=int, default=50, help='With --read: messages to show (default: 50)')
+    parser.add_argument('--since', type=int, metavar='DAYS', help='With --read: only the last DAYS days')
+    parser.add_argument('--status', action='store_true', help='Show tracked conversations and cache size')
+    parser.add_argument('--file', metavar='FILE_ID', help='Print the cached path of a shared file')
+    parser.add_argument('--json', action='store_true', help='Output as JSON')
+    parser.add_argument('--token', '-t', help='Slack token (default: SLACK_USER_TOKEN, then the bot token)')
+    slack_timings.add_argument(parser)
+    args = parser.parse_args()
+    slack_timings.configure(args)
+
+    if not (args.add or args.dms or args.remove or args.sync or args.search or args.read
+            or args.status or args.file):
+        parser.print_help()
+        sys.exit(1)
+
+    conn = connect()
+    ok = True
+
+    if args.add or args.dms or args.sync:
+        token = slack_client.get_user_token(args.token) or slack_client.get_token()
+        if not token:
+            print("Error: No Slack token. Set SLACK_USER_TOKEN (or SLACK_BOT_TOKEN) or pass --token.")
+            sys.exit(1)
+        client = slack_client.get_client(token)
+        try:
+            if args.add:
+                missing = add_channels(client, conn, args.add.split(','))
+                if missing:
+                    print(f"✗ Not found or not accessible: {', '.join(missing)}")
+                    ok = False
+            if args.dms:
+                print(f"✓ Tracking {add_dms(client, conn)} DMs")
+        except slack_client.SlackApiError as e:
+            print(f"Error: {e.response.get('error')}")
+            sys.exit(1)
+        ok = sync_all(client, conn, token, args.days, args.thread_days,
+                      not args.no_files, args.max_file_mb, args.rescan_days) and ok
+
+    if args.remove:
+        for name in args.remove.split(','):
+            channel_id = resolve(conn, name.strip())
+            if channel_id:
+                with conn:
+                    conn.execute('UPDATE conversations SET tracked = 0 WHERE id = ?', (channel_id,))
+                print(f"✓ No longer tracking {name.strip()}")
+            else:
+                print(f"✗ Not tracked: {name.strip()}")
+                ok = False
+
+    if args.status:
+        report = status(conn)
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            for c in report['conversations']:
+                mark = '' if c['tracked'] else '  (untracked)'
+                print(f"{c['name']:<30} {c['kind']:<8} {c['messages']:>7} msgs {c['threads']:>5} threads  "
+                      f"latest {c['latest'] or '-'}  synced {c['synced'] or 'never'}{mark}")
+            print(f"\n{report['files']} files ({report['files_cached']} cached, {report['blobs']} blobs, "
+                  f"{report['cache_mb']} MB) in {report['store']}")
+
+    if args.file:
+        row = conn.execute('SELECT name, sha256 FROM files WHERE id = ?', (args.file,)).fetchone()
+        if not row or not row[1]:
+            print(f"✗ File {args.file} is not cached")
+            ok = False
+        else:
+            print(cache_path(row[1]))
+
+    if args.search or args.read:
+        ref = args.channel if args.search else args.read
+        channel_id = resolve(conn, ref) if ref else None
+        if ref and not channel_id:
+            print(f"✗ Unknown conversation: {ref} (see --status)")
+            sys.exit(1)
+        try:
+            messages = (search(conn, args.search, channel_id, args.k, args.raw) if args.search
+                        else read_messages(conn, channel_id, args.limit, args.since, args.thread))
+        except sqlite3.OperationalError as e:
+            print(f"Error: invalid query: {e}")
+            sys.exit(1)
+        if args.json:
+            print(json.dumps(messages, indent=2))
+        elif not messages:
+            print("No messages.")
+        else:
+            print_messages(messages)
+
+    conn.close()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
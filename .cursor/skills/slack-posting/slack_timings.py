@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Per-call timing records for the Slack and canvas scripts, plus an aggregator.
+
+When enabled (`--timings [FILE]` on post_message.py, sync_canvas.py and
+create_canvas.py, or SLACK_TIMINGS=FILE / SLACK_TIMINGS=1 for the default
+file), every Slack API call, raw HTTP transfer and local phase appends one
+JSON line:
+
+    {"ts": 1760781234.5, "run": "1760781230-4242", "script": "sync_canvas.py",
+     "kind": "api", "name": "files.info", "ms": 41.2, "status": 200, "ok": true,
+     "bytes": 1834, "bytes_out": 24, "retries": 0, "retry_wait_ms": 0.0, "rate_limited": 0}
+
+Kinds: `api` (WebClient calls, one record per call including its retries
+and rate-limit waits), `http` (url_private downloads, file uploads), `phase`
+(parse, diff, split, local file and cache I/O) and `wait` (client-side
+pacing in BulkPoster). When disabled, the helpers cost one attribute check.
+
+Run this module to aggregate one or more record files (any number of runs):
+
+Usage:
+    python sync_canvas.py --project my-project --action check --timings
+    SLACK_TIMINGS=1 python post_message.py proj-x "hi"
+    python slack_timings.py                          # default file
+    python slack_timings.py timings.jsonl --by script --since 24
+    python slack_timings.py --kind api --json
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import urlencode
+
+DEFAULT_PATH = Path(__file__).parent.parent.parent / '.slack_timings.jsonl'
+ENV_VAR = 'SLACK_TIMINGS'
+
+_out = None  # Open record file while enabled
+_lock = threading.Lock()
+_local = threading.local()  # .call: fields of the API call in progress (for retry handlers)
+_run = {}
+
+
+def enable(path=None, script=None) -> None:
+    """Start appending records to `path` (DEFAULT_PATH if None)."""
+    global _out
+    path = Path(path or DEFAULT_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _lock:
+        if _out is not None:
+            _out.close()
+        _out = open(path, 'a', buffering=1)
+    _run.update(run=f'{int(time.time())}-{os.getpid()}',
+                script=script or os.path.basename(sys.argv[0]) or 'python')
+
+
+def enabled() -> bool:
+    return _out is not None
+
+
+def add_argument(parser) -> None:
+    """The shared --timings option."""
+    parser.add_argument('--timings', nargs='?', const=str(DEFAULT_PATH), metavar='FILE',
+                        help=f'Append per-call timing records (JSON lines) to FILE (default: {DEFAULT_PATH}); '
+                             f'aggregate with slack_timings.py. Also enabled by {ENV_VAR}=FILE')
+
+
+def configure(args) -> None:
+    """Enable from a parsed --timings option (the env var is handled at import)."""
+    if getattr(args, 'timings', None):
+        enable(args.timings)
+
+
+def record(kind, name, seconds, **fields) -> None:
+    """Append one record. No-op while disabled."""
+    if _out is None:
+        return
+    entry = {'ts': round(time.time(), 3), **_run, 'kind': kind, 'name': name, 'ms': round(seconds * 1000, 2)}
+    entry.update(fields)
+    line = json.dumps(entry, separators=(',', ':')) + '\n'
+    with _lock:
+        if _out is not None:
+            _out.write(line)
+
+
+@contextmanager
+def timed(kind, name, **fields):
+    """Time the block and record it; the yielded dict collects extra fields (bytes, status...)."""
+    if _out is None:
+        yield fields
+        return
+    start = time.perf_counter()
+    try:
+        yield fields
+    except BaseException as e:
+        fields.setdefault('error', type(e).__name__)
+        raise
+    finally:
+        record(kind, name, time.perf_counter() - start, **fields)
+
+
+@contextmanager
+def streamed(name, chunks, started=None, **fields):
+    """Time a download that is parsed as it arrives.
+
+    Yields the chunk iterator. Time spent waiting for chunks (plus the
+    request itself, from `started`) is recorded as an `http` record and the
+    remainder as the `parse` phase.
+    """
+    if _out is None:
+        yield chunks
+        return
+    start = time.perf_counter()
+    request = start - started if started is not None else 0.0
+    meter = {'wait': 0.0, 'bytes': 0}
+
+    def metered():
+        iterator = iter(chunks)
+        while True:
+            before = time.perf_counter()
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                meter['wait'] += time.perf_counter() - before
+                return
+            meter['wait'] += time.perf_counter() - before
+            meter['bytes'] += len(chunk)
+            yield chunk
+
+    try:
+        yield metered()
+    except BaseException as e:
+        fields.setdefault('error', type(e).__name__)
+        raise
+    finally:
+        total = time.perf_counter() - start
+        record('http', name, request + meter['wait'], bytes=meter['bytes'], **fields)
+        record('phase', 'parse', total - meter['wait'])
+
+
+def _request_bytes(kwargs) -> int:
+    if kwargs.get('json'):
+        return len(json.dumps(kwargs['json']))
+    if kwargs.get('params') or kwargs.get('data'):
+        return len(urlencode(kwargs.get('params') or kwargs['data']))
+    return 0
+
+
+def instrument_client(client):
+    """Record every request a slack_sdk WebClient makes, with its retries.
+
+    Wraps the client's public api_call() (every Web API method goes through
+    it, retries included) and its retry handlers' waits. Idempotent; returns
+    the client.
+    """
+    if getattr(client, '_timings_instrumented', False):
+        return client
+    from slack_sdk.errors import SlackApiError
+
+    api_call = client.api_call
+
+    def timed_call(api_method, **kwargs):
+        fields = {'retries': 0, 'retry_wait_ms': 0.0, 'rate_limited': 0, 'bytes_out': _request_bytes(kwargs)}
+        _local.call = fields
+        start = time.perf_counter()
+        try:
+            response = api_call(api_method, **kwargs)
+        except SlackApiError as e:
+            # ok: false from Slack; still a completed request
+            response = e.response
+            fields.update(status=response.status_code, ok=False, error=response.get('error'),
+                          bytes=_response_bytes(response))
+            record('api', api_method, time.perf_counter() - start, **fields)
+            raise
+        except BaseException as e:
+            record('api', api_method, time.perf_counter() - start, error=type(e).__name__, **fields)
+            raise
+        finally:
+            _local.call = None
+        fields.update(status=response.status_code, ok=bool(response.get('ok')), bytes=_response_bytes(response))
+        record('api', api_method, time.perf_counter() - start, **fields)
+        return response
+
+    for handler in client.retry_handlers:
+        prepare = handler.prepare_for_next_attempt
+
+        def timed_prepare(*, state, request, response=None, error=None, _prepare=prepare):
+            start = time.perf_counter()
+            _prepare(state=state, request=request, response=response, error=error)
+            fields = getattr(_local, 'call', None)
+            if fields is not None:
+                fields['retries'] += 1
+                fields['retry_wait_ms'] += round((time.perf_counter() - start) * 1000, 2)
+                if response is not None and response.status_code == 429:
+                    fields['rate_limited'] += 1
+
+        handler.prepare_for_next_attempt = timed_prepare
+
+    client.api_call = timed_call
+    client._timings_instrumented = True
+    return client
+
+
+def _response_bytes(response) -> int:
+    data = response.data
+    if isinstance(data, (bytes, str)):
+        return len(data)
+    return len(json.dumps(data)) if data else 0
+
+
+if os.environ.get(ENV_VAR):
+    enable(None if os.environ[ENV_VAR] == '1' else os.environ[ENV_VAR])
+
+
+# Aggregation
+
+def load_records(paths, since=None, kind=None, run=None):
+    """Records from JSON-lines files, skipping malformed lines."""
+    for path in paths:
+        try:
+            f = open(path)
+        except OSError as e:
+            print(f"Warning: {e}", file=sys.stderr)
+            continue
+        with f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(entry, dict) or 'ms' not in entry:
+                    continue
+                if since and entry.get('ts', 0) < since:
+                    continue
+                if kind and entry.get('kind') != kind:
+                    continue
+                if run and entry.get('run') != run:
+                    continue
+                yield entry
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile (`fraction` in 0..1); 0.0 for no values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))]
+
+
+def aggregate(records, by='name'):
+    """Per-group call counts, latency percentiles and totals."""
+    groups = {}
+    for entry in records:
+        if by == 'script':
+            key = (entry.get('script', '?'), entry.get('kind', '?'), entry.get('name', '?'))
+        else:
+            key = (entry.get('kind', '?'), entry.get('name', '?'))
+        group = groups.setdefault(key, {'ms': [], 'runs': set(), 'errors': 0, 'retries': 0,
+                                        'rate_limited': 0, 'retry_wait_ms': 0.0, 'bytes': 0})
+        group['ms'].append(entry['ms'])
+        group['runs'].add(entry.get('run'))
+        group['errors'] += 1 if entry.get('error') or entry.get('ok') is False else 0
+        group['retries'] += entry.get('retries', 0)
+        group['rate_limited'] += entry.get('rate_limited', 0)
+        group['retry_wait_ms'] += entry.get('retry_wait_ms', 0.0)
+        group['bytes'] += entry.get('bytes', 0)
+
+    rows = []
+    for key, group in groups.items():
+        ms = sorted(group['ms'])
+        rows.append({
+            'group': ' '.join(key),
+            'calls': len(ms),
+            'runs': len(group['runs']),
+            'p50_ms': round(percentile(ms, 0.5), 1),
+            'p95_ms': round(percentile(ms, 0.95), 1),
+            'max_ms': round(ms[-1], 1),
+            'total_s': round(sum(ms) / 1000, 2),
+            'errors': group['errors'],
+            'retries': group['retries'],
+            'rate_limited': group['rate_limited'],
+            'retry_wait_s': round(group['retry_wait_ms'] / 1000, 2),
+            'kb': round(group['bytes'] / 1024, 1),
+        })
+    return sorted(rows, key=lambda row: -row['total_s'])
+
+
+def print_table(rows):
+    if not rows:
+        print("No timing records")
+        return
+    width = max(len('group'), *(len(row['group']) for row in rows))
+    print(f"{'group':<{width}}  {'calls':>6} {'runs':>5} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} "
+          f"{'total s':>8} {'err':>4} {'retry':>5} {'429':>4} {'KB':>8}")
+    for row in rows:
+        print(f"{row['group']:<{width}}  {row['calls']:>6} {row['runs']:>5} {row['p50_ms']:>8} {row['p95_ms']:>8} "
+              f"{row['max_ms']:>8} {row['total_s']:>8} {row['errors']:>4} {row['retries']:>5} "
+              f"{row['rate_limited']:>4} {row['kb']:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Aggregate Slack script timing records',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('files', nargs='*', help=f'Record files (default: {DEFAULT_PATH})')
+    parser.add_argument('--by', choices=['name', 'script'], default='name',
+                        help='Group by kind+name (default) or also by script')
+    parser.add_argument('--kind', choices=['api', 'http', 'phase', 'wait'], help='Only this kind of record')
+    parser.add_argument('--run', help='Only this run ID')
+    parser.add_argument('--since', type=float, metavar='HOURS', help='Only records from the last HOURS hours')
+    parser.add_argument('--json', action='store_true', help='Print rows as JSON')
+    args = parser.parse_args()
+
+    since = time.time() - args.since * 3600 if args.since else None
+    records = load_records(args.files or [DEFAULT_PATH], since, args.kind, args.run)
+    rows = aggregate(records, args.by)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print_table(rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the context-threshold hook across transcript sizes.
+
+Generates synthetic transcript JSONL files (small chat messages mixed with
+huge tool-result lines and assistant usage records), then runs the hook's
+main() as a fresh process per sample, the same way Claude Code invokes it.
+
+Each size is measured per strategy:
+    estimate / cold   full chars/4 rescan (no sidecar state, page cache evicted)
+    estimate / warm   incremental scan of a few appended lines
+    usage / cold      reverse-seek for the latest usage record, page cache evicted
+    usage / warm      same, with the file tail cached
+    server-<mode>     context-threshold-client.py against a resident --serve
+                      process in that mode; cold restarts the server (empty
+                      scan state) and evicts the page cache before each sample
+
+Timings and peak RSS are the hook process's (the client's for server-*).
+
+Usage:
+    python bench_context_threshold.py --sizes 1M,10M,100M,1G --output report.json
+    python bench_context_threshold.py --sizes 1M,4G --workdir /data/bench
+    python bench_context_threshold.py --baseline old.json --max-regression 25
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HOOK_PATH = Path(__file__).parent / "context-threshold.py"
+CLIENT_PATH = Path(__file__).parent / "context-threshold-client.py"
+# Shared nearest-rank percentile (also used by the Slack load test and timings)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / ".cursor" / "skills" / "slack-posting"))
+from slack_timings import percentile  # noqa: E402
+
+STATE_SUFFIX = ".context-threshold.json"  # Must match context-threshold.py
+SERVER_PREFIX = "server-"
+STRATEGIES = ["estimate", "usage", "server-estimate", "server-usage"]
+SERVER_START_TIMEOUT = 10
+PHASES = ["cold", "warm"]
+UNITS = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+
+def parse_size(text: str) -> int:
+    """Parse '1M', '500K', '2G' or a plain byte count."""
+    text = text.strip().upper().rstrip("B")
+    if text and text[-1] in UNITS:
+        return int(float(text[:-1]) * UNITS[text[-1]])
+    return int(text)
+
+
+def format_size(size: int) -> str:
+    for unit in ("G", "M", "K"):
+        if size >= UNITS[unit] and size % UNITS[unit] == 0:
+            return f"{size // UNITS[unit]}{unit}"
+    return str(size)
+
+
+def make_record(rng: random.Random, context_tokens: int) -> tuple:
+    """Build one synthetic transcript record. Returns (record, new_context_tokens)."""
+    roll = rng.random()
+    if roll < 0.08:
+        # Huge tool result: file reads, command output, search dumps
+        size = int(rng.paretovariate(1.2) * 40_000)
+        size = min(size, 8 * 1024 * 1024)
+        record = {
+            "type": "user",
+            "message": {
+                "role": "user",
+                "content": [{
+                    "type": "tool_result",
+                    "tool_use_id": f"toolu_{rng.getrandbits(64):016x}",
+                    "content": "x" * size,
+                }],
+            },
+        }
+        return record, context_tokens + size // 4
+    if roll < 0.45:
+        text = "word " * rng.randint(20, 400)
+        record = {"type": "user", "message": {"role": "user", "content": text}}
+        return record, context_tokens + len(text) // 4
+    text = "reply " * rng.randint(10, 300)
+    context_tokens += len(text) // 4
+    record = {
+        "type": "assistant",
+        "message": {
+            "role": "assistant",
+            "content": [{"type": "text", "text": text}],
+            "usage": {
+                "input_tokens": 3,
+                "cache_read_input_tokens": context_tokens % 200_000,
+                "cache_creation_input_tokens": rng.randint(0, 2000),
+                "output_tokens": len(text) // 4,
+            },
+        },
+    }
+    return record, context_tokens
+
+
+def generate_transcript(path: Path, target_size: int, seed: int = 0) -> None:
+    """Write a synthetic transcript of roughly `target_size` bytes."""
+    rng = random.Random(seed)
+    written = 0
+    context_tokens = 0
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        while written < target_size:
+            record, context_tokens = make_record(rng, context_tokens)
+            line = json.dumps(record) + "\n"
+            f.write(line)
+            written += len(line)
+    os.replace(tmp_path, path)
+
+
+def append_message(path: Path) -> None:
+    """Append one small exchange, as happens between two prompts."""
+    with open(path, "a") as f:
+        f.write(json.dumps({"type": "user", "message": {"role": "user", "content": "next step"}}) + "\n")
+
+
+def evict_page_cache(path: Path) -> None:
+    """Ask the kernel to drop cached pages for a file (no root needed)."""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+
+def clear_state(path: Path) -> None:
+    try:
+        os.unlink(str(path) + STATE_SUFFIX)
+    except FileNotFoundError:
+        pass
+
+
+def start_server(mode: str, socket_path: str) -> subprocess.Popen:
+    """Start `context-threshold.py --serve` and wait until it accepts connections."""
+    env = dict(os.environ, CONTEXT_THRESHOLD_MODE=mode, CONTEXT_THRESHOLD_SOCKET=socket_path)
+    proc = subprocess.Popen([sys.executable, str(HOOK_PATH), "--serve"],
+                            env=env, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with {proc.returncode}")
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(socket_path)
+            return proc
+        except OSError:
+            time.sleep(0.02)
+        finally:
+            sock.close()
+    stop_server(proc)
+    raise RuntimeError(f"server did not start within {SERVER_START_TIMEOUT}s")
+
+
+def stop_server(proc: subprocess.Popen) -> None:
+    proc.terminate()
+    try:
+        proc.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def run_hook(transcript: Path, strategy: str, socket_path: str = None) -> tuple:
+    """Run the hook once in a fresh process. Returns (seconds, peak_rss_kb).
+
+    With `socket_path`, the process is the thin client talking to that server.
+    """
+    if socket_path:
+        env = dict(os.environ, CONTEXT_THRESHOLD_SOCKET=socket_path)
+        script = CLIENT_PATH
+    else:
+        env = dict(os.environ, CONTEXT_THRESHOLD_MODE=strategy)
+        script = HOOK_PATH
+    payload = json.dumps({"transcript_path": str(transcript)}).encode()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, str(script)],
+        stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, env=env,
+    )
+    proc.stdin.write(payload)
+    proc.stdin.close()
+    # wait4 gives this child's own rusage, unlike RUSAGE_CHILDREN
+    _, status, rusage = os.wait4(proc.pid, 0)
+    elapsed = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if proc.returncode != 0:
+        raise RuntimeError(f"hook exited with {proc.returncode} on {transcript}")
+    return elapsed, rusage.ru_maxrss
+
+
+def measure(transcript: Path, strategy: str, phase: str, iterations: int) -> dict:
+    times = []
+    peak_rss = 0
+    clear_state(transcript)
+    socket_dir = server = socket_path = None
+    if strategy.startswith(SERVER_PREFIX):
+        # Short private path: Unix socket paths are limited to ~100 bytes
+        socket_dir = tempfile.mkdtemp(prefix="ctb-")
+        socket_path = os.path.join(socket_dir, "s.sock")
+        server = start_server(strategy[len(SERVER_PREFIX):], socket_path)
+    try:
+        if phase == "warm":
+            # Prime sidecar (or server) state and page cache
+            run_hook(transcript, strategy, socket_path)
+        for _ in range(iterations):
+            if phase == "cold":
+                clear_state(transcript)
+                if server:
+                    stop_server(server)
+                    server = start_server(strategy[len(SERVER_PREFIX):], socket_path)
+                evict_page_cache(transcript)
+            else:
+                append_message(transcript)
+            elapsed, rss = run_hook(transcript, strategy, socket_path)
+            times.append(elapsed)
+            peak_rss = max(peak_rss, rss)
+    finally:
+        if server:
+            stop_server(server)
+            shutil.rmtree(socket_dir, ignore_errors=True)
+    clear_state(transcript)
+    return {
+        "size_bytes": transcript.stat().st_size,
+        "strategy": strategy,
+        "phase": phase,
+        "iterations": iterations,
+        "p50_ms": round(percentile(times, 0.5) * 1000, 3),
+        "p99_ms": round(percentile(times, 0.99) * 1000, 3),
+        "mean_ms": round(sum(times) / len(times) * 1000, 3),
+        "peak_rss_kb": peak_rss,
+    }
+
+
+def compare(report: dict, baseline: dict, max_regression: float) -> list:
+    """Return descriptions of results whose p50 regressed past the limit."""
+    def key(r):
+        return (format_size(r["target_bytes"]), r["strategy"], r["phase"])
+
+    previous = {key(r): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in report["results"]:
+        old = previous.get(key(result))
+        if not old or not old["p50_ms"]:
+            continue
+        change = (result["p50_ms"] - old["p50_ms"]) / old["p50_ms"] * 100
+        if change > max_regression:
+            size, strategy, phase = key(result)
+            regressions.append(
+                f"{size} {strategy}/{phase}: p50 {old['p50_ms']}ms -> {result['p50_ms']}ms (+{change:.0f}%)"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the context-threshold hook",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument("--sizes", default="1M,10M,100M,1G",
+                        help="Comma-separated transcript sizes (default: 1M,10M,100M,1G)")
+    parser.add_argument("--strategies", default=",".join(STRATEGIES),
+                        help="Comma-separated strategies: estimate, usage, server-estimate, server-usage")
+    parser.add_argument("--iterations", "-n", type=int, default=20,
+                        help="Samples per size/strategy/phase (default: 20)")
+    parser.add_argument("--workdir", help="Where synthetic transcripts are kept (reused across runs)")
+    parser.add_argument("--output", "-o", help="Write JSON report here (default: stdout)")
+    parser.add_argument("--baseline", help="Previous JSON report to compare against")
+    parser.add_argument("--max-regression", type=float, default=20.0,
+                        help="Allowed p50 slowdown in percent vs --baseline (default: 20)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for generated transcripts")
+
+    args = parser.parse_args()
+
+    sizes = [parse_size(s) for s in args.sizes.split(",") if s.strip()]
+    strategies = [s.strip() for s in args.strategies.split(",") if s.strip()]
+    workdir = Path(args.workdir or Path(tempfile.gettempdir()) / "context-threshold-bench")
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    results = []
+    for size in sizes:
+        transcript = workdir / f"transcript-{format_size(size)}-seed{args.seed}.jsonl"
+        if not transcript.exists():
+            print(f"Generating {transcript} ...", file=sys.stderr)
+            generate_transcript(transcript, size, args.seed)
+        original_size = transcript.stat().st_size
+        for strategy in strategies:
+            for phase in PHASES:
+                result = measure(transcript, strategy, phase, args.iterations)
+                result["target_bytes"] = size
+                results.append(result)
+                print(f"  {format_size(size):>6} {strategy:<15} {phase:<5} "
+                      f"p50={result['p50_ms']:>9.2f}ms p99={result['p99_ms']:>9.2f}ms "
+                      f"rss={result['peak_rss_kb'] // 1024}MB", file=sys.stderr)
+                # Undo lines appended by warm runs so files stay reusable
+                os.truncate(transcript, original_size)
+
+    report = {
+        "hook": str(HOOK_PATH),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "iterations": args.iterations,
+        "results": results,
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+        print(f"✓ Wrote report to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare(report, baseline, args.max_regression)
+        if regressions:
+            print("✗ Regressions:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            sys.exit(1)
+        print("✓ No regressions vs baseline", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Thin client for the resident context-threshold server.
+
+Hook type: UserPromptSubmit
+Purpose: Forward hook stdin to `context-threshold.py --serve` over a Unix
+socket and print its reply, avoiding interpreter work beyond `socket`.
+Falls back to running context-threshold.py in-process when no server is
+listening.
+"""
+
+import os
+import socket
+import sys
+
+CONNECT_TIMEOUT = 0.5  # Seconds before giving up on the server
+REPLY_TIMEOUT = 10
+
+
+def get_socket_path() -> str:
+    # Must match get_socket_path() in context-threshold.py
+    tmpdir = os.environ.get("TMPDIR") or "/tmp"
+    return os.environ.get(
+        "CONTEXT_THRESHOLD_SOCKET",
+        os.path.join(tmpdir, f"context-threshold-{os.getuid()}.sock"),
+    )
+
+
+def ask_server(payload: bytes):
+    """Send hook input to the server. Returns reply bytes, or None if unavailable."""
+    try:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    except OSError:
+        return None
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(get_socket_path())
+        sock.settimeout(REPLY_TIMEOUT)
+        sock.sendall(payload)
+        sock.shutdown(socket.SHUT_WR)
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return b''.join(chunks)
+    except OSError:
+        return None
+    finally:
+        sock.close()
+
+
+def run_in_process(payload: bytes) -> str:
+    """Compute the reply with the full hook when the server is not running."""
+    import importlib.util
+    import json
+
+    try:
+        hook_input = json.loads(payload)
+    except ValueError:
+        return ""
+    if not isinstance(hook_input, dict):
+        return ""
+
+    hook_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "context-threshold.py")
+    spec = importlib.util.spec_from_file_location("context_threshold", hook_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.check_threshold(hook_input)
+
+
+def main():
+    payload = sys.stdin.buffer.read()
+    reply = ask_server(payload)
+    if reply is None:
+        text = run_in_process(payload)
+        if text:
+            print(text)
+    elif reply:
+        print(reply.decode('utf-8'))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
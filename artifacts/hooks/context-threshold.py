@@ -5,16 +5,36 @@ Triggers warning when context usage exceeds threshold (default 90%)
 
 Hook type: UserPromptSubmit
 Purpose: Warn Claude to wrap up and run /end when context is nearly full
+
+Run with --serve to start a resident server that keeps scan state in memory;
+context-threshold-client.py then forwards hook input to it.
 """
 
 import json
+import os
 import sys
+from collections import OrderedDict
+from contextlib import nullcontext
 from pathlib import Path
 
+# context_profile.py sits next to this file (the client loads us by path)
+HOOKS_DIR = str(Path(__file__).resolve().parent)
+if HOOKS_DIR not in sys.path:
+    sys.path.insert(0, HOOKS_DIR)
+
 # Configuration
 CONTEXT_WINDOW_TOKENS = 200000  # Claude's approximate context window
 THRESHOLD_PERCENT = 90  # Trigger at 90% usage
 CHARS_PER_TOKEN = 4  # Rough approximation
+STATE_SUFFIX = ".context-threshold.json"  # Sidecar written next to the transcript
+# "usage": read the latest assistant usage record (falls back to "estimate")
+# "estimate": chars / CHARS_PER_TOKEN over the whole transcript
+TOKEN_MODE = os.environ.get("CONTEXT_THRESHOLD_MODE", "usage")
+REVERSE_BLOCK_SIZE = 64 * 1024  # Bytes read per backwards seek
+MAX_REVERSE_SCAN_BYTES = 16 * 1024 * 1024  # Give up and fall back past this
+# Append the top context consumers (context_profile.py) to the warning
+MAX_CACHED_TRANSCRIPTS = 256  # Scan states the resident server keeps in memory
+PROFILE_ON_WARNING = os.environ.get("CONTEXT_THRESHOLD_PROFILE", "0") == "1"
 
 
 def estimate_tokens(text: str) -> int:
@@ -22,47 +42,232 @@ def estimate_tokens(text: str) -> int:
     return len(text) // CHARS_PER_TOKEN
 
 
-def get_transcript_size(transcript_path: str) -> int:
-    """Read transcript JSONL and estimate total tokens."""
+def get_state_path(transcript_path: str) -> Path:
+    """Sidecar file holding the incremental scan state for a transcript."""
+    return Path(transcript_path + STATE_SUFFIX)
+
+
+def load_state(transcript_path: str) -> dict:
+    """Load the persisted scan state, or an empty dict if there is none."""
+    try:
+        with open(get_state_path(transcript_path), 'r') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return state if isinstance(state, dict) else {}
+
+
+def save_state(transcript_path: str, state: dict) -> None:
+    """Persist scan state atomically. Failures are ignored (next run rescans)."""
+    state_path = get_state_path(transcript_path)
+    tmp_path = state_path.with_name(state_path.name + f".{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, state_path)
+    except OSError:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+
+
+def scan_chars(f, offset: int) -> tuple:
+    """Count characters of non-blank lines from a byte offset.
+
+    Only complete (newline-terminated) lines advance the returned offset, so
+    a line still being written is re-read on the next call. Its characters
+    are returned separately as the pending tail.
+
+    Returns:
+        (new_offset, chars_in_complete_lines, chars_in_pending_tail)
+    """
+    f.seek(offset)
+    chars = 0
+    tail_chars = 0
+    for raw in f:
+        if not raw.endswith(b'\n'):
+            line = raw.decode('utf-8', errors='replace')
+            if line.strip():
+                tail_chars = len(line)
+            break
+        offset += len(raw)
+        line = raw.decode('utf-8', errors='replace')
+        if line.strip():
+            chars += len(line)
+    return offset, chars, tail_chars
+
+
+def get_transcript_size(transcript_path: str, state_cache: dict = None) -> int:
+    """Estimate total tokens in a transcript JSONL, reading only new bytes.
+
+    Scan progress (inode, byte offset, running char total) is kept in a
+    sidecar file next to the transcript, or in `state_cache` when given.
+    A truncated or replaced transcript triggers a full rescan.
+    """
     path = Path(transcript_path)
     if not path.exists():
+        if state_cache is not None:
+            state_cache.pop(transcript_path, None)
         return 0
 
-    total_chars = 0
+    if state_cache is not None:
+        state = state_cache.get(transcript_path, {})
+    else:
+        state = load_state(transcript_path)
+
     try:
-        with open(path, 'r') as f:
-            for line in f:
-                if line.strip():
-                    total_chars += len(line)
+        with open(path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            offset = state.get("offset", 0)
+            total_chars = state.get("chars", 0)
+            if (state.get("inode") != st.st_ino
+                    or state.get("device") != st.st_dev
+                    or offset > st.st_size):
+                # New, rotated or truncated transcript - start over
+                offset, total_chars = 0, 0
+            new_offset, chars, tail_chars = scan_chars(f, offset)
     except Exception:
         return 0
 
-    return total_chars // CHARS_PER_TOKEN
+    total_chars += chars
+    new_state = {
+        "inode": st.st_ino,
+        "device": st.st_dev,
+        "offset": new_offset,
+        "chars": total_chars,
+        "tokens": total_chars // CHARS_PER_TOKEN,
+    }
+    if state_cache is not None:
+        state_cache[transcript_path] = new_state
+    elif new_state != state:
+        save_state(transcript_path, new_state)
 
+    return (total_chars + tail_chars) // CHARS_PER_TOKEN
 
-def main():
-    # Read hook input from stdin
+
+def usage_tokens(record: dict):
+    """Context tokens from an assistant record's usage block, or None."""
+    if record.get("type") != "assistant" or record.get("isSidechain"):
+        return None
+    message = record.get("message")
+    if not isinstance(message, dict):
+        return None
+    usage = message.get("usage")
+    if not isinstance(usage, dict):
+        return None
+    return (usage.get("input_tokens", 0)
+            + usage.get("cache_read_input_tokens", 0)
+            + usage.get("cache_creation_input_tokens", 0))
+
+
+def iter_lines_reversed(f, block_size: int = REVERSE_BLOCK_SIZE,
+                        max_bytes: int = MAX_REVERSE_SCAN_BYTES):
+    """Yield complete lines of a binary file from last to first.
+
+    Reads fixed-size blocks backwards from EOF and stops after `max_bytes`,
+    so the cost does not depend on the size of the file.
+    """
+    f.seek(0, os.SEEK_END)
+    position = f.tell()
+    scanned = 0
+    # Blocks of the line still being read, last block first. They are joined
+    # only once its start is found, so a huge line is copied once, not per block.
+    pending = []
+    while position > 0 and scanned < max_bytes:
+        read_size = min(block_size, position)
+        position -= read_size
+        scanned += read_size
+        f.seek(position)
+        block = f.read(read_size)
+        newline = block.rfind(b'\n')
+        if newline < 0:
+            pending.append(block)
+            continue
+        pending.append(block[newline + 1:])
+        yield b''.join(reversed(pending))
+        lines = block[:newline].split(b'\n')
+        # The first piece may continue in the previous block
+        pending = [lines.pop(0)]
+        for line in reversed(lines):
+            yield line
+    if position == 0 and any(pending):
+        yield b''.join(reversed(pending))
+
+
+def get_usage_tokens(transcript_path: str):
+    """Current context size from the most recent assistant usage record.
+
+    Returns None when the transcript has no usage record within
+    MAX_REVERSE_SCAN_BYTES of its end.
+    """
     try:
-        hook_input = json.load(sys.stdin)
-    except json.JSONDecodeError:
-        # No input or invalid JSON - allow to proceed
-        return 0
+        with open(transcript_path, 'rb') as f:
+            for line in iter_lines_reversed(f):
+                # Cheap filter before paying for a JSON parse
+                if b'"usage"' not in line or b'"assistant"' not in line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict):
+                    tokens = usage_tokens(record)
+                    if tokens is not None:
+                        return tokens
+    except OSError:
+        return None
+    return None
+
 
+def get_context_tokens(transcript_path: str, mode: str = None,
+                       state_cache: dict = None) -> int:
+    """Current context tokens for a transcript using the configured mode."""
+    mode = mode or TOKEN_MODE
+    if mode == "usage":
+        tokens = get_usage_tokens(transcript_path)
+        if tokens is not None:
+            return tokens
+    return get_transcript_size(transcript_path, state_cache)
+
+
+def profile_summary(transcript_path: str) -> str:
+    """Top-5 context consumers from context_profile.py, or '' if it fails."""
+    try:
+        import context_profile
+        report = context_profile.profile_transcript(transcript_path)
+    except Exception:
+        return ""
+    lines = context_profile.summary_lines(report)
+    if not lines:
+        return ""
+    return "\n\n**Largest context consumers** (consider not re-reading these):\n" + "\n".join(lines)
+
+
+def check_threshold(hook_input: dict, state_cache: dict = None, lock=None) -> str:
+    """Return the warning text for a hook input, or '' when under threshold.
+
+    `lock` guards `state_cache` only; the warning's profile pass runs outside it.
+    """
     transcript_path = hook_input.get("transcript_path", "")
     if not transcript_path:
-        return 0
+        return ""
 
     # Calculate context usage
-    current_tokens = get_transcript_size(transcript_path)
+    with lock or nullcontext():
+        current_tokens = get_context_tokens(transcript_path, state_cache=state_cache)
     threshold_tokens = int(CONTEXT_WINDOW_TOKENS * THRESHOLD_PERCENT / 100)
     usage_percent = int(current_tokens / CONTEXT_WINDOW_TOKENS * 100)
 
-    # Check if over threshold
-    if current_tokens >= threshold_tokens:
-        # Output warning as plain text - Claude Code shows this to the agent
-        warning = f"""## CONTEXT THRESHOLD WARNING
+    # Under threshold - proceed normally (no output needed)
+    if current_tokens < threshold_tokens:
+        return ""
 
-Context usage: {usage_percent}% ({current_tokens:,} / {CONTEXT_WINDOW_TOKENS:,} tokens)
+    profile = profile_summary(transcript_path) if PROFILE_ON_WARNING else ""
+
+    return f"""## CONTEXT THRESHOLD WARNING
+
+Context usage: {usage_percent}% ({current_tokens:,} / {CONTEXT_WINDOW_TOKENS:,} tokens){profile}
 
 **Action required**: You are approaching the context limit. Please:
 1. Complete your current task as concisely as possible
@@ -70,11 +275,125 @@ Context usage: {usage_percent}% ({current_tokens:,} / {CONTEXT_WINDOW_TOKENS:,}
 3. Run `/end` to properly close this session
 
 Do NOT start new tasks. Wrap up now."""
-        # Plain text output is shown to Claude as additional context
-        print(warning)
+
+
+class StateCache(OrderedDict):
+    """In-memory scan states for the server, keeping the `maxsize` most recently updated."""
+
+    def __init__(self, maxsize: int = MAX_CACHED_TRANSCRIPTS):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
+def socket_in_use(socket_path: str) -> bool:
+    """True if a server is accepting connections on the socket."""
+    import socket
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(0.5)
+    try:
+        sock.connect(socket_path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        return False
+    except OSError:
+        return True  # e.g. a timeout: something is there, just busy
+    finally:
+        sock.close()
+    return True
+
+
+def get_socket_path() -> str:
+    """Unix socket used by the resident server (see serve())."""
+    tmpdir = os.environ.get("TMPDIR") or "/tmp"
+    return os.environ.get(
+        "CONTEXT_THRESHOLD_SOCKET",
+        os.path.join(tmpdir, f"context-threshold-{os.getuid()}.sock"),
+    )
+
+
+def serve(socket_path: str = None) -> int:
+    """Run a resident server that answers hook requests over a Unix socket.
+
+    Each connection sends the raw hook stdin JSON and half-closes; the server
+    replies with the text the hook would print. Per-transcript scan state is
+    kept in memory (for the MAX_CACHED_TRANSCRIPTS most recent transcripts)
+    instead of sidecar files. Pair with context-threshold-client.py as the
+    registered hook command. Refuses to start if another server is live on
+    the socket.
+    """
+    import signal
+    import socketserver
+    import threading
+
+    socket_path = socket_path or get_socket_path()
+    state_cache = StateCache()
+    lock = threading.Lock()
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            raw = self.rfile.read()
+            try:
+                hook_input = json.loads(raw)
+            except ValueError:
+                return
+            if not isinstance(hook_input, dict):
+                return
+            reply = check_threshold(hook_input, state_cache, lock)
+            self.wfile.write(reply.encode('utf-8'))
+
+    class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    if os.path.exists(socket_path):
+        if socket_in_use(socket_path):
+            print(f"context-threshold server already running on {socket_path}", file=sys.stderr)
+            return 1
+        # Stale socket left by a server that didn't shut down cleanly
+        os.unlink(socket_path)
+
+    old_umask = os.umask(0o077)
+    try:
+        server = Server(socket_path, Handler)
+    finally:
+        os.umask(old_umask)
+
+    # Clean up the socket on SIGTERM as well as Ctrl-C
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"context-threshold server listening on {socket_path}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        try:
+            os.unlink(socket_path)
+        except OSError:
+            pass
+    return 0
+
+
+def main():
+    if "--serve" in sys.argv[1:]:
+        return serve()
+
+    # Read hook input from stdin
+    try:
+        hook_input = json.load(sys.stdin)
+    except json.JSONDecodeError:
+        # No input or invalid JSON - allow to proceed
         return 0
 
-    # Under threshold - proceed normally (no output needed)
+    warning = check_threshold(hook_input)
+    if warning:
+        # Plain text output is shown to Claude as additional context
+        print(warning)
     return 0
 
 if __name__ == "__main__":
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Token attribution profiler for Claude Code transcripts.
+
+Streams a transcript JSONL once and attributes estimated tokens (chars / 4,
+like context-threshold.py) to record types, tool names, and the individual
+tool calls/results that were largest. Also records a cumulative growth curve.
+Memory is bounded regardless of transcript size: only the top-N items, a
+capped tool_use_id map and a fixed number of curve points are kept.
+
+Only what is in the main conversation's context counts: message content
+blocks, not record metadata or the duplicated `toolUseResult` field.
+Subagent (sidechain) records are skipped, and attribution restarts at each
+compaction boundary.
+
+Usage:
+    python context_profile.py ~/.claude/projects/<proj>/<session>.jsonl
+    python context_profile.py transcript.jsonl --top 20 --json
+
+context-threshold.py includes the top-5 summary in its warning when
+CONTEXT_THRESHOLD_PROFILE=1.
+"""
+
+import argparse
+import heapq
+import json
+import sys
+from collections import OrderedDict
+
+CHARS_PER_TOKEN = 4  # Must match context-threshold.py
+IMAGE_TOKENS = 1600  # Rough cost of one image block
+DEFAULT_TOP = 10
+CURVE_POINTS = 40  # Growth curve is downsampled to at most twice this many points
+MAX_TOOL_IDS = 10000  # tool_use_id -> name entries kept for matching results
+DETAIL_KEYS = ("file_path", "path", "notebook_path", "command", "pattern", "url", "query", "description", "prompt")
+
+
+def block_chars(block) -> int:
+    """Characters of a content block (or plain string) as it enters the context."""
+    if isinstance(block, str):
+        return len(block)
+    if not isinstance(block, dict):
+        return 0
+    kind = block.get("type")
+    if kind == "text":
+        return len(block.get("text") or "")
+    if kind == "thinking":
+        return len(block.get("thinking") or "")
+    if kind == "tool_use":
+        return len(json.dumps(block.get("input") or {}, ensure_ascii=False))
+    if kind == "tool_result":
+        content = block.get("content")
+        if isinstance(content, list):
+            return sum(block_chars(part) for part in content)
+        return block_chars(content or "")
+    if kind == "image":
+        return IMAGE_TOKENS * CHARS_PER_TOKEN
+    return 0
+
+
+def tool_detail(tool_input) -> str:
+    """Short description of a tool call from its most telling input field."""
+    if not isinstance(tool_input, dict):
+        return ""
+    for key in DETAIL_KEYS:
+        value = tool_input.get(key)
+        if isinstance(value, str) and value:
+            value = " ".join(value.split())
+            return value if len(value) <= 80 else value[:77] + "..."
+    return ""
+
+
+class ContextProfile:
+    """Accumulates token attribution over transcript records fed in order."""
+
+    def __init__(self, top: int = DEFAULT_TOP, curve_points: int = CURVE_POINTS):
+        self.top = top
+        self.curve_points = curve_points
+        self.tool_ids = OrderedDict()  # tool_use_id -> (name, detail), capped at MAX_TOOL_IDS
+        self.total_tokens = 0  # Across the whole transcript
+        self.curve = []  # (line, cumulative estimated tokens, latest usage tokens or None)
+        self.curve_step = 1
+        self.lines = 0
+        self.compactions = 0
+        self.last_usage = None
+        self.reset()
+
+    def reset(self) -> None:
+        """Start attribution over (at a compaction boundary)."""
+        self.tokens = 0
+        self.by_type = {}
+        self.by_tool = {}
+        self.items = []  # min-heap of (tokens, line, label)
+
+    def add(self, category: str, tool: str, tokens: int, line: int, label: str) -> None:
+        if tokens <= 0:
+            return
+        self.tokens += tokens
+        self.total_tokens += tokens
+        self.by_type[category] = self.by_type.get(category, 0) + tokens
+        if tool:
+            count, total = self.by_tool.get(tool, (0, 0))
+            self.by_tool[tool] = (count + 1, total + tokens)
+        entry = (tokens, line, label)
+        if len(self.items) < self.top:
+            heapq.heappush(self.items, entry)
+        elif entry > self.items[0]:
+            heapq.heapreplace(self.items, entry)
+
+    def remember_tool(self, tool_id: str, name: str, detail: str) -> None:
+        self.tool_ids[tool_id] = (name, detail)
+        if len(self.tool_ids) > MAX_TOOL_IDS:
+            self.tool_ids.popitem(last=False)
+
+    def feed(self, record: dict, line: int) -> None:
+        """Attribute one transcript record."""
+        self.lines = line
+        if record.get("isSidechain"):
+            return
+        kind = record.get("type")
+        if kind == "system" and record.get("subtype") == "compact_boundary":
+            self.compactions += 1
+            self.reset()
+            return
+        message = record.get("message")
+        if kind not in ("user", "assistant") or not isinstance(message, dict):
+            return
+
+        usage = message.get("usage")
+        if kind == "assistant" and isinstance(usage, dict):
+            self.last_usage = (usage.get("input_tokens", 0)
+                               + usage.get("cache_read_input_tokens", 0)
+                               + usage.get("cache_creation_input_tokens", 0))
+
+        content = message.get("content")
+        blocks = [content] if isinstance(content, str) else content if isinstance(content, list) else []
+        for block in blocks:
+            tokens = block_chars(block) // CHARS_PER_TOKEN
+            block_type = block.get("type") if isinstance(block, dict) else "text"
+            if block_type == "tool_use":
+                name = block.get("name") or "?"
+                detail = tool_detail(block.get("input"))
+                self.remember_tool(block.get("id"), name, detail)
+                self.add("tool_use", name, tokens, line, f"{name} call" + (f" {detail}" if detail else ""))
+            elif block_type == "tool_result":
+                name, detail = self.tool_ids.get(block.get("tool_use_id"), ("?", ""))
+                self.add("tool_result", name, tokens, line, f"{name} result" + (f" {detail}" if detail else ""))
+            elif block_type in ("text", "thinking", "image"):
+                category = "thinking" if block_type == "thinking" else f"{kind}_{block_type}"
+                label = "thinking" if block_type == "thinking" else f"{kind} {block_type}"
+                self.add(category, "", tokens, line, label)
+
+        self.sample(line)
+
+    def sample(self, line: int) -> None:
+        """Record a curve point every `curve_step` records, halving resolution when full."""
+        if line % self.curve_step:
+            return
+        self.curve.append((line, self.total_tokens, self.last_usage))
+        if len(self.curve) >= 2 * self.curve_points:
+            self.curve = self.curve[1::2]
+            self.curve_step *= 2
+
+    def report(self) -> dict:
+        top_items = sorted(self.items, reverse=True)
+        curve = self.curve + ([(self.lines, self.total_tokens, self.last_usage)]
+                              if not self.curve or self.curve[-1][0] != self.lines else [])
+        return {
+            "lines": self.lines,
+            "compactions": self.compactions,
+            "estimated_tokens": self.tokens,
+            "estimated_tokens_all": self.total_tokens,
+            "usage_tokens": self.last_usage,
+            "by_type": dict(sorted(self.by_type.items(), key=lambda kv: -kv[1])),
+            "by_tool": [
+                {"tool": tool, "count": count, "tokens": tokens}
+                for tool, (count, tokens) in sorted(self.by_tool.items(), key=lambda kv: -kv[1][1])
+            ],
+            "top_items": [{"tokens": t, "line": line, "item": label} for t, line, label in top_items],
+            "curve": [{"line": line, "estimated": est, "usage": usage} for line, est, usage in curve],
+        }
+
+
+def profile_transcript(transcript_path: str, top: int = DEFAULT_TOP) -> dict:
+    """Single streaming pass over a transcript. Returns the report dict."""
+    profile = ContextProfile(top=top)
+    with open(transcript_path, "rb") as f:
+        for number, raw in enumerate(f, 1):
+            if not raw.strip():
+                continue
+            try:
+                record = json.loads(raw)
+            except ValueError:
+                continue
+            if isinstance(record, dict):
+                profile.feed(record, number)
+    return profile.report()
+
+
+def format_tokens(tokens: int) -> str:
+    return f"{tokens / 1000:.1f}k" if tokens >= 1000 else str(tokens)
+
+
+def summary_lines(report: dict, count: int = 5) -> list:
+    """Compact top-N lines for the context-threshold warning."""
+    lines = [f"- {format_tokens(item['tokens'])} tokens: {item['item']} (line {item['line']})"
+             for item in report["top_items"][:count]]
+    tools = ", ".join(f"{t['tool']} {format_tokens(t['tokens'])} ({t['count']}x)" for t in report["by_tool"][:3])
+    if tools:
+        lines.append(f"- By tool: {tools}")
+    return lines
+
+
+def print_report(report: dict) -> None:
+    total = report["estimated_tokens"] or 1
+    since = f" since compaction #{report['compactions']}" if report["compactions"] else ""
+    usage = f", last usage record {report['usage_tokens']:,}" if report["usage_tokens"] is not None else ""
+    print(f"{report['lines']:,} lines, ~{report['estimated_tokens']:,} estimated tokens{since}{usage}")
+
+    print("\nBy record type:")
+    for category, tokens in report["by_type"].items():
+        print(f"  {category:<20} {tokens:>10,}  {tokens / total:>6.1%}")
+
+    print("\nBy tool:")
+    for t in report["by_tool"]:
+        print(f"  {t['tool']:<20} {t['tokens']:>10,}  {t['tokens'] / total:>6.1%}  ({t['count']} blocks)")
+
+    print("\nLargest items:")
+    for item in report["top_items"]:
+        print(f"  {item['tokens']:>8,}  line {item['line']:<8} {item['item']}")
+
+    print("\nGrowth (cumulative estimated tokens):")
+    peak = max((p["estimated"] for p in report["curve"]), default=0) or 1
+    for point in report["curve"]:
+        bar = "#" * round(40 * point["estimated"] / peak)
+        usage = f"  usage {point['usage']:,}" if point["usage"] is not None else ""
+        print(f"  line {point['line']:>8}  {point['estimated']:>10,}  {bar}{usage}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Attribute transcript tokens to record types, tools and large items",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument("transcript", help="Transcript JSONL path")
+    parser.add_argument("--top", "-n", type=int, default=DEFAULT_TOP,
+                        help=f"Largest items to list (default: {DEFAULT_TOP})")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--summary", action="store_true", help="Print only the compact top-5 summary")
+    args = parser.parse_args()
+
+    try:
+        report = profile_transcript(args.transcript, args.top)
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    elif args.summary:
+        print("\n".join(summary_lines(report)))
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,544 @@
+#!/usr/bin/env python3
+"""
+Local fake Notion API for exercising notion_tasks.py without a workspace.
+
+Implements the endpoints the task client calls, with in-memory state:
+
+    GET   /v1/databases/{id}         database schema (the task properties)
+    POST  /v1/databases/{id}/query   filters, sorts, start_cursor/page_size pagination
+    POST  /v1/pages                  create a task
+    GET   /v1/pages/{id}
+    PATCH /v1/pages/{id}             update properties / archive
+
+Filters cover what task queries use: timestamp filters on last_edited_time
+and created_time; title/rich_text, status/select, multi_select, date and
+relation property conditions; and nested "and"/"or". Like Notion,
+last_edited_time is rounded down to the minute, status options must exist
+in the schema, and requests need a Bearer token and a Notion-Version header.
+
+Latency, random 429s and a request rate cap (Notion allows an average of 3
+requests/second per integration) can be injected; a 429 carries Retry-After.
+GET /_stats returns per-endpoint call, 429 and error counts and POST /_reset
+clears them.
+
+Point notion_tasks.py at it with NOTION_API_URL:
+
+Usage:
+    python scripts/fake_notion.py --tasks 5000
+    python scripts/fake_notion.py --port 8098 --max-rps 3 --latency 0.05
+    NOTION_API_URL=http://127.0.0.1:8098/v1 NOTION_API_KEY=secret_fake \\
+        NOTION_DATABASE_ID=fake-tasks python scripts/notion_tasks.py list
+"""
+
+import re
+import sys
+import json
+import time
+import uuid
+import base64
+import random
+import argparse
+import threading
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+DEFAULT_PORT = 8098
+DEFAULT_DATABASE_ID = 'fake-tasks'
+DEFAULT_TASKS = 500
+MAX_PAGE_SIZE = 100
+STATUSES = ['Future', 'Urgent', 'Present', 'Done']
+SEED_TAGS = ['Grant-Apps', 'Admin', 'Research', 'Teaching', 'Writing', 'Reviews']
+
+# The task database as described in the notion-tasks skill
+SCHEMA = {
+    'Task name': {'type': 'title', 'title': {}},
+    'Status': {'type': 'status', 'status': {'options': [{'name': s} for s in STATUSES]}},
+    'Details': {'type': 'rich_text', 'rich_text': {}},
+    'Tags': {'type': 'multi_select', 'multi_select': {'options': [{'name': t} for t in SEED_TAGS]}},
+    'Due date': {'type': 'date', 'date': {}},
+    'Parent item': {'type': 'relation', 'relation': {'single_property': {}}},
+}
+
+PAGE_PATH_RE = re.compile(r'^/v1/pages/([\w-]+)$')
+DATABASE_PATH_RE = re.compile(r'^/v1/databases/([\w-]+)(/query)?$')
+
+
+class NotionError(Exception):
+    """An API error response: HTTP status, error code and message."""
+
+    def __init__(self, status, code, message):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+
+def now_minute():
+    """Current time as Notion reports it: ISO 8601, rounded down to the minute."""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:00.000Z')
+
+
+def rich_text(items):
+    """Normalize request rich text to the response form (with plain_text)."""
+    result = []
+    for item in items or []:
+        content = (item.get('text') or {}).get('content', item.get('plain_text', ''))
+        result.append({'type': 'text', 'text': {'content': content, 'link': None},
+                       'annotations': {}, 'plain_text': content, 'href': None})
+    return result
+
+
+def plain(items):
+    return ''.join(item.get('plain_text', '') for item in items or [])
+
+
+class NotionState:
+    """One task database and its pages."""
+
+    def __init__(self, database_id=DEFAULT_DATABASE_ID, tasks=DEFAULT_TASKS, seed=1):
+        self.database_id = database_id
+        self.schema = {name: {'id': f'p{i}', 'name': name, **json.loads(json.dumps(prop))}
+                       for i, (name, prop) in enumerate(SCHEMA.items())}
+        self.pages = {}  # id -> page object
+        self.lock = threading.Lock()
+        rng = random.Random(seed)
+        now = datetime.now(timezone.utc)
+        for n in range(1, tasks + 1):
+            edited = now - timedelta(minutes=rng.randint(60, 90 * 24 * 60))
+            properties = {
+                'Task name': {'title': [{'text': {'content': f'📝 Task {n:05d}'}}]},
+                'Status': {'status': {'name': STATUSES[n % len(STATUSES)]}},
+                'Details': {'rich_text': [{'text': {'content': f'Seeded task {n}'}}]},
+                'Tags': {'multi_select': [{'name': t} for t in rng.sample(SEED_TAGS, n % 3)]},
+                'Due date': {'date': {'start': (edited + timedelta(days=rng.randint(1, 30))).strftime('%Y-%m-%d')}
+                             if n % 4 else None},
+            }
+            page = self.create_page(properties)
+            page['last_edited_time'] = edited.strftime('%Y-%m-%dT%H:%M:00.000Z')
+            page['created_time'] = page['last_edited_time']
+
+    def database(self, database_id):
+        if database_id.replace('-', '') != self.database_id.replace('-', ''):
+            raise NotionError(404, 'object_not_found',
+                              f'Could not find database with ID: {database_id}.')
+        return {'object': 'database', 'id': self.database_id,
+                'title': rich_text([{'text': {'content': 'Tasks'}}]),
+                'properties': self.schema, 'url': f'https://www.notion.so/{self.database_id}'}
+
+    def page(self, page_id):
+        page = self.pages.get(page_id)
+        if page is None:
+            raise NotionError(404, 'object_not_found', f'Could not find page with ID: {page_id}.')
+        return page
+
+    def property_value(self, name, value):
+        """Validate one request property value and return its response form."""
+        prop = self.schema.get(name)
+        if prop is None:
+            raise NotionError(400, 'validation_error', f'{name} is not a property that exists.')
+        kind = prop['type']
+        if not isinstance(value, dict) or kind not in value:
+            raise NotionError(400, 'validation_error', f'{name} is expected to be {kind}.')
+        data = value[kind]
+        if kind in ('title', 'rich_text'):
+            data = rich_text(data)
+        elif kind == 'status':
+            if data is not None and data.get('name') not in STATUSES:
+                raise NotionError(400, 'validation_error',
+                                  f"Invalid status option. Status option \"{data.get('name')}\" does not exist.")
+        elif kind == 'multi_select':
+            options = prop['multi_select']['options']
+            for option in data or []:
+                if option['name'] not in {o['name'] for o in options}:
+                    options.append({'name': option['name']})  # Select options are created on use
+            data = [{'name': o['name']} for o in data or []]
+        elif kind == 'date' and data is not None:
+            data = {'start': data.get('start'), 'end': data.get('end'), 'time_zone': None}
+        elif kind == 'relation':
+            data = [{'id': r['id']} for r in data or []]
+        result = {'id': prop['id'], 'type': kind, kind: data}
+        if kind == 'relation':
+            result['has_more'] = False
+        return result
+
+    def empty_properties(self):
+        empty = {'title': [], 'rich_text': [], 'status': None, 'multi_select': [], 'date': None, 'relation': []}
+        return {name: {'id': prop['id'], 'type': prop['type'], prop['type']: empty[prop['type']]}
+                for name, prop in self.schema.items()}
+
+    def create_page(self, properties):
+        page_id = str(uuid.uuid4())
+        stamp = now_minute()
+        page = {
+            'object': 'page', 'id': page_id, 'created_time': stamp, 'last_edited_time': stamp,
+            'archived': False, 'in_trash': False,
+            'parent': {'type': 'database_id', 'database_id': self.database_id},
+            'properties': self.empty_properties(),
+            'url': f"https://www.notion.so/{page_id.replace('-', '')}",
+        }
+        for name, value in (properties or {}).items():
+            page['properties'][name] = self.property_value(name, value)
+        self.pages[page_id] = page
+        return page
+
+    def update_page(self, page_id, body):
+        page = self.page(page_id)
+        updated = {name: self.property_value(name, value) for name, value in (body.get('properties') or {}).items()}
+        page['properties'].update(updated)
+        if 'archived' in body or 'in_trash' in body:
+            page['archived'] = page['in_trash'] = bool(body.get('archived', body.get('in_trash')))
+        page['last_edited_time'] = now_minute()
+        return page
+
+    def query(self, database_id, body):
+        self.database(database_id)
+        pages = [p for p in self.pages.values()
+                 if not p['archived'] and (not body.get('filter') or self.matches(p, body['filter']))]
+        for sort in reversed(body.get('sorts') or [{'timestamp': 'created_time', 'direction': 'descending'}]):
+            pages.sort(key=lambda p: self.sort_key(p, sort), reverse=sort.get('direction') == 'descending')
+        size = body.get('page_size') or MAX_PAGE_SIZE
+        if not isinstance(size, int) or not 1 <= size <= MAX_PAGE_SIZE:
+            raise NotionError(400, 'validation_error', 'body.page_size should be ≤ `100`.')
+        offset = 0
+        if body.get('start_cursor'):
+            try:
+                offset = int(base64.b64decode(body['start_cursor']).decode().split(':', 1)[1])
+            except (ValueError, IndexError):
+                raise NotionError(400, 'validation_error', 'start_cursor is invalid.')
+        chunk = pages[offset:offset + size]
+        more = offset + size < len(pages)
+        return {'object': 'list', 'results': chunk, 'has_more': more, 'type': 'page_or_database',
+                'next_cursor': base64.b64encode(f'offset:{offset + size}'.encode()).decode() if more else None}
+
+    def sort_key(self, page, sort):
+        if 'timestamp' in sort:
+            return page[sort['timestamp']]
+        prop = page['properties'].get(sort.get('property'))
+        if prop is None:
+            raise NotionError(400, 'validation_error', f"Could not find sort property with name or id: {sort.get('property')}")
+        value = prop[prop['type']]
+        if prop['type'] in ('title', 'rich_text'):
+            return plain(value)
+        if prop['type'] == 'date':
+            return (value or {}).get('start') or ''
+        if prop['type'] == 'status':
+            return (value or {}).get('name') or ''
+        return str(value)
+
+    def matches(self, page, condition):
+        if 'and' in condition:
+            return all(self.matches(page, c) for c in condition['and'])
+        if 'or' in condition:
+            return any(self.matches(page, c) for c in condition['or'])
+        if 'timestamp' in condition:
+            kind = condition['timestamp']
+            return compare_date(page[kind], condition[kind])
+        name = condition.get('property')
+        prop = page['properties'].get(name)
+        if prop is None:
+            raise NotionError(400, 'validation_error', f'Could not find property with name or id: {name}')
+        kind = prop['type']
+        value = prop[kind]
+        test = condition.get(kind) or next((condition[k] for k in ('title', 'rich_text', 'select') if k in condition), None)
+        if test is None:
+            raise NotionError(400, 'validation_error', f'body.filter.{kind} should be defined.')
+        if kind in ('title', 'rich_text'):
+            return compare_text(plain(value), test)
+        if kind == 'status':
+            return compare_text((value or {}).get('name') or '', test)
+        if kind == 'multi_select':
+            names = {o['name'] for o in value}
+            if 'contains' in test:
+                return test['contains'] in names
+            if 'does_not_contain' in test:
+                return test['does_not_contain'] not in names
+            return bool(names) if 'is_not_empty' in test else not names if 'is_empty' in test else False
+        if kind == 'date':
+            return compare_date((value or {}).get('start'), test)
+        if kind == 'relation':
+            ids = {r['id'] for r in value}
+            if 'contains' in test:
+                return test['contains'] in ids
+            return bool(ids) if 'is_not_empty' in test else not ids if 'is_empty' in test else False
+        return False
+
+
+def compare_text(text, test):
+    if 'equals' in test:
+        return text == test['equals']
+    if 'does_not_equal' in test:
+        return text != test['does_not_equal']
+    if 'contains' in test:
+        return test['contains'].lower() in text.lower()
+    if 'does_not_contain' in test:
+        return test['does_not_contain'].lower() not in text.lower()
+    if 'starts_with' in test:
+        return text.lower().startswith(test['starts_with'].lower())
+    if 'is_empty' in test:
+        return not text
+    if 'is_not_empty' in test:
+        return bool(text)
+    return False
+
+
+def compare_date(value, test):
+    """Date/timestamp condition on an ISO string (None for an empty date)."""
+    if 'is_empty' in test:
+        return value is None
+    if 'is_not_empty' in test:
+        return value is not None
+    if value is None:
+        return False
+    for op, bound in test.items():
+        left, right = parse_date(value), parse_date(bound)
+        if op == 'equals':
+            return left.date() == right.date()
+        if op == 'before':
+            return left < right
+        if op == 'after':
+            return left > right
+        if op == 'on_or_before':
+            return left <= right
+        if op == 'on_or_after':
+            return left >= right
+    return False
+
+
+def parse_date(value):
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+class Faults:
+    """Injected latency and rate limiting (one limit for all endpoints, like Notion's)."""
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, max_rps=None, retry_after=1, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.max_rps = max_rps
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.window = deque()  # Request times in the last second
+        self.lock = threading.Lock()
+
+    def delay(self):
+        seconds = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def rate_limited(self):
+        """True if this request should get a 429."""
+        with self.lock:
+            if self.error_rate and self.random.random() < self.error_rate:
+                return True
+            if not self.max_rps:
+                return False
+            now = time.monotonic()
+            while self.window and now - self.window[0] >= 1:
+                self.window.popleft()
+            if len(self.window) >= self.max_rps:
+                return True
+            self.window.append(now)
+            return False
+
+
+class Stats:
+    """Per-endpoint counters reported by GET /_stats."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started = time.time()
+            self.endpoints = {}
+
+    def record(self, endpoint, outcome):
+        with self.lock:
+            counts = self.endpoints.setdefault(endpoint, {'calls': 0, 'ok': 0, 'error': 0, 'rate_limited': 0})
+            counts['calls'] += 1
+            counts[outcome] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {'seconds': round(time.time() - self.started, 3),
+                    'endpoints': {name: dict(counts) for name, counts in self.endpoints.items()}}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like api.notion.com
+    server_version = 'FakeNotion/1.0'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def send_body(self, status, body, headers=None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_error_body(self, error, headers=None):
+        self.send_body(error.status, {'object': 'error', 'status': error.status,
+                                      'code': error.code, 'message': error.message}, headers)
+
+    def check_headers(self):
+        auth = self.headers.get('Authorization', '')
+        if not auth.startswith('Bearer ') or (self.server.token and auth[len('Bearer '):] != self.server.token):
+            raise NotionError(401, 'unauthorized', 'API token is invalid.')
+        if not self.headers.get('Notion-Version'):
+            raise NotionError(400, 'missing_version', 'Notion-Version header failed validation.')
+
+    def read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        try:
+            return json.loads(raw) if raw else {}
+        except ValueError:
+            raise NotionError(400, 'invalid_json', 'Error parsing JSON body.')
+
+    def route(self, method, path, body):
+        state = self.server.state
+        match = PAGE_PATH_RE.match(path)
+        if match and method == 'GET':
+            return 'pages.retrieve', lambda: state.page(match.group(1))
+        if match and method == 'PATCH':
+            return 'pages.update', lambda: state.update_page(match.group(1), body)
+        if path == '/v1/pages' and method == 'POST':
+            def create():
+                parent = body.get('parent') or {}
+                state.database(parent.get('database_id') or '')
+                return state.create_page(body.get('properties'))
+            return 'pages.create', create
+        match = DATABASE_PATH_RE.match(path)
+        if match and match.group(2) and method == 'POST':
+            return 'databases.query', lambda: state.query(match.group(1), body)
+        if match and not match.group(2) and method == 'GET':
+            return 'databases.retrieve', lambda: state.database(match.group(1))
+        return 'unknown', None
+
+    def api_call(self, method):
+        server = self.server
+        path = urlsplit(self.path).path
+        try:
+            body = self.read_body()
+        except NotionError as e:
+            return self.send_error_body(e)
+        endpoint, handler = self.route(method, path, body)
+        server.faults.delay()
+        if server.faults.rate_limited():
+            server.stats.record(endpoint, 'rate_limited')
+            return self.send_error_body(NotionError(429, 'rate_limited', 'You have been rate limited.'),
+                                        {'Retry-After': str(server.faults.retry_after)})
+        try:
+            self.check_headers()
+            if handler is None:
+                raise NotionError(400, 'invalid_request_url', 'Invalid request URL.')
+            with server.state.lock:
+                result = handler()
+                data = json.loads(json.dumps(result))  # Snapshot while locked
+        except NotionError as e:
+            server.stats.record(endpoint, 'error')
+            return self.send_error_body(e)
+        server.stats.record(endpoint, 'ok')
+        self.send_body(200, data)
+
+    def do_GET(self):
+        if urlsplit(self.path).path == '/_stats':
+            return self.send_body(200, self.server.stats.snapshot())
+        self.api_call('GET')
+
+    def do_POST(self):
+        if urlsplit(self.path).path == '/_reset':
+            self.server.stats.reset()
+            return self.send_body(200, {'ok': True})
+        self.api_call('POST')
+
+    def do_PATCH(self):
+        self.api_call('PATCH')
+
+
+class FakeNotionServer(ThreadingHTTPServer):
+    """Threaded fake Notion server. Use start()/stop() to run it in-process."""
+
+    daemon_threads = True
+
+    def __init__(self, port=0, host='127.0.0.1', tasks=DEFAULT_TASKS, database_id=DEFAULT_DATABASE_ID,
+                 token=None, faults=None, verbose=False):
+        super().__init__((host, port), Handler)
+        self.state = NotionState(database_id, tasks)
+        self.faults = faults or Faults()
+        self.stats = Stats()
+        self.token = token
+        self.verbose = verbose
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def api_url(self):
+        """Value for NOTION_API_URL."""
+        return self.url + '/v1'
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Run a local fake Notion API with one task database',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port (default: {DEFAULT_PORT})')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--tasks', type=int, default=DEFAULT_TASKS,
+                        help=f'Seeded tasks, edited over the last 90 days (default: {DEFAULT_TASKS})')
+    parser.add_argument('--database', default=DEFAULT_DATABASE_ID,
+                        help=f'Database ID (default: {DEFAULT_DATABASE_ID})')
+    parser.add_argument('--token', help='Only accept this token (default: any Bearer token)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every request')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Extra random 0..N seconds per request')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 429')
+    parser.add_argument('--max-rps', type=float, help='429 once requests exceed this many per second (Notion: 3)')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds on 429 (default: 1)')
+    parser.add_argument('--seed', type=int, help='Random seed for jitter and --error-rate')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Log every request')
+    args = parser.parse_args()
+
+    faults = Faults(args.latency, args.jitter, args.error_rate, args.max_rps, args.retry_after, args.seed)
+    try:
+        server = FakeNotionServer(args.port, args.host, args.tasks, args.database, args.token, faults, args.verbose)
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Fake Notion with {args.tasks:,} tasks on {server.url}")
+    print(f"  export NOTION_API_URL={server.api_url} NOTION_DATABASE_ID={args.database}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped")
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
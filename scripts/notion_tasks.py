@@ -0,0 +1,691 @@
+#!/usr/bin/env python3
+"""
+Notion Tasks - task database client with a local cache and delta sync.
+
+Keeps a SQLite copy of the task database in .cursor/.notion_tasks.db so that
+listing and finding tasks don't query Notion every time. A sync only asks for
+pages whose last_edited_time is on or after the newest one already cached.
+Notion rounds that timestamp to the minute, so the boundary minute is read
+again rather than missed. Results are paged 100 at a time, oldest edit first,
+and the sync point is saved after every page, so an interrupted sync resumes
+where it stopped. Queries never return trashed pages; `sync --full` re-reads
+everything and marks tasks that have disappeared as archived.
+
+All requests share one pooled requests.Session and a token bucket at
+Notion's average limit of 3 requests/second. A 429 pauses every worker for
+its Retry-After and is retried. Bulk creates/updates (JSON lines) run through
+a small thread pool on the same limiter, and every page Notion returns is
+written through to the cache.
+
+Token: NOTION_API_KEY (environment or .cursor/.api_keys.txt). Database:
+--database or NOTION_DATABASE_ID (same places). NOTION_API_URL points the
+client at another endpoint, e.g. scripts/fake_notion.py.
+
+Usage:
+    python scripts/notion_tasks.py sync
+    python scripts/notion_tasks.py list --status Urgent,Present --tag Grant-Apps
+    python scripts/notion_tasks.py list --search grant --due-before 2025-12-31 --json
+    python scripts/notion_tasks.py create --title "🎓 Apply for grant" --status Future \\
+        --due 2025-12-04 --tag Grant-Apps --parent PARENT_PAGE_ID
+    python scripts/notion_tasks.py update --title "Apply for grant" --status Done
+    python scripts/notion_tasks.py bulk tasks.jsonl --workers 3
+    python scripts/notion_tasks.py schema
+
+Bulk lines use the same fields as create:
+    {"title": "🎓 Apply for grant", "status": "Future", "due": "2025-12-04",
+     "tags": ["Grant-Apps"], "details": "...", "parent": "PAGE_ID"}
+A line with "id" updates that task instead; "op": "update" with a "match"
+(or "title") updates the cached task with that title.
+
+Queries sync first unless --no-sync is given.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+WORKSPACE_ROOT = Path(__file__).resolve().parent.parent
+API_KEYS_PATH = WORKSPACE_ROOT / '.cursor' / '.api_keys.txt'
+CACHE_PATH = Path(os.environ.get(
+    'NOTION_TASKS_DB', WORKSPACE_ROOT / '.cursor' / '.notion_tasks.db'
+))
+API_URL = os.environ.get('NOTION_API_URL', 'https://api.notion.com/v1').rstrip('/')
+NOTION_VERSION = '2022-06-28'
+
+RATE = 3.0  # Notion's average request limit per integration (requests/second)
+BURST = 3
+PAGE_SIZE = 100  # Maximum page_size for database queries
+TEXT_CHUNK = 2000  # Maximum characters per rich text object
+TIMEOUT = 60
+MAX_RETRIES = 5
+RETRY_STATUSES = {409, 500, 502, 503, 504}  # conflict_error and transient server errors
+DEFAULT_WORKERS = 3
+COMMIT_EVERY = 50  # Bulk results written to the cache per transaction
+
+# Task fields -> database property names (see .cursor/skills/notion-tasks)
+PROPERTIES = {
+    'title': 'Task name',
+    'status': 'Status',
+    'details': 'Details',
+    'tags': 'Tags',
+    'due': 'Due date',
+    'parent': 'Parent item',
+}
+TASK_FIELDS = ('id', 'title', 'status', 'details', 'tags', 'due', 'parent', 'url',
+               'created_time', 'last_edited_time', 'archived')
+LEADING_SYMBOLS_RE = re.compile(r'^[\W_]+')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    database_id TEXT NOT NULL,
+    title TEXT NOT NULL DEFAULT '',
+    status TEXT,
+    details TEXT,
+    tags TEXT NOT NULL DEFAULT '[]',
+    due TEXT,
+    parent TEXT,
+    url TEXT,
+    created_time TEXT,
+    last_edited_time TEXT,
+    archived INTEGER NOT NULL DEFAULT 0,
+    properties TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_database ON tasks(database_id, archived, status);
+CREATE TABLE IF NOT EXISTS sync_state (
+    database_id TEXT PRIMARY KEY,
+    last_edited_time TEXT,
+    synced_at REAL,
+    full_sync_at REAL
+);
+"""
+
+
+def read_key(name, path=API_KEYS_PATH):
+    """NAME from the environment, else NAME=... from the keys file. None if unset."""
+    if os.environ.get(name):
+        return os.environ[name]
+    try:
+        with open(path) as f:
+            for line in f:
+                if line.startswith(name + '='):
+                    return line.split('=', 1)[1].strip() or None
+    except OSError:
+        pass
+    return None
+
+
+class NotionError(Exception):
+    """A failed API request: HTTP status (0 for connection errors), error code and message."""
+
+    def __init__(self, status, code, message):
+        super().__init__(f"{status} {code}: {message}")
+        self.status = status
+        self.code = code
+
+    @classmethod
+    def from_response(cls, response):
+        try:
+            data = response.json()
+            return cls(response.status_code, data.get('code', 'error'), data.get('message', ''))
+        except ValueError:
+            return cls(response.status_code, 'http_error', response.text[:200])
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, up to `burst` saved."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available. Returns seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds):
+        """Hold all callers back, e.g. for a 429 Retry-After."""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class NotionClient:
+    """Notion API over one pooled session, rate-limited and retried. Thread-safe."""
+
+    def __init__(self, token, base_url=API_URL, rate=RATE, pool_size=DEFAULT_WORKERS * 2):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.requests = requests
+        self.base_url = base_url.rstrip('/')
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Authorization': f'Bearer {token}',
+            'Notion-Version': NOTION_VERSION,
+            'Content-Type': 'application/json',
+        })
+        self.limiter = TokenBucket(rate, BURST)
+        self.stats = {'requests': 0, 'retries': 0, 'rate_limited': 0, 'wait': 0.0}
+        self.lock = threading.Lock()
+
+    def _count(self, **deltas):
+        with self.lock:
+            for key, value in deltas.items():
+                self.stats[key] += value
+
+    def request(self, method, path, body=None):
+        """JSON response of one API call, waiting on the limiter and retrying 429s and transient errors."""
+        for attempt in range(MAX_RETRIES + 1):
+            self._count(requests=1, wait=self.limiter.acquire())
+            try:
+                response = self.session.request(method, self.base_url + path, json=body, timeout=TIMEOUT)
+            except (self.requests.ConnectionError, self.requests.Timeout) as e:
+                error, delay = NotionError(0, 'connection_error', str(e)), min(30, 2 ** attempt)
+            else:
+                if response.ok:
+                    return response.json()
+                error = NotionError.from_response(response)
+                if response.status_code == 429:
+                    try:
+                        retry_after = float(response.headers.get('Retry-After', 1))
+                    except ValueError:
+                        retry_after = 1.0
+                    # Every worker waits it out in acquire(), not just this one
+                    self.limiter.pause(retry_after)
+                    self._count(rate_limited=1)
+                    delay = 0
+                elif response.status_code in RETRY_STATUSES:
+                    delay = min(30, 2 ** attempt)
+                else:
+                    raise error
+            if attempt == MAX_RETRIES:
+                raise error
+            self._count(retries=1)
+            time.sleep(delay)
+
+    def retrieve_database(self, database_id):
+        return self.request('GET', f'/databases/{database_id}')
+
+    def query_database(self, database_id, query_filter=None, sorts=None):
+        """Yield the results of each response page of a query, following next_cursor."""
+        body = {'page_size': PAGE_SIZE}
+        if query_filter:
+            body['filter'] = query_filter
+        if sorts:
+            body['sorts'] = sorts
+        while True:
+            data = self.request('POST', f'/databases/{database_id}/query', body)
+            yield data.get('results', [])
+            if not data.get('has_more') or not data.get('next_cursor'):
+                return
+            body['start_cursor'] = data['next_cursor']
+
+    def create_page(self, database_id, properties):
+        return self.request('POST', '/pages', {'parent': {'database_id': database_id}, 'properties': properties})
+
+    def update_page(self, page_id, properties):
+        return self.request('PATCH', f'/pages/{page_id}', {'properties': properties})
+
+
+# Task fields <-> Notion properties
+
+def text_objects(text):
+    return [{'text': {'content': text[i:i + TEXT_CHUNK]}} for i in range(0, len(text), TEXT_CHUNK)]
+
+
+def plain_text(items):
+    return ''.join(item.get('plain_text') or (item.get('text') or {}).get('content', '') for item in items or [])
+
+
+def task_properties(fields):
+    """Notion property values for the task fields that are set (None leaves a field unchanged)."""
+    props = {}
+    if fields.get('title') is not None:
+        props[PROPERTIES['title']] = {'title': text_objects(fields['title'])}
+    if fields.get('status'):
+        props[PROPERTIES['status']] = {'status': {'name': fields['status']}}
+    if fields.get('details') is not None:
+        props[PROPERTIES['details']] = {'rich_text': text_objects(fields['details'])}
+    if fields.get('tags') is not None:
+        tags = [fields['tags']] if isinstance(fields['tags'], str) else fields['tags']
+        props[PROPERTIES['tags']] = {'multi_select': [{'name': tag} for tag in tags]}
+    if fields.get('due') is not None:  # '' clears the date
+        props[PROPERTIES['due']] = {'date': {'start': fields['due']} if fields['due'] else None}
+    if fields.get('parent') is not None:
+        props[PROPERTIES['parent']] = {'relation': [{'id': fields['parent']}] if fields['parent'] else []}
+    return props
+
+
+def flatten(page):
+    """Task fields of a page object."""
+    props = page.get('properties', {})
+
+    def value(field):
+        prop = props.get(PROPERTIES[field]) or {}
+        return prop.get(prop.get('type'))
+
+    title = value('title')
+    if title is None:  # Renamed title property
+        title = next((p.get('title') for p in props.values() if p.get('type') == 'title'), [])
+    status = value('status') or {}  # status or select
+    due = value('due') or {}
+    parent = value('parent') or []
+    return {
+        'id': page['id'],
+        'title': plain_text(title),
+        'status': status.get('name'),
+        'details': plain_text(value('details')),
+        'tags': [tag['name'] for tag in value('tags') or []],
+        'due': due.get('start'),
+        'parent': parent[0]['id'] if parent else None,
+        'url': page.get('url'),
+        'created_time': page.get('created_time'),
+        'last_edited_time': page.get('last_edited_time'),
+        'archived': bool(page.get('archived') or page.get('in_trash')),
+    }
+
+
+# Cache
+
+def connect(store_path=CACHE_PATH):
+    store_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(store_path))
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def store_page(conn, database_id, page):
+    """Upsert one page into the cache. Returns 'new', 'updated' or 'unchanged'."""
+    task = flatten(page)
+    properties = json.dumps(page.get('properties', {}), sort_keys=True, ensure_ascii=False)
+    old = conn.execute('SELECT last_edited_time, archived, properties FROM tasks WHERE id = ?',
+                       (task['id'],)).fetchone()
+    if old == (task['last_edited_time'], int(task['archived']), properties):
+        return 'unchanged'
+    conn.execute("""
+        INSERT INTO tasks (id, database_id, title, status, details, tags, due, parent, url,
+                           created_time, last_edited_time, archived, properties)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            title = excluded.title, status = excluded.status, details = excluded.details,
+            tags = excluded.tags, due = excluded.due, parent = excluded.parent, url = excluded.url,
+            last_edited_time = excluded.last_edited_time, archived = excluded.archived,
+            properties = excluded.properties
+    """, (task['id'], database_id, task['title'], task['status'], task['details'],
+          json.dumps(task['tags'], ensure_ascii=False), task['due'], task['parent'], task['url'],
+          task['created_time'], task['last_edited_time'], int(task['archived']), properties))
+    return 'updated' if old else 'new'
+
+
+def sync(conn, client, database_id, full=False):
+    """Fetch tasks edited since the last sync (all tasks if full) into the cache."""
+    start = time.time()
+    requests_before = client.stats['requests']
+    state = conn.execute('SELECT last_edited_time FROM sync_state WHERE database_id = ?',
+                         (database_id,)).fetchone()
+    since = None if full or not state else state[0]
+    query_filter = {'timestamp': 'last_edited_time', 'last_edited_time': {'on_or_after': since}} if since else None
+    sorts = [{'timestamp': 'last_edited_time', 'direction': 'ascending'}]
+
+    counts = {'fetched': 0, 'new': 0, 'updated': 0, 'unchanged': 0, 'archived': 0}
+    seen = set()
+    watermark = since
+    for results in client.query_database(database_id, query_filter, sorts):
+        for page in results:
+            counts[store_page(conn, database_id, page)] += 1
+            seen.add(page['id'])
+            watermark = max(watermark or '', page.get('last_edited_time') or '')
+        counts['fetched'] += len(results)
+        # Results are oldest-first, so everything up to the watermark is cached
+        conn.execute("""
+            INSERT INTO sync_state (database_id, last_edited_time, synced_at) VALUES (?, ?, ?)
+            ON CONFLICT(database_id) DO UPDATE SET
+                last_edited_time = excluded.last_edited_time, synced_at = excluded.synced_at
+        """, (database_id, watermark or None, time.time()))
+        conn.commit()
+
+    if full:
+        cached = {row[0] for row in conn.execute(
+            'SELECT id FROM tasks WHERE database_id = ? AND archived = 0', (database_id,))}
+        gone = cached - seen
+        conn.executemany('UPDATE tasks SET archived = 1 WHERE id = ?', [(task_id,) for task_id in gone])
+        counts['archived'] = len(gone)
+        conn.execute("""
+            INSERT INTO sync_state (database_id, synced_at, full_sync_at) VALUES (?, ?, ?)
+            ON CONFLICT(database_id) DO UPDATE SET
+                synced_at = excluded.synced_at, full_sync_at = excluded.full_sync_at
+        """, (database_id, time.time(), time.time()))
+        conn.commit()
+
+    counts['requests'] = client.stats['requests'] - requests_before
+    counts['seconds'] = round(time.time() - start, 2)
+    return counts
+
+
+def row_task(row):
+    task = dict(zip(TASK_FIELDS, row))
+    task['tags'] = json.loads(task['tags'])
+    task['archived'] = bool(task['archived'])
+    return task
+
+
+def list_tasks(conn, database_id, statuses=None, tag=None, search=None, due_before=None,
+               include_done=False, limit=50):
+    """Cached, non-archived tasks, soonest due first."""
+    where, params = ['database_id = ?', 'archived = 0'], [database_id]
+    if statuses:
+        where.append(f"status IN ({','.join('?' * len(statuses))})")
+        params.extend(statuses)
+    elif not include_done:
+        where.append("COALESCE(status, '') != 'Done'")
+    if tag:
+        where.append('EXISTS (SELECT 1 FROM json_each(tasks.tags) WHERE value = ?)')
+        params.append(tag)
+    if search:
+        where.append('(title LIKE ? OR details LIKE ?)')
+        params.extend([f'%{search}%'] * 2)
+    if due_before:
+        where.append('due IS NOT NULL AND due < ?')
+        params.append(due_before)
+    rows = conn.execute(f"""
+        SELECT {', '.join(TASK_FIELDS)} FROM tasks WHERE {' AND '.join(where)}
+        ORDER BY due IS NULL, due, last_edited_time DESC LIMIT ?
+    """, params + [limit])
+    return [row_task(row) for row in rows]
+
+
+def normalize_title(title):
+    """Title without its leading emoji, for matching what the user typed."""
+    return LEADING_SYMBOLS_RE.sub('', title).strip().casefold()
+
+
+def find_task(conn, database_id, title):
+    """The cached task with this title (ignoring a leading emoji and case), else the only one containing it."""
+    rows = [row_task(row) for row in conn.execute(
+        f"SELECT {', '.join(TASK_FIELDS)} FROM tasks WHERE database_id = ? AND archived = 0 AND title LIKE ?",
+        (database_id, f'%{normalize_title(title)}%'))]
+    exact = [task for task in rows if normalize_title(task['title']) == normalize_title(title)]
+    matches = exact or rows
+    if len(matches) == 1:
+        return matches[0]
+    if not matches:
+        raise LookupError(f"No task matching '{title}'")
+    names = ', '.join(f"'{task['title']}'" for task in matches[:5])
+    raise LookupError(f"{len(matches)} tasks match '{title}': {names}{', ...' if len(matches) > 5 else ''}")
+
+
+def bulk_apply(conn, client, database_id, lines, workers=DEFAULT_WORKERS):
+    """Create/update tasks from JSON lines through a rate-limited worker pool."""
+    start = time.time()
+    before = dict(client.stats)
+    jobs, failures = [], []
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+            if not isinstance(item, dict):
+                raise ValueError('not an object')
+        except ValueError as e:
+            failures.append((number, f'invalid JSON: {e}'))
+            continue
+        page_id = item.get('id')
+        op = item.get('op') or ('update' if page_id else 'create')
+        if op not in ('create', 'update'):
+            failures.append((number, f"unknown op '{op}'"))
+            continue
+        if op == 'update' and not page_id:
+            try:
+                page_id = find_task(conn, database_id, item.get('match') or item.get('title') or '')['id']
+            except LookupError as e:
+                failures.append((number, str(e)))
+                continue
+        if op == 'create' and not item.get('title'):
+            failures.append((number, 'create needs a title'))
+            continue
+        if op == 'create':
+            item.setdefault('status', 'Future')
+        jobs.append((number, op, page_id, task_properties(item)))
+
+    counts = {'created': 0, 'updated': 0}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            (pool.submit(client.create_page, database_id, props) if op == 'create'
+             else pool.submit(client.update_page, page_id, props)): (number, op)
+            for number, op, page_id, props in jobs
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            number, op = futures[future]
+            try:
+                page = future.result()
+            except NotionError as e:
+                failures.append((number, str(e)))
+                continue
+            store_page(conn, database_id, page)
+            counts[op + 'd'] += 1
+            if done % COMMIT_EVERY == 0:
+                conn.commit()
+    conn.commit()
+
+    elapsed = time.time() - start
+    return {
+        **counts,
+        'failed': len(failures),
+        'failures': sorted(failures),
+        'requests': client.stats['requests'] - before['requests'],
+        'retries': client.stats['retries'] - before['retries'],
+        'rate_limited': client.stats['rate_limited'] - before['rate_limited'],
+        'wait': round(client.stats['wait'] - before['wait'], 2),
+        'seconds': round(elapsed, 2),
+    }
+
+
+def cache_status(conn):
+    rows = conn.execute("""
+        SELECT t.database_id, COUNT(*), SUM(t.archived), s.last_edited_time, s.synced_at, s.full_sync_at
+        FROM tasks t LEFT JOIN sync_state s ON s.database_id = t.database_id
+        GROUP BY t.database_id
+    """).fetchall()
+    return [{'database_id': r[0], 'tasks': r[1] - (r[2] or 0), 'archived': r[2] or 0, 'last_edited_time': r[3],
+             'synced_at': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(r[4])) if r[4] else None,
+             'full_sync_at': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(r[5])) if r[5] else None}
+            for r in rows]
+
+
+def print_tasks(tasks):
+    if not tasks:
+        print("No tasks.")
+        return
+    for task in tasks:
+        tags = f"  [{', '.join(task['tags'])}]" if task['tags'] else ''
+        print(f"{task['status'] or '-':<8} {task['due'] or '':<10}  {task['title']}{tags}  ({task['id']})")
+
+
+def add_field_arguments(parser):
+    parser.add_argument('--status', help='Status (Future, Urgent, Present, Done)')
+    parser.add_argument('--due', metavar='YYYY-MM-DD', help="Due date ('' clears it)")
+    parser.add_argument('--tag', action='append', dest='tags', metavar='TAG', help='Tag (repeatable)')
+    parser.add_argument('--details', help='Details text')
+    parser.add_argument('--parent', metavar='PAGE_ID', help='Parent task page ID')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Notion task database client with a local cache',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--database', help='Task database ID (default: NOTION_DATABASE_ID)')
+    parser.add_argument('--token', help='Integration token (default: NOTION_API_KEY)')
+    commands = parser.add_subparsers(dest='command', metavar='COMMAND')
+
+    sync_parser = commands.add_parser('sync', help='Fetch tasks edited since the last sync')
+    sync_parser.add_argument('--full', action='store_true', help='Re-read every task and mark removed ones archived')
+
+    list_parser = commands.add_parser('list', help='List cached tasks')
+    list_parser.add_argument('--status', help='Comma-separated statuses (default: all but Done)')
+    list_parser.add_argument('--all', action='store_true', help='Include Done tasks')
+    list_parser.add_argument('--tag', help='Only tasks with this tag')
+    list_parser.add_argument('--search', metavar='TEXT', help='Title or details contain TEXT')
+    list_parser.add_argument('--due-before', metavar='YYYY-MM-DD', help='Only tasks due before this date')
+    list_parser.add_argument('--limit', type=int, default=50, help='Max tasks (default: 50)')
+    list_parser.add_argument('--json', action='store_true', help='Output as JSON')
+    list_parser.add_argument('--no-sync', action='store_true', help='Use the cache without syncing first')
+
+    create_parser = commands.add_parser('create', help='Create a task')
+    create_parser.add_argument('--title', required=True, help='Task title (start it with an emoji)')
+    add_field_arguments(create_parser)
+
+    update_parser = commands.add_parser('update', help='Update a task')
+    target = update_parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--id', help='Task page ID')
+    target.add_argument('--title', help='Title of a cached task (leading emoji and case ignored)')
+    update_parser.add_argument('--new-title', help='Rename the task')
+    add_field_arguments(update_parser)
+
+    bulk_parser = commands.add_parser('bulk', help='Create/update tasks from a JSON-lines file')
+    bulk_parser.add_argument('file', help="JSON-lines file ('-' for stdin)")
+    bulk_parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                             help=f'Concurrent requests (default: {DEFAULT_WORKERS})')
+
+    commands.add_parser('schema', help='Show the database properties')
+    commands.add_parser('status', help='Show what the cache holds')
+
+    args = parser.parse_args()
+    if not args.command:
+        parser.print_help()
+        sys.exit(1)
+
+    conn = connect()
+    if args.command == 'status':
+        rows = cache_status(conn)
+        if not rows:
+            print("Cache is empty. Run: python scripts/notion_tasks.py sync")
+        for r in rows:
+            print(f"{r['database_id']}: {r['tasks']} tasks ({r['archived']} archived), "
+                  f"synced {r['synced_at'] or 'never'}, last full sync {r['full_sync_at'] or 'never'}, "
+                  f"newest edit {r['last_edited_time'] or '-'}")
+        conn.close()
+        return
+
+    database_id = args.database or read_key('NOTION_DATABASE_ID')
+    if not database_id:
+        print("✗ No database ID. Pass --database or set NOTION_DATABASE_ID (environment or .cursor/.api_keys.txt)")
+        sys.exit(1)
+
+    if args.command == 'list' and args.no_sync:
+        client = None
+    else:
+        token = args.token or read_key('NOTION_API_KEY')
+        if not token:
+            print("✗ Set NOTION_API_KEY environment variable or add to .cursor/.api_keys.txt")
+            sys.exit(1)
+        client = NotionClient(token, pool_size=max(DEFAULT_WORKERS, getattr(args, 'workers', 0)) * 2)
+
+    try:
+        if args.command == 'sync':
+            counts = sync(conn, client, database_id, full=args.full)
+            archived = f", {counts['archived']} archived" if args.full else ''
+            print(f"✓ Synced {counts['fetched']} tasks ({counts['new']} new, {counts['updated']} updated{archived}) "
+                  f"in {counts['seconds']}s, {counts['requests']} requests")
+
+        elif args.command == 'list':
+            if client:
+                sync(conn, client, database_id)
+            statuses = [s.strip() for s in args.status.split(',') if s.strip()] if args.status else None
+            tasks = list_tasks(conn, database_id, statuses, args.tag, args.search, args.due_before,
+                               args.all, args.limit)
+            if args.json:
+                print(json.dumps(tasks, indent=2, ensure_ascii=False))
+            else:
+                print_tasks(tasks)
+
+        elif args.command == 'create':
+            fields = {'title': args.title, 'status': args.status or 'Future', 'due': args.due,
+                      'tags': args.tags, 'details': args.details, 'parent': args.parent}
+            page = client.create_page(database_id, task_properties(fields))
+            store_page(conn, database_id, page)
+            conn.commit()
+            print(f"✓ Created '{args.title}': {page.get('url') or page['id']}")
+
+        elif args.command == 'update':
+            page_id = args.id
+            if not page_id:
+                sync(conn, client, database_id)
+                try:
+                    page_id = find_task(conn, database_id, args.title)['id']
+                except LookupError as e:
+                    print(f"✗ {e}")
+                    sys.exit(1)
+            fields = {'title': args.new_title, 'status': args.status, 'due': args.due,
+                      'tags': args.tags, 'details': args.details, 'parent': args.parent}
+            properties = task_properties(fields)
+            if not properties:
+                print("✗ Nothing to update; pass --status, --due, --tag, --details, --parent or --new-title")
+                sys.exit(1)
+            page = client.update_page(page_id, properties)
+            store_page(conn, database_id, page)
+            conn.commit()
+            print(f"✓ Updated '{flatten(page)['title']}'")
+
+        elif args.command == 'bulk':
+            if args.file != '-' and not os.path.exists(args.file):
+                print(f"✗ File not found: {args.file}")
+                sys.exit(1)
+            # Titles are matched against the cache, so bring it up to date first
+            sync(conn, client, database_id)
+            with (sys.stdin if args.file == '-' else open(args.file, encoding='utf-8')) as f:
+                summary = bulk_apply(conn, client, database_id, f, args.workers)
+            for number, error in summary['failures']:
+                print(f"✗ line {number}: {error}")
+            rate = (summary['created'] + summary['updated']) / summary['seconds'] if summary['seconds'] else 0
+            print(f"{'✓' if not summary['failed'] else '✗'} {summary['created']} created, {summary['updated']} updated, "
+                  f"{summary['failed']} failed in {summary['seconds']}s ({rate:.1f}/s); "
+                  f"{summary['requests']} requests, {summary['retries']} retries, "
+                  f"{summary['rate_limited']} rate-limited, {summary['wait']}s limiter wait across workers")
+            if summary['failed']:
+                sys.exit(1)
+
+        elif args.command == 'schema':
+            database = client.retrieve_database(database_id)
+            print(f"{plain_text(database.get('title')) or database_id} ({database.get('id', database_id)})")
+            for name, prop in sorted(database.get('properties', {}).items()):
+                options = (prop.get(prop.get('type')) or {}).get('options')
+                choices = f": {', '.join(o['name'] for o in options)}" if options else ''
+                print(f"  {name:<16} {prop.get('type')}{choices}")
+
+    except NotionError as e:
+        print(f"✗ Notion API error: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
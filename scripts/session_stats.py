@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+"""
+Session Stats - aggregate store of archived session logs for /retro.
+
+Parses every session in sessions/completed/ (the [ID].md log built from
+sessions/SESSION_TEMPLATE.md plus its [ID].json metadata) into a small
+SQLite store: one row per session with the metadata table fields, one row
+per goal checkbox, and one row per friction note (Blockers, "Watch out for"
+handoff notes, and Work Log lines matching the /retro friction keywords).
+Updates are incremental: sessions whose files are unchanged are skipped.
+
+Usage:
+    python scripts/session_stats.py --summary
+    python scripts/session_stats.py --by project --since 2025-11-01
+    python scripts/session_stats.py --by agent --status aborted
+    python scripts/session_stats.py --keywords
+    python scripts/session_stats.py --friction "rate limit" --project my-project
+    python scripts/session_stats.py --sql "SELECT project, COUNT(*) FROM sessions GROUP BY 1"
+
+Queries update the store first unless --no-update is given.
+"""
+
+import os
+import re
+import sys
+import json
+import sqlite3
+import hashlib
+import argparse
+from pathlib import Path
+
+WORKSPACE_ROOT = Path(__file__).resolve().parent.parent
+SESSIONS_DIR = WORKSPACE_ROOT / 'sessions' / 'completed'
+STORE_PATH = Path(os.environ.get(
+    'SESSION_STATS_DB', WORKSPACE_ROOT / '.cursor' / '.session_stats.db'
+))
+
+# Rows of the template's "## Metadata" table
+METADATA_FIELDS = {'agent', 'launch', 'started', 'status', 'project'}
+# Same indicators as the /retro friction scan grep
+FRICTION_RE = re.compile(r'\b(error|fail|stuck|retr(?:y|ie)|clarif|confus|wrong|fix|block|bug)\w*', re.I)
+GROUP_COLUMNS = {
+    'project': 'project',
+    'agent': 'agent',
+    'launch': 'launch',
+    'status': 'status',
+    'month': 'substr(started, 1, 7)',
+    'week': "strftime('%Y-W%W', substr(started, 1, 10))",
+}
+
+HEADING_RE = re.compile(r'^(#{2,3})\s+(.*?)\s*$')
+TABLE_ROW_RE = re.compile(r'^\|\s*([^|]+?)\s*\|\s*([^|]*?)\s*\|\s*$')
+CHECKBOX_RE = re.compile(r'^\s*[-*]\s+\[([ xX])\]\s+(.*)$')
+BULLET_RE = re.compile(r'^\s*[-*]\s+(.*)$')
+PLACEHOLDER_RE = re.compile(r'^(_?none\b.*_?|goal \d+|{{.*}})$', re.I)
+SESSION_DATE_RE = re.compile(r'^(\d{4})(\d{2})(\d{2})-')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    agent TEXT,
+    launch TEXT,
+    started TEXT,
+    ended TEXT,
+    status TEXT,
+    project TEXT,
+    goals_total INTEGER NOT NULL DEFAULT 0,
+    goals_done INTEGER NOT NULL DEFAULT 0,
+    friction_count INTEGER NOT NULL DEFAULT 0,
+    signature TEXT NOT NULL,
+    sha256 TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS goals (
+    session_id TEXT NOT NULL,
+    text TEXT NOT NULL,
+    done INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS friction (
+    session_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    keyword TEXT,
+    context TEXT,
+    line INTEGER,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS goals_session ON goals(session_id);
+CREATE INDEX IF NOT EXISTS friction_session ON friction(session_id);
+CREATE INDEX IF NOT EXISTS friction_keyword ON friction(keyword);
+"""
+
+
+def connect(store_path=STORE_PATH):
+    store_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(store_path))
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def friction_keyword(text):
+    """Normalized friction keyword in a line ('retries' → 'retry'), or None."""
+    match = FRICTION_RE.search(text)
+    if not match:
+        return None
+    word = match.group(1).lower()
+    return {'retrie': 'retry', 'clarif': 'clarify', 'confus': 'confused'}.get(word, word)
+
+
+def is_placeholder(text):
+    return not text or PLACEHOLDER_RE.match(text.strip('_* ')) is not None
+
+
+def parse_session(text):
+    """Extract metadata, goals and friction notes from a session log.
+
+    Returns:
+        (metadata dict, [(goal, done)], [(kind, keyword, context, line, text)])
+    """
+    metadata, goals, friction = {}, [], []
+    section, subsection, handoff_label = '', '', ''
+
+    for number, raw in enumerate(text.splitlines(), 1):
+        line = raw.rstrip()
+        heading = HEADING_RE.match(line)
+        if heading:
+            if len(heading.group(1)) == 2:
+                section, subsection = heading.group(2).lower(), ''
+            else:
+                subsection = heading.group(2)
+            handoff_label = ''
+            continue
+
+        row = TABLE_ROW_RE.match(line)
+        if row and section == 'metadata':
+            key = row.group(1).strip('* ').lower()
+            if key in METADATA_FIELDS and key not in metadata and not is_placeholder(row.group(2)):
+                metadata[key] = row.group(2)
+            continue
+
+        if section == 'session goals':
+            checkbox = CHECKBOX_RE.match(line)
+            if checkbox and not is_placeholder(checkbox.group(2).strip()):
+                goals.append((checkbox.group(2).strip(), checkbox.group(1) != ' '))
+            continue
+
+        bullet = BULLET_RE.match(line)
+        if section == 'blockers':
+            if bullet and not is_placeholder(bullet.group(1).strip()) \
+                    and not bullet.group(1).lower().startswith('none'):
+                note = bullet.group(1).strip()
+                friction.append(('blocker', friction_keyword(note) or 'block', None, number, note))
+        elif section == 'handoff notes':
+            label = re.match(r'^\*\*(.+?)\*\*:?', line)
+            if label:
+                handoff_label = label.group(1).rstrip(':').lower()
+            elif bullet and handoff_label.startswith('watch out') and bullet.group(1).strip():
+                note = bullet.group(1).strip()
+                friction.append(('watch-out', friction_keyword(note), None, number, note))
+        elif section == 'work log' and line.strip():
+            keyword = friction_keyword(line)
+            if keyword:
+                note = bullet.group(1).strip() if bullet else line.strip()
+                friction.append(('work-log', keyword, subsection or None, number, note))
+
+    return metadata, goals, friction
+
+
+def session_date(session_id):
+    """YYYY-MM-DD from a YYYYMMDD-HHMMSS-xxxx session ID, or None."""
+    match = SESSION_DATE_RE.match(session_id)
+    return '-'.join(match.groups()) if match else None
+
+
+def iter_sessions(sessions_dir=SESSIONS_DIR):
+    """Yield (session_id, md_path, json_path or None) for archived sessions."""
+    if not sessions_dir.is_dir():
+        return
+    for md_path in sorted(sessions_dir.glob('*.md')):
+        json_path = md_path.with_suffix('.json')
+        yield md_path.stem, md_path, json_path if json_path.exists() else None
+
+
+def update_store(conn, sessions_dir=SESSIONS_DIR, verbose=False):
+    """Bring the store in line with sessions/completed/.
+
+    A session is re-parsed only if its .md or .json changed (mtime/size),
+    and re-written only if the content hash differs.
+
+    Returns:
+        dict with counts of added, updated, unchanged and removed sessions
+    """
+    stats = {'added': 0, 'updated': 0, 'unchanged': 0, 'removed': 0}
+    known = {row[0]: row[1:] for row in conn.execute('SELECT session_id, signature, sha256 FROM sessions')}
+    seen = set()
+
+    with conn:
+        for session_id, md_path, json_path in iter_sessions(sessions_dir):
+            seen.add(session_id)
+            try:
+                stat_parts = [md_path.stat()] + ([json_path.stat()] if json_path else [])
+            except OSError:
+                continue
+            signature = ';'.join(f'{st.st_mtime_ns}:{st.st_size}' for st in stat_parts)
+            previous = known.get(session_id)
+            if previous and previous[0] == signature:
+                stats['unchanged'] += 1
+                continue
+
+            md_data = md_path.read_bytes()
+            json_data = json_path.read_bytes() if json_path else b''
+            digest = hashlib.sha256(md_data + b'\0' + json_data).hexdigest()
+            if previous and previous[1] == digest:
+                conn.execute('UPDATE sessions SET signature = ? WHERE session_id = ?', (signature, session_id))
+                stats['unchanged'] += 1
+                continue
+
+            metadata, goals, friction = parse_session(md_data.decode('utf-8', errors='replace'))
+            try:
+                meta_json = json.loads(json_data) if json_data else {}
+            except ValueError:
+                meta_json = {}
+            if not isinstance(meta_json, dict):
+                meta_json = {}
+
+            # The .json is updated at /end, so its status wins over the log table
+            row = {
+                'session_id': session_id,
+                'agent': metadata.get('agent'),
+                'launch': meta_json.get('launch') or metadata.get('launch'),
+                'started': meta_json.get('start_time') or metadata.get('started') or session_date(session_id),
+                'ended': meta_json.get('end_time'),
+                'status': (meta_json.get('status') or metadata.get('status') or '').lower() or None,
+                'project': meta_json.get('project') or metadata.get('project'),
+                'goals_total': len(goals),
+                'goals_done': sum(done for _, done in goals),
+                'friction_count': len(friction),
+                'signature': signature,
+                'sha256': digest,
+            }
+            conn.execute('DELETE FROM goals WHERE session_id = ?', (session_id,))
+            conn.execute('DELETE FROM friction WHERE session_id = ?', (session_id,))
+            conn.execute(
+                f"INSERT OR REPLACE INTO sessions ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})",
+                list(row.values())
+            )
+            conn.executemany('INSERT INTO goals (session_id, text, done) VALUES (?, ?, ?)',
+                             [(session_id, goal, int(done)) for goal, done in goals])
+            conn.executemany(
+                'INSERT INTO friction (session_id, kind, keyword, context, line, text) VALUES (?, ?, ?, ?, ?, ?)',
+                [(session_id, *note) for note in friction]
+            )
+            stats['updated' if previous else 'added'] += 1
+            if verbose:
+                print(f"  {'updated' if previous else 'added'}: {session_id}")
+
+        for session_id in set(known) - seen:
+            for table in ('sessions', 'goals', 'friction'):
+                conn.execute(f'DELETE FROM {table} WHERE session_id = ?', (session_id,))
+            stats['removed'] += 1
+            if verbose:
+                print(f"  removed: {session_id}")
+
+    return stats
+
+
+def session_filter(since=None, until=None, project=None, agent=None, status=None, alias='s'):
+    """SQL WHERE clause and params restricting sessions."""
+    clauses, params = [], []
+    if since:
+        clauses.append(f'{alias}.started >= ?')
+        params.append(since)
+    if until:
+        clauses.append(f'{alias}.started < ?')
+        params.append(until)
+    for column, value in (('project', project), ('agent', agent), ('status', status)):
+        if value:
+            clauses.append(f'{alias}.{column} = ?')
+            params.append(value.lower() if column == 'status' else value)
+    return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+
+def summary(conn, **filters):
+    where, params = session_filter(**filters)
+    row = conn.execute(f"""
+        SELECT COUNT(*),
+               SUM(status = 'completed'), SUM(status = 'aborted'), SUM(status NOT IN ('completed', 'aborted')),
+               SUM(goals_done), SUM(goals_total),
+               SUM(friction_count), SUM(friction_count > 0),
+               MIN(started), MAX(started)
+        FROM sessions s{where}
+    """, params).fetchone()
+    keys = ['sessions', 'completed', 'aborted', 'other_status', 'goals_done', 'goals_total',
+            'friction_notes', 'sessions_with_friction', 'first', 'last']
+    result = {k: (v or 0) if k not in ('first', 'last') else v for k, v in zip(keys, row)}
+    result['goal_rate'] = round(result['goals_done'] / result['goals_total'], 3) if result['goals_total'] else None
+    return result
+
+
+def group_by(conn, column, **filters):
+    """Per-group session, outcome, goal and friction counts, most sessions first."""
+    expr = GROUP_COLUMNS[column]
+    where, params = session_filter(**filters)
+    rows = conn.execute(f"""
+        SELECT COALESCE({expr}, '(none)') AS grp, COUNT(*),
+               SUM(status = 'completed'), SUM(status = 'aborted'),
+               SUM(goals_done), SUM(goals_total), SUM(friction_count)
+        FROM sessions s{where}
+        GROUP BY grp ORDER BY COUNT(*) DESC, grp
+    """, params).fetchall()
+    return [
+        {'group': grp, 'sessions': n, 'completed': done or 0, 'aborted': aborted or 0,
+         'goal_rate': round(g_done / g_total, 3) if g_total else None,
+         'friction_per_session': round((friction or 0) / n, 2)}
+        for grp, n, done, aborted, g_done, g_total, friction in rows
+    ]
+
+
+def keyword_counts(conn, **filters):
+    """Friction notes per keyword and kind, across matching sessions."""
+    where, params = session_filter(**filters)
+    rows = conn.execute(f"""
+        SELECT COALESCE(f.keyword, '(other)'), f.kind, COUNT(*), COUNT(DISTINCT f.session_id)
+        FROM friction f JOIN sessions s USING (session_id){where}
+        GROUP BY 1, 2 ORDER BY 3 DESC, 1
+    """, params).fetchall()
+    return [{'keyword': k, 'kind': kind, 'notes': n, 'sessions': s} for k, kind, n, s in rows]
+
+
+def friction_notes(conn, pattern=None, kind=None, limit=50, **filters):
+    """Friction notes, newest sessions first, optionally containing `pattern`."""
+    where, params = session_filter(**filters)
+    clauses = [where[len(' WHERE '):]] if where else []
+    if pattern:
+        clauses.append('f.text LIKE ?')
+        params.append(f'%{pattern}%')
+    if kind:
+        clauses.append('f.kind = ?')
+        params.append(kind)
+    sql = """
+        SELECT f.session_id, s.project, f.kind, f.keyword, f.context, f.line, f.text
+        FROM friction f JOIN sessions s USING (session_id)
+    """
+    if clauses:
+        sql += ' WHERE ' + ' AND '.join(clauses)
+    sql += ' ORDER BY s.started DESC, f.session_id DESC, f.line LIMIT ?'
+    params.append(limit)
+    keys = ['session_id', 'project', 'kind', 'keyword', 'context', 'line', 'text']
+    return [dict(zip(keys, row)) for row in conn.execute(sql, params)]
+
+
+def print_table(rows):
+    """Print dict rows as aligned columns."""
+    if not rows:
+        print("No matching sessions.")
+        return
+    headers = list(rows[0])
+    cells = [[('' if r[h] is None else str(r[h])) for h in headers] for r in rows]
+    widths = [max(len(h), *(len(c[i]) for c in cells)) for i, h in enumerate(headers)]
+    print('  '.join(h.ljust(w) for h, w in zip(headers, widths)))
+    print('  '.join('-' * w for w in widths))
+    for c in cells:
+        print('  '.join(v.ljust(w) for v, w in zip(c, widths)))
+
+
+def emit(rows, as_json=False):
+    if as_json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print_table(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Aggregate archived session logs for retrospectives',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--update', action='store_true', help='Update the store incrementally')
+    parser.add_argument('--rebuild', action='store_true', help='Drop and rebuild the store')
+    parser.add_argument('--summary', action='store_true', help='Overall session, goal and friction totals')
+    parser.add_argument('--by', choices=sorted(GROUP_COLUMNS), help='Aggregate per project/agent/launch/status/month/week')
+    parser.add_argument('--keywords', action='store_true', help='Friction notes per keyword')
+    parser.add_argument('--friction', nargs='?', const='', metavar='TEXT', help='List friction notes (optionally containing TEXT)')
+    parser.add_argument('--kind', choices=['blocker', 'watch-out', 'work-log'], help='Only this kind of friction note')
+    parser.add_argument('--sql', metavar='QUERY', help='Run a read-only SQL query (tables: sessions, goals, friction)')
+    parser.add_argument('--since', metavar='YYYY-MM-DD', help='Sessions started on or after this date')
+    parser.add_argument('--until', metavar='YYYY-MM-DD', help='Sessions started before this date')
+    parser.add_argument('--project', help='Only this project')
+    parser.add_argument('--agent', help='Only this agent')
+    parser.add_argument('--status', help='Only this status (completed, aborted, ...)')
+    parser.add_argument('--limit', type=int, default=50, help='Max friction notes to list (default: 50)')
+    parser.add_argument('--json', action='store_true', help='Output results as JSON')
+    parser.add_argument('--no-update', action='store_true', help='Query without updating first')
+    parser.add_argument('--verbose', '-v', action='store_true', help='List changed sessions during update')
+
+    args = parser.parse_args()
+
+    querying = args.summary or args.by or args.keywords or args.friction is not None or args.sql
+    if not (args.update or args.rebuild or querying):
+        parser.print_help()
+        sys.exit(1)
+
+    if args.rebuild and STORE_PATH.exists():
+        STORE_PATH.unlink()
+
+    conn = connect()
+
+    if args.update or args.rebuild or not args.no_update:
+        stats = update_store(conn, verbose=args.verbose)
+        if not querying:
+            print(f"✓ Store updated: {stats['added']} added, {stats['updated']} updated, "
+                  f"{stats['removed']} removed, {stats['unchanged']} unchanged")
+
+    filters = {'since': args.since, 'until': args.until, 'project': args.project,
+               'agent': args.agent, 'status': args.status}
+
+    if args.summary:
+        result = summary(conn, **filters)
+        if args.json:
+            print(json.dumps(result, indent=2))
+        else:
+            rate = f"{result['goal_rate']:.0%}" if result['goal_rate'] is not None else 'n/a'
+            print(f"{result['sessions']} sessions ({result['first'] or '-'} → {result['last'] or '-'})")
+            print(f"  completed {result['completed']}, aborted {result['aborted']}, other {result['other_status']}")
+            print(f"  goals {result['goals_done']}/{result['goals_total']} done ({rate})")
+            print(f"  {result['friction_notes']} friction notes in {result['sessions_with_friction']} sessions")
+
+    if args.by:
+        rows = group_by(conn, args.by, **filters)
+        emit(rows, args.json)
+
+    if args.keywords:
+        rows = keyword_counts(conn, **filters)
+        emit(rows, args.json)
+
+    if args.friction is not None:
+        rows = friction_notes(conn, args.friction or None, args.kind, args.limit, **filters)
+        if args.json:
+            print(json.dumps(rows, indent=2))
+        elif not rows:
+            print("No friction notes.")
+        else:
+            for r in rows:
+                context = f" ({r['context']})" if r['context'] else ''
+                print(f"{r['session_id']} [{r['project'] or '-'}] {r['kind']}{context}: {r['text']}")
+
+    if args.sql:
+        ro = sqlite3.connect(f'file:{STORE_PATH}?mode=ro', uri=True)
+        try:
+            cursor = ro.execute(args.sql)
+        except sqlite3.Error as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        headers = [d[0] for d in cursor.description or []]
+        rows = [dict(zip(headers, row)) for row in cursor.fetchall()]
+        ro.close()
+        emit(rows, args.json)
+
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+"""
+Batch Task Verifier - process status, log tail and output coverage in one report.
+
+Implements the batch-task-verification skill's phases without loading whole
+files: the job process is found from /proc (or `ps`), logs are tailed by
+seeking backwards from the end, and JSONL/CSV outputs are streamed record by
+record to count populated fields against a target. Each output also yields a
+small random sample (reservoir sampling) for the sample-quality check.
+Several outputs are checked in parallel.
+
+Usage:
+    python scripts/verify_batch.py --process extract_fields.py --log run.log \\
+        --output data/extracted.jsonl --fields summary,keywords --target 1261
+    python scripts/verify_batch.py --output a.jsonl --output b.csv --fields title,abstract --threshold 1.0
+    python scripts/verify_batch.py --output out.jsonl --fields embedding --id-field id --json
+    python scripts/verify_batch.py --output out.jsonl --fields summary --markdown
+
+Fields may be dotted paths into JSON objects (e.g. meta.author). A field
+counts as populated unless it is missing, null, blank, an empty list/dict,
+or an all-zero numeric vector (a failed embedding).
+
+Exit status is 0 when every check passes, 1 otherwise.
+"""
+
+import os
+import re
+import io
+import sys
+import csv
+import json
+import gzip
+import time
+import random
+import argparse
+import subprocess
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+DEFAULT_THRESHOLD = 0.95
+DEFAULT_TAIL_LINES = 50
+DEFAULT_SAMPLES = 5
+TAIL_BLOCK_SIZE = 64 * 1024
+MAX_TAIL_BYTES = 1024 * 1024  # Cap for logs with very long lines
+
+COMPLETE_RE = re.compile(r'\b(complete[d]?|finished|done|all \d+ .*processed)\b', re.I)
+ERROR_RE = re.compile(r'\b(error|exception|traceback|failed|fatal)\b', re.I)
+COUNT_RE = re.compile(r'\b(\d[\d,]*)\s*/\s*(\d[\d,]*)\b')
+
+csv.field_size_limit(sys.maxsize)
+
+
+# --- Phase 1: process and log ---
+
+def find_processes(pattern):
+    """Running processes whose command line contains `pattern` (regex).
+
+    Returns:
+        list of {'pid', 'elapsed_s', 'cmdline'} dicts
+    """
+    regex = re.compile(pattern)
+    # Skip this process and the shell that launched it (its command line contains the pattern too)
+    exclude = {os.getpid(), os.getppid()}
+    found = []
+    proc = Path('/proc')
+    if proc.is_dir():
+        try:
+            uptime = float((proc / 'uptime').read_text().split()[0])
+            ticks = os.sysconf('SC_CLK_TCK')
+        except (OSError, ValueError):
+            uptime, ticks = None, None
+        for entry in proc.iterdir():
+            if not entry.name.isdigit() or int(entry.name) in exclude:
+                continue
+            try:
+                cmdline = (entry / 'cmdline').read_bytes().replace(b'\0', b' ').decode(errors='replace').strip()
+                if not cmdline or not regex.search(cmdline):
+                    continue
+                elapsed = None
+                if uptime is not None:
+                    # Field 22 of /proc/<pid>/stat is start time in clock ticks after boot
+                    stat = (entry / 'stat').read_text()
+                    start_ticks = int(stat.rsplit(')', 1)[1].split()[19])
+                    elapsed = round(uptime - start_ticks / ticks)
+            except (OSError, ValueError, IndexError):
+                continue
+            found.append({'pid': int(entry.name), 'elapsed_s': elapsed, 'cmdline': cmdline})
+        return sorted(found, key=lambda p: p['pid'])
+
+    try:
+        output = subprocess.run(['ps', '-axo', 'pid=,etime=,command='],
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return []
+    for line in output.splitlines():
+        parts = line.split(None, 2)
+        if len(parts) == 3 and int(parts[0]) not in exclude and regex.search(parts[2]):
+            found.append({'pid': int(parts[0]), 'elapsed_s': parse_etime(parts[1]), 'cmdline': parts[2]})
+    return found
+
+
+def parse_etime(etime):
+    """Seconds from ps etime ([[dd-]hh:]mm:ss)."""
+    days, _, rest = etime.rpartition('-')
+    seconds = 0
+    for part in rest.split(':'):
+        seconds = seconds * 60 + int(part)
+    return seconds + int(days or 0) * 86400
+
+
+def tail_lines(path, count=DEFAULT_TAIL_LINES, block_size=TAIL_BLOCK_SIZE, max_bytes=MAX_TAIL_BYTES):
+    """Last `count` lines of a file, reading backwards in blocks from the end.
+
+    A bare \\r counts as a line break, so progress-bar logs (tqdm) end in their
+    latest update. At most `max_bytes` are read.
+    """
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        blocks = []
+        breaks = scanned = 0
+        while position > 0 and breaks <= count and scanned < max_bytes:
+            step = min(block_size, position, max_bytes - scanned)
+            position -= step
+            scanned += step
+            f.seek(position)
+            block = f.read(step)
+            breaks += block.count(b'\n') + block.count(b'\r') - block.count(b'\r\n')
+            if block.endswith(b'\r') and blocks and blocks[-1].startswith(b'\n'):
+                breaks -= 1  # \r\n split across blocks
+            blocks.append(block)
+    data = b''.join(reversed(blocks))
+    lines = data.decode('utf-8', errors='replace').splitlines()
+    return lines[-count:]
+
+
+def check_log(path, count=DEFAULT_TAIL_LINES):
+    """Completion marker, last count summary and error lines from a log tail."""
+    try:
+        st = os.stat(path)
+        lines = tail_lines(path, count)
+    except OSError as e:
+        return {'path': str(path), 'error': str(e)}
+    completion = next((l for l in reversed(lines) if COMPLETE_RE.search(l)), None)
+    counts = next((m.groups() for l in reversed(lines) for m in [COUNT_RE.search(l)] if m), None)
+    return {
+        'path': str(path),
+        'modified_s_ago': round(time.time() - st.st_mtime),
+        'completion_line': completion,
+        'last_count': [int(n.replace(',', '')) for n in counts] if counts else None,
+        'error_lines': [l for l in lines if ERROR_RE.search(l)],
+        'tail': lines,
+    }
+
+
+# --- Phase 2/4: streaming coverage and samples ---
+
+def open_text(path):
+    """Open a (possibly gzipped) output file for streaming text reads."""
+    if str(path).endswith('.gz'):
+        return io.TextIOWrapper(gzip.open(path, 'rb'), encoding='utf-8', errors='replace', newline='')
+    return open(path, 'r', encoding='utf-8', errors='replace', newline='')
+
+
+def detect_format(path):
+    name = str(path).lower().removesuffix('.gz')
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith('.tsv'):
+        return 'tsv'
+    return 'jsonl'
+
+
+def iter_records(path, fmt):
+    """Yield (record or None, line number) - None marks an unparseable line."""
+    with open_text(path) as f:
+        if fmt in ('csv', 'tsv'):
+            reader = csv.DictReader(f, delimiter='\t' if fmt == 'tsv' else ',')
+            for record in reader:
+                yield record, reader.line_num
+            return
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield None, number
+                continue
+            yield (record if isinstance(record, dict) else None), number
+
+
+def get_field(record, field):
+    """Value at a dotted path, or None."""
+    value = record
+    for key in field.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def is_populated(value):
+    if value is None:
+        return False
+    if isinstance(value, str):
+        return bool(value.strip())
+    if isinstance(value, (list, dict)):
+        if not value:
+            return False
+        if isinstance(value, list) and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in value):
+            return any(v != 0 for v in value)
+    return True
+
+
+def truncate(value, limit=200):
+    text = value if isinstance(value, str) else json.dumps(value, default=str)
+    return text if len(text) <= limit else text[:limit] + '…'
+
+
+def check_output(path, fields, target=None, threshold=DEFAULT_THRESHOLD,
+                 samples=DEFAULT_SAMPLES, id_field=None, seed=42):
+    """Stream one output file and measure per-field coverage.
+
+    Memory stays constant in the file size apart from `id_field`, which keeps
+    the set of IDs seen in order to report duplicates.
+
+    Returns:
+        report dict for the file, including 'passed'
+    """
+    started = time.monotonic()
+    fmt = detect_format(path)
+    rng = random.Random(seed)
+    populated = dict.fromkeys(fields, 0)
+    records, bad_lines, first_bad = 0, 0, []
+    reservoir = []
+    ids, duplicates = set(), 0
+
+    try:
+        for record, number in iter_records(path, fmt):
+            if record is None:
+                bad_lines += 1
+                if len(first_bad) < 5:
+                    first_bad.append(number)
+                continue
+            records += 1
+            for field in fields:
+                if is_populated(get_field(record, field)):
+                    populated[field] += 1
+            if id_field:
+                key = get_field(record, id_field)
+                if key is not None:
+                    key = json.dumps(key, sort_keys=True) if isinstance(key, (dict, list)) else key
+                    if key in ids:
+                        duplicates += 1
+                    else:
+                        ids.add(key)
+            # Reservoir sampling keeps a uniform sample without holding the file
+            if len(reservoir) < samples:
+                reservoir.append((number, record))
+            else:
+                slot = rng.randrange(records)
+                if slot < samples:
+                    reservoir[slot] = (number, record)
+    except (OSError, csv.Error, EOFError, gzip.BadGzipFile) as e:
+        return {'path': str(path), 'format': fmt, 'error': str(e), 'passed': False}
+
+    denominator = target or records
+    coverage = {
+        field: {
+            'populated': count,
+            'of': denominator,
+            'ratio': round(count / denominator, 4) if denominator else 0.0,
+        }
+        for field, count in populated.items()
+    }
+    problems = []
+    if records == 0:
+        problems.append('no records')
+    if target and records < target:
+        problems.append(f'{records}/{target} records')
+    problems += [f"{field} {c['ratio']:.1%} < {threshold:.0%}" for field, c in coverage.items()
+                 if c['ratio'] < threshold]
+    if bad_lines:
+        problems.append(f'{bad_lines} unparseable lines')
+    if duplicates:
+        problems.append(f'{duplicates} duplicate {id_field} values')
+
+    # Samples show the checked fields (plus the ID); all fields if none were given
+    shown = {f.split('.')[0] for f in fields} | ({id_field.split('.')[0]} if id_field else set())
+    return {
+        'path': str(path),
+        'format': fmt,
+        'records': records,
+        'target': target,
+        'coverage': coverage,
+        'bad_lines': bad_lines,
+        'first_bad_lines': first_bad,
+        'duplicates': duplicates if id_field else None,
+        'samples': [
+            {'line': number, **{k: truncate(v) for k, v in record.items() if not fields or k in shown}}
+            for number, record in sorted(reservoir, key=lambda item: item[0])
+        ],
+        'problems': problems,
+        'passed': not problems,
+        'seconds': round(time.monotonic() - started, 2),
+    }
+
+
+# --- Report ---
+
+def verify(process=None, logs=(), outputs=(), fields=(), target=None, threshold=DEFAULT_THRESHOLD,
+           samples=DEFAULT_SAMPLES, id_field=None, tail=DEFAULT_TAIL_LINES, workers=None):
+    """Run every requested check and return the combined report."""
+    report = {'checked_at': datetime.now().astimezone().isoformat(timespec='seconds')}
+    problems = []
+
+    if process:
+        running = find_processes(process)
+        report['process'] = {'pattern': process, 'running': running}
+        if running:
+            problems.append(f'process still running (pid {", ".join(str(p["pid"]) for p in running)})')
+
+    if logs:
+        report['logs'] = [check_log(path, tail) for path in logs]
+        for log in report['logs']:
+            if 'error' in log:
+                problems.append(f"log {log['path']}: {log['error']}")
+            elif not log['completion_line'] and not report.get('process', {}).get('running'):
+                problems.append(f"log {log['path']}: no completion message in last {tail} lines")
+
+    if outputs:
+        workers = workers or min(len(outputs), os.cpu_count() or 1)
+        args = [(path, list(fields), target, threshold, samples, id_field) for path in outputs]
+        if workers > 1 and len(outputs) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                report['outputs'] = list(pool.map(_check_output_args, args))
+        else:
+            report['outputs'] = [check_output(*a) for a in args]
+        for output in report['outputs']:
+            if 'error' in output:
+                problems.append(f"{output['path']}: {output['error']}")
+            problems += [f"{output['path']}: {p}" for p in output.get('problems', [])]
+
+    report['problems'] = problems
+    report['verdict'] = 'VERIFIED COMPLETE' if not problems else 'NEEDS WORK'
+    return report
+
+
+def _check_output_args(args):
+    return check_output(*args)
+
+
+def print_report(report, show_tail=False):
+    print(f"Batch verification ({report['checked_at']})")
+
+    if 'process' in report:
+        running = report['process']['running']
+        print(f"\nProcess /{report['process']['pattern']}/: {'RUNNING' if running else 'not running'}")
+        for p in running:
+            elapsed = f"{p['elapsed_s'] // 60}m" if p['elapsed_s'] is not None else '?'
+            print(f"  pid {p['pid']} ({elapsed}): {p['cmdline'][:120]}")
+
+    for log in report.get('logs', []):
+        print(f"\nLog {log['path']}:")
+        if 'error' in log:
+            print(f"  ✗ {log['error']}")
+            continue
+        print(f"  modified {log['modified_s_ago']}s ago")
+        print(f"  completion: {log['completion_line'] or '(none found)'}")
+        if log['last_count']:
+            print(f"  last count: {log['last_count'][0]}/{log['last_count'][1]}")
+        print(f"  error lines in tail: {len(log['error_lines'])}")
+        for line in log['error_lines'][-5:]:
+            print(f"    {line[:160]}")
+        if show_tail:
+            print('  --- tail ---')
+            for line in log['tail']:
+                print(f"  {line}")
+
+    for output in report.get('outputs', []):
+        mark = '✓' if output['passed'] else '✗'
+        print(f"\n{mark} {output['path']} ({output.get('format')})")
+        if 'error' in output:
+            print(f"  {output['error']}")
+            continue
+        target = f"/{output['target']}" if output['target'] else ''
+        print(f"  records: {output['records']}{target} in {output['seconds']}s")
+        for field, c in output['coverage'].items():
+            print(f"  {field}: {c['populated']}/{c['of']} ({c['ratio']:.1%})")
+        if output['bad_lines']:
+            print(f"  unparseable lines: {output['bad_lines']} (first: {output['first_bad_lines']})")
+        if output['duplicates']:
+            print(f"  duplicate IDs: {output['duplicates']}")
+        for sample in output['samples']:
+            print(f"  sample line {sample['line']}:")
+            for key, value in sample.items():
+                if key != 'line':
+                    print(f"    {key}: {value}")
+
+    print(f"\nVerdict: {report['verdict']}")
+    for problem in report['problems']:
+        print(f"  - {problem}")
+
+
+def markdown_report(report):
+    """Filled-in handoff template from the batch-task-verification skill."""
+    outputs = report.get('outputs', [])
+    running = report.get('process', {}).get('running')
+    coverage = '; '.join(
+        f"{Path(o['path']).name} {field} {c['populated']}/{c['of']} ({c['ratio']:.1%})"
+        for o in outputs for field, c in o.get('coverage', {}).items()
+    ) or 'n/a'
+    errors = sum(len(l.get('error_lines', [])) for l in report.get('logs', [])) \
+        + sum(o.get('bad_lines', 0) for o in outputs)
+    lines = [
+        '### Task X.Y Verification',
+        '',
+        '**Verified by**: [session_id]',
+        f"**Date**: {report['checked_at'][:10]}",
+        '',
+        f"**Process status**: {'Still running' if running else 'Complete'}",
+        f"**Coverage**: {coverage}",
+        '**Functional tests**: [PASS/FAIL]',
+        f"**Sample quality**: [PASS/FAIL] ({sum(len(o.get('samples', [])) for o in outputs)} records sampled)",
+        f"**Errors**: {errors}",
+        '',
+        f"**Verdict**: {report['verdict']}",
+    ]
+    if report['problems']:
+        lines.append('**Next steps**: ' + '; '.join(report['problems']))
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Verify a long-running batch task: process, log tail and output coverage',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--process', '-p', metavar='PATTERN', help='Regex matched against running command lines')
+    parser.add_argument('--log', '-l', action='append', default=[], metavar='PATH', help='Log file to tail (repeatable)')
+    parser.add_argument('--output', '-o', action='append', default=[], metavar='PATH',
+                        help='JSONL/CSV/TSV output, optionally .gz (repeatable)')
+    parser.add_argument('--fields', '-f', default='', help='Comma-separated fields that must be populated')
+    parser.add_argument('--target', '-t', type=int, help='Expected record count (default: records found)')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Minimum populated ratio per field (default: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--id-field', help='Report duplicate values of this field')
+    parser.add_argument('--samples', type=int, default=DEFAULT_SAMPLES, help=f'Records to sample (default: {DEFAULT_SAMPLES})')
+    parser.add_argument('--tail', type=int, default=DEFAULT_TAIL_LINES, help=f'Log lines to read (default: {DEFAULT_TAIL_LINES})')
+    parser.add_argument('--show-tail', action='store_true', help='Print the log tail')
+    parser.add_argument('--workers', type=int, help='Outputs checked in parallel (default: CPU count)')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    parser.add_argument('--markdown', action='store_true', help='Print the handoff template filled in')
+
+    args = parser.parse_args()
+
+    if not (args.process or args.log or args.output):
+        parser.print_help()
+        sys.exit(1)
+
+    fields = [f.strip() for f in args.fields.split(',') if f.strip()]
+    report = verify(args.process, args.log, args.output, fields, args.target, args.threshold,
+                    args.samples, args.id_field, args.tail, args.workers)
+
+    if args.json:
+        print(json.dumps(report, indent=2, default=str))
+    elif args.markdown:
+        print(markdown_report(report))
+    else:
+        print_report(report, args.show_tail)
+
+    sys.exit(0 if not report['problems'] else 1)
+
+
+if __name__ == '__main__':
+    main()
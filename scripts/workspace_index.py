@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Workspace Full-Text Index - ranked section search for context loading.
+
+Builds a SQLite FTS5 index over the workspace's writing and project trees,
+one row per markdown section, so agents can find prior work with one query
+instead of grepping and opening many files. Updates are incremental: files
+whose mtime/size are unchanged are skipped, and files whose content hash is
+unchanged are not re-chunked.
+
+Usage:
+    python scripts/workspace_index.py --update
+    python scripts/workspace_index.py --search "grant budget justification"
+    python scripts/workspace_index.py --search "alignment evals" -k 3 --show
+    python scripts/workspace_index.py --search 'title:"risk" NEAR(model audit)' --raw
+    python scripts/workspace_index.py --stats
+
+Searching updates the index first unless --no-update is given.
+"""
+
+import os
+import re
+import sys
+import json
+import sqlite3
+import hashlib
+import argparse
+from pathlib import Path
+
+WORKSPACE_ROOT = Path(__file__).resolve().parent.parent
+INDEX_PATH = Path(os.environ.get(
+    'WORKSPACE_INDEX', WORKSPACE_ROOT / '.cursor' / '.workspace_index.db'
+))
+
+# Trees searched by the context-loading skill
+INDEXED_DIRS = ['projects', 'side-projects', 'corpus', 'publications', 'research-essays', 'grants', 'sessions']
+INDEXED_SUFFIXES = {'.md', '.markdown', '.txt'}
+MAX_CHUNK_CHARS = 4000  # Longer sections are split on paragraph breaks
+DEFAULT_TOP_K = 5
+
+HEADING_RE = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+FENCE_RE = re.compile(r'^ {0,3}(`{3,}|~{3,})')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS sections USING fts5(
+    path UNINDEXED,
+    title,
+    body,
+    line UNINDEXED,
+    tokenize = 'porter unicode61'
+);
+"""
+
+
+def connect(index_path=INDEX_PATH):
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(index_path))
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def split_sections(text):
+    """Split markdown into (title, body, start_line) chunks by heading.
+
+    The title is the heading path (e.g. "Project > Goals"), so a hit on a
+    subsection still shows where it lives. Text before the first heading
+    becomes an untitled chunk.
+    """
+    chunks = []
+    stack = []  # (level, heading text)
+    title, lines, start = '', [], 1
+    fence = None  # Opening fence of the code block we're in; '#' lines there aren't headings
+
+    def flush():
+        body = '\n'.join(lines).strip()
+        if body or title:
+            chunks.extend(split_long(title, body, start))
+
+    for number, line in enumerate(text.splitlines(), 1):
+        fence_match = FENCE_RE.match(line)
+        if fence_match:
+            marker = fence_match.group(1)
+            if fence is None:
+                fence = marker
+            elif marker[0] == fence[0] and len(marker) >= len(fence) and not line.strip()[len(marker):].strip():
+                fence = None
+        match = HEADING_RE.match(line) if fence is None and not fence_match else None
+        if match:
+            flush()
+            level = len(match.group(1))
+            while stack and stack[-1][0] >= level:
+                stack.pop()
+            stack.append((level, match.group(2)))
+            title = ' > '.join(h for _, h in stack)
+            lines, start = [], number
+        else:
+            lines.append(line)
+    flush()
+    return chunks
+
+
+def split_long(title, body, start):
+    """Split an oversized section on blank lines into MAX_CHUNK_CHARS pieces."""
+    if len(body) <= MAX_CHUNK_CHARS:
+        return [(title, body, start)]
+    pieces, current, current_start, line = [], [], start, start
+    for paragraph in re.split(r'(\n\s*\n)', body):
+        if current and sum(map(len, current)) + len(paragraph) > MAX_CHUNK_CHARS:
+            pieces.append((title, ''.join(current).strip(), current_start))
+            current, current_start = [], line
+        current.append(paragraph)
+        line += paragraph.count('\n')
+    if current:
+        pieces.append((title, ''.join(current).strip(), current_start))
+    return [p for p in pieces if p[1]]
+
+
+def iter_files(root=WORKSPACE_ROOT):
+    """Yield indexable files under the indexed trees, skipping hidden dirs."""
+    for directory in INDEXED_DIRS:
+        base = root / directory
+        if not base.is_dir():
+            continue
+        for dirpath, dirnames, filenames in os.walk(base):
+            dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+            for filename in filenames:
+                path = Path(dirpath) / filename
+                if path.suffix.lower() in INDEXED_SUFFIXES:
+                    yield path
+
+
+def update_index(conn, root=WORKSPACE_ROOT, verbose=False):
+    """Bring the index in line with the workspace.
+
+    Returns:
+        dict with counts of added, updated, unchanged and removed files
+    """
+    stats = {'added': 0, 'updated': 0, 'unchanged': 0, 'removed': 0}
+    known = {row[0]: row[1:] for row in conn.execute('SELECT path, mtime_ns, size, sha256 FROM files')}
+    seen = set()
+
+    with conn:
+        for path in iter_files(root):
+            rel = path.relative_to(root).as_posix()
+            seen.add(rel)
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            previous = known.get(rel)
+            if previous and previous[0] == st.st_mtime_ns and previous[1] == st.st_size:
+                stats['unchanged'] += 1
+                continue
+
+            data = path.read_bytes()
+            digest = hashlib.sha256(data).hexdigest()
+            if previous and previous[2] == digest:
+                # Touched but not edited - just refresh the stat
+                conn.execute('UPDATE files SET mtime_ns = ?, size = ? WHERE path = ?',
+                             (st.st_mtime_ns, st.st_size, rel))
+                stats['unchanged'] += 1
+                continue
+
+            text = data.decode('utf-8', errors='replace')
+            conn.execute('DELETE FROM sections WHERE path = ?', (rel,))
+            conn.executemany(
+                'INSERT INTO sections (path, title, body, line) VALUES (?, ?, ?, ?)',
+                [(rel, title, body, line) for title, body, line in split_sections(text)]
+            )
+            conn.execute('INSERT OR REPLACE INTO files (path, mtime_ns, size, sha256) VALUES (?, ?, ?, ?)',
+                         (rel, st.st_mtime_ns, st.st_size, digest))
+            stats['updated' if previous else 'added'] += 1
+            if verbose:
+                print(f"  {'updated' if previous else 'added'}: {rel}")
+
+        for rel in set(known) - seen:
+            conn.execute('DELETE FROM sections WHERE path = ?', (rel,))
+            conn.execute('DELETE FROM files WHERE path = ?', (rel,))
+            stats['removed'] += 1
+            if verbose:
+                print(f"  removed: {rel}")
+
+    return stats
+
+
+def to_fts_query(text):
+    """Turn plain search words into an FTS5 query (all terms, any order)."""
+    terms = re.findall(r'\w+', text)
+    return ' '.join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def search(conn, query, top_k=DEFAULT_TOP_K, raw=False, path_prefix=None):
+    """Top-k sections for a query, best first.
+
+    Titles are weighted above body text. `path_prefix` restricts results to
+    one tree (e.g. 'projects/collab-1').
+    """
+    match = query if raw else to_fts_query(query)
+    if not match:
+        return []
+    sql = """
+        SELECT path, title, line,
+               snippet(sections, 2, '**', '**', ' … ', 24) AS snippet,
+               body,
+               bm25(sections, 0.0, 4.0, 1.0) AS score
+        FROM sections
+        WHERE sections MATCH ?
+    """
+    params = [match]
+    if path_prefix:
+        sql += " AND path LIKE ?"
+        params.append(path_prefix.rstrip('/') + '/%')
+    sql += " ORDER BY score LIMIT ?"
+    params.append(top_k)
+    rows = conn.execute(sql, params).fetchall()
+    return [
+        {'path': path, 'title': title, 'line': line, 'snippet': snippet, 'body': body, 'score': round(-score, 3)}
+        for path, title, line, snippet, body, score in rows
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Full-text index of workspace notes for context loading',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--update', action='store_true', help='Update the index incrementally')
+    parser.add_argument('--rebuild', action='store_true', help='Drop and rebuild the index')
+    parser.add_argument('--search', '-s', metavar='QUERY', help='Search the index')
+    parser.add_argument('-k', type=int, default=DEFAULT_TOP_K, help=f'Results to return (default: {DEFAULT_TOP_K})')
+    parser.add_argument('--path', metavar='PREFIX', help='Only search under this path (e.g. projects/collab-1)')
+    parser.add_argument('--raw', action='store_true', help='Treat QUERY as FTS5 syntax (AND/OR/NEAR/"phrases")')
+    parser.add_argument('--show', action='store_true', help='Print full section text instead of snippets')
+    parser.add_argument('--json', action='store_true', help='Output results as JSON')
+    parser.add_argument('--no-update', action='store_true', help='Search without updating first')
+    parser.add_argument('--stats', action='store_true', help='Show index size')
+    parser.add_argument('--verbose', '-v', action='store_true', help='List changed files during update')
+
+    args = parser.parse_args()
+
+    if not (args.update or args.rebuild or args.search or args.stats):
+        parser.print_help()
+        sys.exit(1)
+
+    if args.rebuild:
+        # The WAL and shared-memory files belong to the old database too
+        for path in (INDEX_PATH, INDEX_PATH.with_name(INDEX_PATH.name + '-wal'),
+                     INDEX_PATH.with_name(INDEX_PATH.name + '-shm')):
+            path.unlink(missing_ok=True)
+
+    conn = connect()
+
+    if args.update or args.rebuild or (args.search and not args.no_update):
+        stats = update_index(conn, verbose=args.verbose)
+        if not args.search:
+            print(f"✓ Index updated: {stats['added']} added, {stats['updated']} updated, "
+                  f"{stats['removed']} removed, {stats['unchanged']} unchanged")
+
+    if args.stats:
+        files = conn.execute('SELECT COUNT(*) FROM files').fetchone()[0]
+        sections = conn.execute('SELECT COUNT(*) FROM sections').fetchone()[0]
+        size = INDEX_PATH.stat().st_size if INDEX_PATH.exists() else 0
+        print(f"{files} files, {sections} sections, {size / 1024:.0f} KB at {INDEX_PATH}")
+
+    if args.search:
+        try:
+            results = search(conn, args.search, args.k, args.raw, args.path)
+        except sqlite3.OperationalError as e:
+            print(f"Error: invalid query: {e}")
+            sys.exit(1)
+
+        if args.json:
+            if not args.show:
+                for r in results:
+                    del r['body']
+            print(json.dumps(results, indent=2))
+        elif not results:
+            print("No matches.")
+        else:
+            for r in results:
+                title = f" — {r['title']}" if r['title'] else ''
+                print(f"{r['path']}:{r['line']}{title}  (score {r['score']})")
+                text = r['body'] if args.show else r['snippet']
+                print('    ' + text.replace('\n', '\n    '))
+                print()
+
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
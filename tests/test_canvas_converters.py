@@ -0,0 +1,40 @@
+"""sync_canvas.py: the streaming converter must match the BeautifulSoup path it replaced."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / '.cursor' / 'skills' / 'canvas-sync'))
+import sync_canvas
+
+FIXTURE = Path(__file__).parent / 'fixtures' / 'canvas.html'
+
+pytest.importorskip('bs4')
+
+
+@pytest.fixture(scope='module')
+def html():
+    return FIXTURE.read_bytes()
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64, sync_canvas.CHUNK_SIZE])
+def test_stream_matches_bs4(html, chunk_size):
+    streamed = sync_canvas.stream_to_markdown(html[i:i + chunk_size] for i in range(0, len(html), chunk_size))
+    assert streamed == sync_canvas.html_to_markdown(html.decode('utf-8'))
+
+
+def test_fixture_covers_canvas_features(html):
+    markdown = sync_canvas.stream_to_markdown([html])
+    lines = markdown.splitlines()
+    assert '- [x] Set up CI <GitHub Actions>' in lines
+    assert lines.count('## In Progress') == 1
+    assert '- [ ] Fixture with — entities …' in lines
+    assert '---' in lines
+    assert 'raw <b>cdata</b> & text after cdata' in lines
+    assert '- [ ] Item with CDATA inside' in lines
+
+
+def test_check_parsers(capsys):
+    assert sync_canvas.check_parsers(FIXTURE)
+    assert 'Converters agree' in capsys.readouterr().out